@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 from users.routes import router as user_router
 from engine.routes import router as engine_router
+from jobs.routes import router as jobs_router
+from core.metrics import metrics_router
 
 api_router = APIRouter()
 api_router.include_router(user_router, prefix="/api/users", tags=["Users"])
 api_router.include_router(engine_router, prefix='/api', tags=['Core Features'])
+api_router.include_router(jobs_router, prefix='/api/jobs', tags=['Jobs'])
+api_router.include_router(metrics_router)
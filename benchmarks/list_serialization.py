@@ -0,0 +1,123 @@
+"""Compare the pydantic and the .values()/orjson paths of the big list routes.
+
+    python -m benchmarks.list_serialization [--rows 10000] [--runs 5] [--json out.json]
+
+Seeds a throwaway SQLite database with ``--rows`` courses and agent
+applications, then requests GET /api/course, /api/university and
+/api/agent/admission-application in-process with FAST_LIST_RESPONSES off and
+on. The catalog cache is cleared before every request so each run includes
+the query.
+
+httpx comes with the dev requirements: pip install -r requirements-dev.txt
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+# Never seed the configured database
+_tmp_dir = tempfile.mkdtemp(prefix='bench-')
+os.environ['DATABASE_URL'] = f'sqlite://{_tmp_dir}/bench.sqlite3'
+
+import httpx
+from tortoise import Tortoise
+from core.config import settings
+from core.security import create_access_token
+from core.tortoise_config import TORTOISE_ORM
+from engine.cruds import catalog_cache
+from engine.models import (
+    Country, University, Course, AgentAdmissionApplication, AgentApplicationCommission, VarsityType
+)
+from users.models import User
+
+
+ROUTES = ['/api/course', '/api/university', '/api/agent/admission-application']
+
+
+async def seed(rows: int):
+    admin = await User.create(username='bench-admin', email='bench@example.com', password_hash='-', is_admin=True, is_verified=True)
+    country = await Country.create(name='Benchmarkland', description='Seeded for benchmarks')
+
+    university_count = max(rows // 100, 1)
+    await University.bulk_create([
+        University(
+            id=i, country=country, name=f'University {i}', location=f'City {i}',
+            varsity_type=list(VarsityType)[i % len(VarsityType)], description='A university', website_link='https://example.com',
+        )
+        for i in range(1, university_count + 1)
+    ])
+    await Course.bulk_create([
+        Course(
+            id=i, university_id=i % university_count + 1, name=f'Course {i}', course_type='Masters',
+            fee=1000 + i, description='A course description that is about this long.',
+        )
+        for i in range(1, rows + 1)
+    ])
+    await AgentAdmissionApplication.bulk_create([
+        AgentAdmissionApplication(
+            id=i, agent=admin, first_name=f'First {i}', last_name='Last', email=f'student{i}@example.com',
+            phone='0123456789', passport_no=f'P{i:08d}', country=country, course_id=i,
+            university_one_id=i % university_count + 1,
+        )
+        for i in range(1, rows + 1)
+    ])
+    await AgentApplicationCommission.bulk_create([
+        AgentApplicationCommission(admission_application_id=i, student_fee=1000, commission=100, commission_rate=10)
+        for i in range(1, rows + 1)
+    ])
+    return create_access_token({'sub': admin.username})
+
+
+async def time_route(client, url: str, headers: dict, runs: int) -> dict:
+    timings = []
+    size = 0
+    for run in range(runs + 1):
+        catalog_cache.invalidate()
+        started = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        elapsed = (time.perf_counter() - started) * 1000
+        response.raise_for_status()
+        size = len(response.content)
+        if run:  # the first run only warms up
+            timings.append(elapsed)
+    return {'median_ms': statistics.median(timings), 'min_ms': min(timings), 'bytes': size}
+
+
+async def main(rows: int, runs: int, output: str):
+    from main import app
+
+    await Tortoise.init(config=TORTOISE_ORM)
+    await Tortoise.generate_schemas()
+    token = await seed(rows)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+        for url in ROUTES:
+            results[url] = {}
+            for mode, fast in (('pydantic', False), ('fast', True)):
+                settings.FAST_LIST_RESPONSES = fast
+                results[url][mode] = await time_route(client, url, headers, runs)
+
+    await Tortoise.close_connections()
+
+    print(f"{'route':<36}{'pydantic ms':>14}{'fast ms':>10}{'speedup':>10}{'bytes':>12}")
+    for url, result in results.items():
+        speedup = result['pydantic']['median_ms'] / result['fast']['median_ms']
+        print(f"{url:<36}{result['pydantic']['median_ms']:>14.1f}{result['fast']['median_ms']:>10.1f}{speedup:>9.1f}x{result['fast']['bytes']:>12}")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'rows': rows, 'runs': runs, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000, help='courses and applications to seed')
+    parser.add_argument('--runs', type=int, default=5, help='timed requests per route and mode')
+    parser.add_argument('--json', dest='output', default=None, help='also write the results here')
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.runs, args.output))
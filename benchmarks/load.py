@@ -0,0 +1,254 @@
+"""Drive the hot API routes and record latency percentiles and throughput.
+
+    python -m benchmarks.load [--db bench.sqlite3 | --url http://127.0.0.1:8000]
+                              [--requests 500] [--concurrency 8] [--json out.json] [--compare base.json]
+
+In-process (the default) the app is called through httpx's ASGI transport,
+which measures the application without a server or network in the way.
+--db runs against a database written by benchmarks.seed; without it a
+throwaway one is seeded at --scale. Media written by the upload scenario
+goes to a temporary directory.
+
+With --url the same scenarios go over HTTP to a running server, e.g. one
+started on a seeded database with
+
+    DATABASE_URL=sqlite:///abs/path/bench.sqlite3 uvicorn main:app --workers 1
+
+Results carry p50/p95/p99 latency and requests per second for each
+scenario plus the commit they were measured on. --compare prints the p95
+change against an earlier result file and exits with 1 when a scenario
+got slower by more than --tolerance.
+
+httpx comes with the dev requirements: pip install -r requirements-dev.txt
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from .seed import BENCH_AGENT, BENCH_PASSWORD, use_database
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEARCH_TERMS = ['computer', 'business', 'engineering', 'medicine', 'law', 'data science', 'nursing', 'finance']
+
+
+class Scenario:
+    def __init__(self, name: str, build):
+        # build(i) -> (method, url, request kwargs)
+        self.name = name
+        self.build = build
+
+
+def scenarios(application_ids: list, headers: dict) -> list:
+    def upload(i):
+        application_id = application_ids[i % len(application_ids)]
+        # Different bytes every time, so content-addressed storage writes each file
+        content = b'%PDF-1.4\n' + f'benchmark upload {i} {time.time_ns()}\n'.encode() * 64
+        return 'POST', f'/api/agent/application-documents/{application_id}/upload', {
+            'headers': headers,
+            'files': [('files', (f'passport_{i}.pdf', content, 'application/pdf'))],
+            'data': {'field_names': 'passport'},
+        }
+
+    return [
+        Scenario('course_filter', lambda i: (
+            'GET', '/api/course/filter/', {'params': {'search': SEARCH_TERMS[i % len(SEARCH_TERMS)], 'limit': 50}},
+        )),
+        Scenario('university_list', lambda i: ('GET', '/api/university', {})),
+        Scenario('application_list', lambda i: (
+            'GET', '/api/agent/admission-application', {'headers': headers, 'params': {'limit': 50}},
+        )),
+        Scenario('application_retrieve', lambda i: (
+            'GET', f'/api/agent/admission-application/{application_ids[i % len(application_ids)]}', {'headers': headers},
+        )),
+        Scenario('login', lambda i: (
+            'POST', '/api/users/login', {'json': {'username': BENCH_AGENT, 'password': BENCH_PASSWORD}},
+        )),
+        Scenario('document_upload', upload),
+    ]
+
+
+def percentile(ordered: list, q: float) -> float:
+    # Nearest rank
+    if not ordered:
+        return 0.0
+    return ordered[min(max(int(round(q / 100 * len(ordered) + 0.5)) - 1, 0), len(ordered) - 1)]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, warmup: int) -> dict:
+    for i in range(warmup):
+        method, url, kwargs = scenario.build(i)
+        await client.request(method, url, **kwargs)
+
+    latencies = []
+    statuses = {}
+    counter = itertools.count(warmup)
+
+    async def worker():
+        while (i := next(counter)) < warmup + requests:
+            method, url, kwargs = scenario.build(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': statuses,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    response = await client.post('/api/users/login', json={'username': BENCH_AGENT, 'password': BENCH_PASSWORD})
+    response.raise_for_status()
+    return {'Authorization': f"Bearer {response.json()['token']['access_token']}"}
+
+
+async def run(client: httpx.AsyncClient, args) -> dict:
+    headers = await login(client)
+    response = await client.get('/api/agent/admission-application', headers=headers, params={'limit': 500})
+    response.raise_for_status()
+    application_ids = [row['id'] for row in response.json()['items']]
+    if not application_ids:
+        raise SystemExit('[ERROR] The benchmark agent has no applications; seed the database with benchmarks.seed')
+
+    results = {}
+    for scenario in scenarios(application_ids, headers):
+        if args.only and scenario.name not in args.only:
+            continue
+        results[scenario.name] = await run_scenario(client, scenario, args.requests, args.concurrency, args.warmup)
+        result = results[scenario.name]
+        print(
+            f"{scenario.name:<22}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+            f"{result['throughput_rps']:>10.1f}{result['errors']:>8}"
+        )
+    return results
+
+
+async def run_in_process(args) -> dict:
+    from tortoise import Tortoise
+    from core.tortoise_config import TORTOISE_ORM
+
+    await Tortoise.init(config=TORTOISE_ORM)
+    if args.db is None:
+        from .seed import seed
+        await Tortoise.generate_schemas()
+        await seed(args.scale, args.seed, log=lambda line: None)
+
+    from main import app
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+            return await run(client, args)
+    finally:
+        await Tortoise.close_connections()
+
+
+async def run_over_http(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        return await run(client, args)
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> bool:
+    print(f"\n{'scenario':<22}{'base p95':>10}{'p95':>10}{'change':>10}")
+    regressed = False
+    for name, result in current['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if not base or not base['p95_ms']:
+            continue
+        change = result['p95_ms'] / base['p95_ms'] - 1
+        flag = ''
+        if change > tolerance:
+            regressed, flag = True, '  REGRESSION'
+        print(f"{name:<22}{base['p95_ms']:>10.1f}{result['p95_ms']:>10.1f}{change:>+10.0%}{flag}")
+    return regressed
+
+
+def main(args) -> int:
+    print(f"{'scenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}")
+    if args.url:
+        results = asyncio.run(run_over_http(args))
+    else:
+        results = asyncio.run(run_in_process(args))
+
+    report = {
+        'commit': current_commit(),
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'target': args.url or 'asgi',
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'scenarios': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            if compare(json.load(f), report, args.tolerance):
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--db', default=None, help='SQLite file written by benchmarks.seed')
+    target.add_argument('--url', default=None, help='base URL of a running server')
+    parser.add_argument('--scale', type=float, default=0.02, help='volumes of the throwaway database, without --db')
+    parser.add_argument('--seed', type=int, default=42, help='random seed of the throwaway database')
+    parser.add_argument('--requests', type=int, default=500, help='timed requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='requests in flight at once')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed requests before each scenario')
+    parser.add_argument('--only', nargs='+', default=None, help='scenarios to run')
+    parser.add_argument('--json', dest='output', default=None, help='write the results here')
+    parser.add_argument('--compare', dest='baseline', default=None, help='earlier result file to compare p95 against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='p95 slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    if not args.url:
+        # Never touch the configured database or media directory
+        work_dir = tempfile.mkdtemp(prefix='bench-')
+        use_database(args.db if args.db else os.path.join(work_dir, 'bench.sqlite3'))
+        for name in ('output', 'baseline'):
+            if getattr(args, name):
+                setattr(args, name, os.path.abspath(getattr(args, name)))
+        os.chdir(work_dir)
+        os.mkdir('media')
+        sys.path.insert(0, REPO_DIR)
+
+    sys.exit(main(args))
@@ -0,0 +1,63 @@
+"""Seed a fresh SQLite database with benchmark volumes.
+
+    python -m benchmarks.seed bench.sqlite3 [--scale 1.0] [--seed 42] [--force]
+
+The rows come from commands.generate_data: at --scale 1 that is 2,000
+universities, 100,000 courses, 200 agents and 500,000 agent applications
+with their documents and commissions, plus students, intakes and content.
+The same seed always produces the same rows, so numbers from two commits
+are comparable.
+
+BENCH_AGENT is the first generated agent; every user's password is
+BENCH_PASSWORD.
+"""
+import argparse
+import os
+import time
+from tortoise import Tortoise, run_async
+
+
+BENCH_AGENT = 'agent1'
+BENCH_PASSWORD = 'bench-password'
+
+
+async def seed(scale: float = 1.0, seed: int = 42, log=print) -> dict:
+    """Write the benchmark rows into the initialized, empty database."""
+    from commands.generate_data import generate, volumes
+
+    return await generate(volumes(scale), seed, BENCH_PASSWORD, log=log)
+
+
+def use_database(path: str) -> str:
+    # Must run before core.config is imported anywhere
+    path = os.path.abspath(path)
+    os.environ['DATABASE_URL'] = f'sqlite://{path}'
+    return path
+
+
+async def main(args):
+    from core.tortoise_config import TORTOISE_ORM
+
+    await Tortoise.init(config=TORTOISE_ORM)
+    await Tortoise.generate_schemas()
+    started = time.perf_counter()
+    await seed(args.scale, args.seed)
+    print(f"[INFO] Seeded {args.path} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='SQLite file to create')
+    parser.add_argument('--scale', type=float, default=1.0, help='fraction of the full volumes to write')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--force', action='store_true', help='replace an existing file')
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        if not args.force:
+            parser.error(f'{args.path} exists, pass --force to replace it')
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.path + suffix):
+                os.remove(args.path + suffix)
+    use_database(args.path)
+    run_async(main(args))
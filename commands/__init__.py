@@ -1,5 +1,5 @@
 from users.models import User
-from core.security import get_password_hash
+from core.security import get_password_hash_async
 
 async def create_superuser():
     existing_admin = await User.get_or_none(username="admin")
@@ -11,7 +11,7 @@ async def create_superuser():
     await User.create(
         username="admin",
         email="admin@example.com",
-        password_hash=get_password_hash("adminpassword"),
+        password_hash=await get_password_hash_async("adminpassword"),
         is_admin=True,
         is_verified=True
     )
@@ -0,0 +1,56 @@
+import argparse
+import sys
+from tortoise import Tortoise, run_async
+from core.tortoise_config import TORTOISE_ORM
+from engine.bulk_import import detect_format
+from engine.catalog_io import EXPORT_FORMATS, IMPORT_FORMATS, export_catalog, import_catalog
+
+
+async def run_import(path: str, format: str, chunk_size: int):
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = await import_catalog(stream, format, chunk_size)
+
+    for error in report['errors']:
+        print(f"[ERROR] row {error['row']}: {'; '.join(error['errors'])}")
+    for level in ('countries', 'universities', 'courses'):
+        print(f"[INFO] {level}: {report[level]['created']} created, {report[level]['updated']} updated")
+    print(f"[INFO] {report['total'] - report['failed']} of {report['total']} rows imported")
+
+
+async def run_export(path: str, format: str):
+    stream = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+    try:
+        async for text in export_catalog(format):
+            stream.write(text)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+async def main(args):
+    await Tortoise.init(config=TORTOISE_ORM)
+    if args.action == 'import':
+        await run_import(args.path, args.format, args.chunk_size)
+    else:
+        await run_export(args.path, args.format)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import or export the country/university/course catalog.')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    import_parser = subparsers.add_parser('import', help='upsert the catalog from a file')
+    import_parser.add_argument('path', help='.csv, .jsonl or .json file')
+    import_parser.add_argument('--format', choices=IMPORT_FORMATS, default=None, help='defaults to the file extension')
+    import_parser.add_argument('--chunk-size', type=int, default=None, help='rows per transaction')
+
+    export_parser = subparsers.add_parser('export', help='write the catalog as flat rows')
+    export_parser.add_argument('path', help="output file, or - for stdout")
+    export_parser.add_argument('--format', choices=EXPORT_FORMATS, default=None, help='defaults to the file extension, else csv')
+
+    args = parser.parse_args()
+    if args.format is None:
+        args.format = detect_format(args.path) if args.path != '-' else 'csv'
+        if args.format is None or (args.action == 'export' and args.format not in EXPORT_FORMATS):
+            parser.error('cannot tell the format from the file name, pass --format')
+    run_async(main(args))
@@ -0,0 +1,84 @@
+import argparse
+import re
+import sys
+from tortoise import Tortoise, connections, run_async
+from core.tortoise_config import TORTOISE_ORM
+from engine.cruds import AGENT_APPLICATION_RELATIONS
+from engine.models import AgentAdmissionApplication, University, Course, Country, BlogAndEvent
+
+
+# A full table scan in SQLite's plan output; virtual tables (FTS) are searched through their own index
+FULL_SCAN = re.compile(r'^SCAN (?!.*VIRTUAL TABLE)(\S+)')
+
+
+def hot_queries():
+    # Mirrors the filters the routes apply; values only need to be of the right type
+    return {
+        'applications by agent': AgentAdmissionApplication.filter(agent_id=1)
+            .select_related(*AGENT_APPLICATION_RELATIONS).order_by('id').limit(51),
+        'applications by agent and status': AgentAdmissionApplication.filter(agent_id=1, status='New')
+            .select_related(*AGENT_APPLICATION_RELATIONS),
+        'applications by status': AgentAdmissionApplication.filter(status='New')
+            .select_related(*AGENT_APPLICATION_RELATIONS),
+        'universities by country': University.filter(country_id=1),
+        'universities by country and type': University.filter(country_id=1, varsity_type='Public'),
+        'universities by type': University.filter(varsity_type='Public'),
+        'courses by name': Course.filter(name='Computer Science').limit(1),
+        'courses by type': Course.filter(course_type='Bachelor'),
+        'courses by university': Course.filter(university_id=1),
+        'courses by university and type': Course.filter(university_id=1, course_type='Bachelor'),
+        'courses by country': Course.filter(university__country_id=1),
+        'country by name': Country.filter(name='United Kingdom').limit(1),
+        'blogs and events by type': BlogAndEvent.filter(type='Blog'),
+    }
+
+
+async def check_query_plans(verbose: bool = False) -> list:
+    db = connections.get('default')
+    if db.capabilities.dialect != 'sqlite':
+        print(f"[INFO] Query plan check only supports SQLite, skipping {db.capabilities.dialect}")
+        return []
+
+    failures = []
+    for name, queryset in hot_queries().items():
+        rows = await db.execute_query_dict(f'EXPLAIN QUERY PLAN {queryset.sql(params_inline=True)}')
+        plan = [row['detail'] for row in rows]
+        scans = [match.group(1) for match in map(FULL_SCAN.match, plan) if match]
+
+        if scans:
+            failures.append(name)
+            print(f"[ERROR] {name}: full scan of {', '.join(scans)}")
+        else:
+            print(f"[INFO] {name}: ok")
+
+        if verbose or scans:
+            for detail in plan:
+                print(f"        {detail}")
+
+    return failures
+
+
+async def main(database_url: str, verbose: bool):
+    # By default the schema is generated from the models into a throwaway database
+    config = TORTOISE_ORM
+    if database_url != 'configured':
+        config = {**TORTOISE_ORM, 'connections': {'default': database_url}, 'routers': []}
+    await Tortoise.init(config=config)
+    if database_url != 'configured':
+        await Tortoise.generate_schemas()
+
+    failures = await check_query_plans(verbose)
+    await Tortoise.close_connections()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fail if a hot query is planned as a full table scan.')
+    parser.add_argument(
+        '--database-url', default='sqlite://:memory:',
+        help="database to check, or 'configured' for the application's database"
+    )
+    parser.add_argument('--verbose', action='store_true', help='print every plan')
+    args = parser.parse_args()
+    run_async(main(args.database_url, args.verbose))
@@ -0,0 +1,327 @@
+import argparse
+import datetime
+import itertools
+import random
+import time
+from tortoise import Tortoise, connections, run_async
+from tortoise.transactions import in_transaction
+from core.http_cache import table_versions
+from core.security import get_password_hash
+from core.tortoise_config import TORTOISE_ORM
+from engine.cruds import APPLICATION_UNIVERSITY_FIELDS, SINGLE_UNIVERSITY_COUNTRIES
+from engine.models import (
+    AgentAdmissionApplication, AgentApplicationCommission, AgentApplicationDocuments, ApplicationStatus,
+    BlogAndEvent, BlogOrEvent, Country, Course, Intake, Offers, StudentAdmissionApplication,
+    StudentApplicationDocuments, University, VarsityType,
+)
+from engine.search import rebuild_course_search_index
+from engine.summary import rebuild_application_summary
+from users.models import User, UserProfile
+
+
+''' Synthetic data for scale testing
+
+Every row is built from one random.Random(seed), so the same seed and
+volumes give the same data. Ids are assigned here, after the highest id
+already in each table, which lets rows reference each other without
+reading anything back and keeps an existing database intact. Rows go in
+with bulk_create, one transaction per batch.
+
+Applications follow the rules the API enforces: every university of an
+application is in the application's country, the course belongs to its
+first university, and applications to SINGLE_UNIVERSITY_COUNTRIES name one
+university.
+'''
+
+VOLUMES = {
+    'countries': 40, 'universities': 2000, 'courses': 100_000, 'intakes': 12, 'agents': 200,
+    'applications': 500_000, 'students': 50_000, 'blogs': 500, 'offers': 50,
+}
+# Enough countries for both university rules even at small scales
+MIN_VOLUMES = {'countries': len(SINGLE_UNIVERSITY_COUNTRIES) + 1}
+BATCH_SIZE = 5000
+DEFAULT_PASSWORD = 'password'
+
+COUNTRY_NAMES = [
+    *SINGLE_UNIVERSITY_COUNTRIES, 'United Kingdom', 'Australia', 'Canada', 'Germany', 'Ireland', 'Hungary',
+    'Turkey', 'Japan', 'South Korea', 'New Zealand', 'Netherlands', 'Sweden', 'Finland', 'Poland',
+]
+CITY_PREFIXES = ['North', 'South', 'East', 'West', 'New', 'Port', 'Saint', 'Lake', 'Upper', 'Lower']
+SUBJECTS = [
+    'Computer Science', 'Data Science', 'Business Administration', 'Accounting', 'Finance', 'Marketing',
+    'Mechanical Engineering', 'Civil Engineering', 'Electrical Engineering', 'Medicine', 'Nursing',
+    'Pharmacy', 'Law', 'Psychology', 'Architecture', 'Hospitality Management', 'Economics',
+    'Biotechnology', 'International Relations', 'Graphic Design',
+]
+COURSE_TYPES = ['Foundation', 'Diploma', 'Bachelors', 'Masters', 'PhD']
+MONTHS = ['January', 'May', 'September']
+FIRST_NAMES = ['Amina', 'Rahim', 'Sadia', 'Karim', 'Nusrat', 'Tanvir', 'Farhana', 'Imran', 'Mehedi', 'Ayesha']
+LAST_NAMES = ['Hossain', 'Rahman', 'Chowdhury', 'Islam', 'Ahmed', 'Khan', 'Uddin', 'Begum', 'Sarker', 'Akter']
+CITIES = ['Dhaka', 'Chattogram', 'Sylhet', 'Khulna', 'Rajshahi', 'Kathmandu', 'Lahore', 'Colombo']
+GRADUATIONS = ['SSC', 'HSC', 'Honours', 'Masters']
+STAGES = ['Enquiry', 'Counselling', 'Documents', 'Applied', 'Offer']
+AGENT_DOCUMENTS = ['passport', 'cv', 'ssc_certificate', 'hsc_certificate', 'ielts_certificate']
+COMMISSION_RATES = (5, 8, 10, 12, 15)
+
+
+def volumes(scale: float = 1.0, **overrides) -> dict:
+    sizes = {name: max(int(count * scale), MIN_VOLUMES.get(name, 1)) for name, count in VOLUMES.items()}
+    sizes.update({name: count for name, count in overrides.items() if count is not None})
+    return sizes
+
+
+def batched(rows, size: int):
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+
+async def bulk_insert(model, rows, batch_size: int = BATCH_SIZE) -> int:
+    count = 0
+    for batch in batched(rows, batch_size):
+        async with in_transaction('default') as conn:
+            await model.bulk_create(batch, using_db=conn)
+        count += len(batch)
+    return count
+
+
+async def next_id(model) -> int:
+    ids = await model.all().order_by('-id').limit(1).values_list('id', flat=True)
+    return ids[0] + 1 if ids else 1
+
+
+async def reset_sequences(models):
+    # Postgres sequences don't move for explicit ids; SQLite needs nothing
+    db = connections.get('default')
+    if db.capabilities.dialect != 'postgres':
+        return
+    for model in models:
+        table = model._meta.db_table
+        await db.execute_query(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT MAX(id) FROM \"{table}\"))"
+        )
+
+
+class Generator:
+    """Row factories for one run; ids[name] is the first id of that kind."""
+
+    def __init__(self, seed: int, sizes: dict, ids: dict, password_hash: str):
+        self.rng = random.Random(seed)
+        self.sizes = sizes
+        self.ids = ids
+        self.password_hash = password_hash
+        self.now = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def country_name(self, index: int) -> str:
+        return COUNTRY_NAMES[index] if index < len(COUNTRY_NAMES) else f'Country {index + 1}'
+
+    # University n (0-based) is in country n % countries and course n in university n % universities
+    def university_country(self, index: int) -> int:
+        return index % self.sizes['countries']
+
+    def same_country_universities(self, index: int, count: int) -> list:
+        countries, universities = self.sizes['countries'], self.sizes['universities']
+        country = self.university_country(index)
+        in_country = range(country, universities, countries)
+        others = [other for other in self.rng.sample(in_country, min(count + 1, len(in_country))) if other != index]
+        return others[:count]
+
+    def countries(self):
+        for i in range(self.sizes['countries']):
+            name = self.country_name(i)
+            yield Country(id=self.ids['countries'] + i, name=name, description=f'Study in {name}.')
+
+    def universities(self):
+        varsity_types = list(VarsityType)
+        for i in range(self.sizes['universities']):
+            city = f'{self.rng.choice(CITY_PREFIXES)} City {i + 1}'
+            yield University(
+                id=self.ids['universities'] + i, country_id=self.ids['countries'] + self.university_country(i),
+                varsity_type=varsity_types[i % len(varsity_types)], name=f'University of {city}', location=city,
+                description=f'A university in {city}.', website_link=f'https://university{i + 1}.example.com',
+            )
+
+    def courses(self):
+        for i in range(self.sizes['courses']):
+            subject, course_type = self.rng.choice(SUBJECTS), self.rng.choice(COURSE_TYPES)
+            yield Course(
+                id=self.ids['courses'] + i, university_id=self.ids['universities'] + i % self.sizes['universities'],
+                name=f'{course_type} of {subject}', course_type=course_type, fee=self.rng.randrange(3000, 40000, 500),
+                description=f'A {course_type.lower()} programme in {subject.lower()} with an industry placement.',
+            )
+
+    def intakes(self):
+        for i in range(self.sizes['intakes']):
+            yield Intake(id=self.ids['intakes'] + i, name=f'{MONTHS[i % len(MONTHS)]} {2027 + i // len(MONTHS)}')
+
+    def users(self):
+        # The agents, then one admin
+        for i in range(self.sizes['agents'] + 1):
+            user_id = self.ids['users'] + i
+            is_admin = i == self.sizes['agents']
+            username = f'admin{user_id}' if is_admin else f'agent{user_id}'
+            yield User(
+                id=user_id, username=username, email=f'{username}@example.com', password_hash=self.password_hash,
+                # Every tenth agent still waits for an admin to activate them
+                is_admin=is_admin, is_verified=is_admin or i % 10 != 9,
+            )
+
+    def profiles(self):
+        for i in range(self.sizes['agents']):
+            user_id = self.ids['users'] + i
+            first_name, last_name = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            experienced, office = self.rng.random() < 0.6, self.rng.random() < 0.4
+            phone = self.phone()
+            yield UserProfile(
+                id=self.ids['profiles'] + i, user_id=user_id, full_name=f'{first_name} {last_name}',
+                phone=phone, whatsapp=phone, address=f'{self.rng.randint(1, 200)} Road, {self.rng.choice(CITIES)}',
+                occupation='Education consultant', experience=experienced,
+                exp_description='Placed students abroad since 2018.' if experienced else None,
+                initial_refffer=f'agent{self.ids["users"]}', no_of_deal=self.rng.randint(0, 300), office=office,
+                office_address=f'Suite {self.rng.randint(1, 50)}, {self.rng.choice(CITIES)}' if office else None,
+            )
+
+    def phone(self) -> str:
+        return f'01{self.rng.randrange(10 ** 8, 10 ** 9)}'
+
+    def applications(self):
+        statuses = list(ApplicationStatus)
+        for i in range(self.sizes['applications']):
+            course = self.rng.randrange(self.sizes['courses'])
+            university = course % self.sizes['universities']
+            country = self.university_country(university)
+            extra = 0 if self.country_name(country) in SINGLE_UNIVERSITY_COUNTRIES else self.rng.choice((0, 1, 1, 2))
+            universities = [university, *self.same_country_universities(university, extra)]
+            first_name, last_name = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            yield AgentAdmissionApplication(
+                id=self.ids['applications'] + i, agent_id=self.ids['users'] + i % self.sizes['agents'],
+                first_name=first_name, last_name=last_name, email=f'student{i + 1}@example.com',
+                phone=self.phone(), passport_no=f'P{i + 1:08d}', country_id=self.ids['countries'] + country,
+                course_id=self.ids['courses'] + course, last_graduation=self.rng.choice(GRADUATIONS),
+                # Cycling covers every status at any volume
+                status=statuses[i % len(statuses)],
+                **{
+                    f'{field}_id': self.ids['universities'] + universities[n] if n < len(universities) else None
+                    for n, field in enumerate(APPLICATION_UNIVERSITY_FIELDS)
+                },
+            )
+
+    def application_documents(self):
+        for i in range(self.sizes['applications']):
+            application_id = self.ids['applications'] + i
+            uploaded = AGENT_DOCUMENTS[:self.rng.randint(0, len(AGENT_DOCUMENTS))]
+            yield AgentApplicationDocuments(
+                id=self.ids['application_documents'] + i, admission_application_id=application_id,
+                **{field: f'media/documents/{field}_{application_id}.pdf' for field in uploaded},
+            )
+
+    def commissions(self):
+        for i in range(self.sizes['applications']):
+            student_fee = self.rng.randrange(3000, 40000, 500)
+            rate = self.rng.choice(COMMISSION_RATES)
+            yield AgentApplicationCommission(
+                id=self.ids['commissions'] + i, admission_application_id=self.ids['applications'] + i,
+                student_fee=student_fee, commission=student_fee * rate // 100, commission_rate=rate,
+            )
+
+    def students(self):
+        for i in range(self.sizes['students']):
+            university = self.rng.randrange(self.sizes['universities'])
+            first_name, last_name = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            intake = i % self.sizes['intakes']
+            yield StudentAdmissionApplication(
+                id=self.ids['students'] + i, name=f'{first_name} {last_name}', phone=self.phone(),
+                email=f'applicant{i + 1}@example.com' if self.rng.random() < 0.8 else None,
+                preferred_university_id=self.ids['universities'] + university,
+                residence_country='Bangladesh', interest_country=self.country_name(self.university_country(university)),
+                intake_interest=f'{MONTHS[intake % len(MONTHS)]} {2027 + intake // len(MONTHS)}',
+                last_graduation=self.rng.choice(GRADUATIONS), interested_course=self.rng.choice(SUBJECTS),
+                current_stage=self.rng.choice(STAGES),
+            )
+
+    def student_documents(self):
+        for i in range(self.sizes['students']):
+            application_id = self.ids['students'] + i
+            uploaded = self.rng.random() < 0.7
+            yield StudentApplicationDocuments(
+                id=self.ids['student_documents'] + i, admission_application_id=application_id,
+                passport=f'media/documents/passport_s{application_id}.pdf' if uploaded else None,
+                last_graduation_certificate=f'media/documents/graduation_s{application_id}.pdf' if uploaded else None,
+            )
+
+    def blogs(self):
+        kinds = list(BlogOrEvent)
+        for i in range(self.sizes['blogs']):
+            kind, subject = kinds[i % len(kinds)], self.rng.choice(SUBJECTS)
+            yield BlogAndEvent(
+                id=self.ids['blogs'] + i, type=kind, title=f'{subject} {kind.value.lower()} {i + 1}',
+                description=f'Everything about studying {subject.lower()} abroad. ' * 5,
+                published_at=self.now - datetime.timedelta(hours=i),
+            )
+
+    def offers(self):
+        for i in range(self.sizes['offers']):
+            yield Offers(id=self.ids['offers'] + i, image=f'media/offers/offer_{i + 1}.jpg')
+
+
+# (ids key, model, Generator method), in dependency order
+STEPS = (
+    ('countries', Country, Generator.countries),
+    ('universities', University, Generator.universities),
+    ('courses', Course, Generator.courses),
+    ('intakes', Intake, Generator.intakes),
+    ('users', User, Generator.users),
+    ('profiles', UserProfile, Generator.profiles),
+    ('applications', AgentAdmissionApplication, Generator.applications),
+    ('application_documents', AgentApplicationDocuments, Generator.application_documents),
+    ('commissions', AgentApplicationCommission, Generator.commissions),
+    ('students', StudentAdmissionApplication, Generator.students),
+    ('student_documents', StudentApplicationDocuments, Generator.student_documents),
+    ('blogs', BlogAndEvent, Generator.blogs),
+    ('offers', Offers, Generator.offers),
+)
+
+
+async def generate(sizes: dict, seed: int = 42, password: str = DEFAULT_PASSWORD, batch_size: int = BATCH_SIZE, log=print) -> dict:
+    """Write the rows and return the first id of each kind."""
+    ids = {key: await next_id(model) for key, model, _ in STEPS}
+    # One hash for every generated user; bcrypt per row would dominate the run
+    generator = Generator(seed, sizes, ids, get_password_hash(password))
+
+    for key, model, rows in STEPS:
+        started = time.perf_counter()
+        count = await bulk_insert(model, rows(generator), batch_size)
+        log(f"[INFO] {model.__name__}: {count} rows in {time.perf_counter() - started:.1f}s")
+
+    await reset_sequences([model for _, model, _ in STEPS])
+    await rebuild_course_search_index()
+    await rebuild_application_summary()
+    # Running servers must stop answering 304 for what they served before
+    await table_versions.bump(*(model._meta.db_table for _, model, _ in STEPS))
+    log("[INFO] Course search index and application summary rebuilt")
+    return ids
+
+
+async def main(args):
+    await Tortoise.init(config=TORTOISE_ORM)
+    if args.generate_schemas:
+        await Tortoise.generate_schemas()
+
+    sizes = volumes(args.scale, **{name: getattr(args, name) for name in VOLUMES})
+    started = time.perf_counter()
+    ids = await generate(sizes, args.seed, args.password, args.batch_size)
+    print(f"[INFO] Generated data in {time.perf_counter() - started:.1f}s")
+    print(f"[INFO] Agents agent{ids['users']}..agent{ids['users'] + sizes['agents'] - 1}, password: {args.password}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate referentially valid synthetic data for every model.')
+    parser.add_argument('--scale', type=float, default=1.0, help='fraction of the default volumes')
+    for name, count in VOLUMES.items():
+        parser.add_argument(f'--{name}', type=int, default=None, help=f'rows to generate (default {count} x scale)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed; the same seed gives the same rows')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help='password of every generated user')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='rows per transaction')
+    parser.add_argument('--generate-schemas', action='store_true', help='create missing tables first, for a fresh database')
+    args = parser.parse_args()
+    run_async(main(args))
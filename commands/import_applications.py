@@ -0,0 +1,37 @@
+import argparse
+from tortoise import Tortoise, run_async
+from core.tortoise_config import TORTOISE_ORM
+from engine.bulk_import import IMPORT_FORMATS, detect_format, import_agent_applications
+from users.models import User
+
+
+async def main(path: str, agent: str, format: str, chunk_size: int):
+    await Tortoise.init(config=TORTOISE_ORM)
+
+    agent_user = await User.get_or_none(username=agent)
+    if not agent_user:
+        print(f"[ERROR] Agent {agent} not found")
+        return
+
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = await import_agent_applications(stream, format, agent_user.id, chunk_size)
+
+    for error in report['errors']:
+        print(f"[ERROR] row {error['row']}: {'; '.join(error['errors'])}")
+    print(f"[INFO] {report['created']} of {report['total']} applications imported, {report['failed']} failed")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import agent admission applications from CSV or JSONL.')
+    parser.add_argument('path', help='.csv or .jsonl file')
+    parser.add_argument('--agent', required=True, help='username of the agent the applications belong to')
+    parser.add_argument('--format', choices=IMPORT_FORMATS, default=None, help='defaults to the file extension')
+    parser.add_argument('--chunk-size', type=int, default=None, help='rows per transaction')
+    args = parser.parse_args()
+
+    format = args.format or detect_format(args.path)
+    if format is None:
+        parser.error('cannot tell the format from the file name, pass --format')
+    if format not in IMPORT_FORMATS:
+        parser.error(f"{format} is not supported, use one of {', '.join(IMPORT_FORMATS)}")
+    run_async(main(args.path, args.agent, format, args.chunk_size))
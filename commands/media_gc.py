@@ -0,0 +1,88 @@
+import argparse
+import os
+from collections import Counter
+from tortoise import Tortoise, run_async
+from core.config import settings
+from core.storage import collect_orphans, normalize_media_path
+from core.tortoise_config import TORTOISE_ORM
+from engine.models import (
+    AgentApplicationDocuments, StudentApplicationDocuments, University, Course, BlogAndEvent, Offers
+)
+from jobs.models import Job, JobStatus
+from users.models import UserProfile
+
+
+# Every column that stores a path under media/
+MEDIA_REFERENCES = [
+    (AgentApplicationDocuments, [
+        'passport', 'masters_certificate', 'masters_transcript', 'honers_certificate',
+        'honers_transcript', 'hsc_certificate', 'hsc_transcript', 'ssc_certificate',
+        'ssc_transcript', 'ielts_certificate', 'cv', 'resume', 'lor', 'job_letter', 'others'
+    ]),
+    (StudentApplicationDocuments, ['passport', 'last_graduation_certificate']),
+    (UserProfile, ['nid_passport_file']),
+    (University, ['image']),
+    (Course, ['image']),
+    (BlogAndEvent, ['image']),
+    (Offers, ['image']),
+]
+
+MEDIA_DIRS = ['documents', 'images']
+
+BATCH_SIZE = 5000
+
+
+async def count_media_references() -> Counter:
+    references = Counter()
+
+    # Uploads already answered with 202 whose job has not attached them yet, retries waiting
+    # on their backoff included. Read before the rows: a job finishing in between has
+    # attached its files by the time those are scanned.
+    payloads = await Job.filter(status__in=[JobStatus.QUEUED, JobStatus.RUNNING]).values_list('payload', flat=True)
+    for payload in payloads:
+        files = payload.get('files') or {}
+        references.update(normalize_media_path(path) for path in files.values() if path)
+
+    for model, fields in MEDIA_REFERENCES:
+        # Keyset scan so large tables are never loaded at once
+        last_id = 0
+        while True:
+            rows = await model.filter(id__gt=last_id).order_by('id').limit(BATCH_SIZE).values_list('id', *fields)
+            if not rows:
+                break
+            for row in rows:
+                references.update(normalize_media_path(path) for path in row[1:] if path)
+            last_id = rows[-1][0]
+    return references
+
+
+async def collect_media_garbage(dry_run: bool = False, grace_seconds: int = None):
+    if grace_seconds is None:
+        grace_seconds = settings.MEDIA_GC_GRACE_SECONDS
+
+    references = await count_media_references()
+    print(f"[INFO] {len(references)} media files referenced ({sum(references.values())} references)")
+
+    removed = 0
+    for media_dir in MEDIA_DIRS:
+        for path in collect_orphans(media_dir, set(references), grace_seconds):
+            print(f"[INFO] {'Would remove' if dry_run else 'Removing'} {path}")
+            if not dry_run:
+                os.remove(path)
+            removed += 1
+
+    print(f"[INFO] {removed} orphaned media files {'found' if dry_run else 'removed'}")
+    return removed
+
+
+async def main(dry_run: bool, grace_seconds: int):
+    await Tortoise.init(config=TORTOISE_ORM)
+    await collect_media_garbage(dry_run=dry_run, grace_seconds=grace_seconds)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Remove content-addressed media blobs no row references.')
+    parser.add_argument('--dry-run', action='store_true', help='only list what would be removed')
+    parser.add_argument('--grace-seconds', type=int, default=None, help='keep blobs newer than this')
+    args = parser.parse_args()
+    run_async(main(args.dry_run, args.grace_seconds))
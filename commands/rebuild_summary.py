@@ -0,0 +1,13 @@
+from tortoise import Tortoise, run_async
+from core.tortoise_config import TORTOISE_ORM
+from engine.summary import rebuild_application_summary
+
+
+async def main():
+    await Tortoise.init(config=TORTOISE_ORM)
+    keys = await rebuild_application_summary()
+    print(f"[INFO] Application summary rebuilt: {keys} rows")
+
+
+if __name__ == '__main__':
+    run_async(main())
@@ -0,0 +1,24 @@
+import argparse
+from tortoise import Tortoise, run_async
+from core.config import settings
+from core.tortoise_config import TORTOISE_ORM
+from jobs.worker import WorkerPool, run_pending_jobs
+
+
+async def main(concurrency: int, once: bool):
+    await Tortoise.init(config=TORTOISE_ORM)
+    if once:
+        count = await run_pending_jobs()
+        print(f"[INFO] {count} jobs run")
+        return
+
+    print(f"[INFO] Running jobs with {concurrency} workers")
+    await WorkerPool(concurrency).run_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run queued background jobs.')
+    parser.add_argument('--concurrency', type=int, default=max(settings.JOBS_IN_PROCESS_WORKERS, 1), help='jobs run at once')
+    parser.add_argument('--once', action='store_true', help='run the jobs that are due, then exit')
+    args = parser.parse_args()
+    run_async(main(args.concurrency, args.once))
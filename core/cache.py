@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """In-process LRU cache with a per-entry TTL and a version counter.
+
+    ``invalidate()`` bumps the version, which drops every entry at once and
+    stops loads that started before the bump from writing stale values back.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None, version: int = None):
+        # A load that started before the last invalidation must not be stored
+        if version is not None and version != self.version:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key, loader):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        version = self.version
+        value = await loader()
+        self.set(key, value, version=version)
+        return value
+
+    def discard_where(self, predicate):
+        self.version += 1
+        for key in [key for key, (value, _) in self._entries.items() if predicate(value)]:
+            del self._entries[key]
+
+    def invalidate(self):
+        self.version += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            'version': self.version,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
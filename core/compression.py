@@ -0,0 +1,247 @@
+import gzip
+import mimetypes
+import os
+import stat
+import zlib
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+''' Response compression
+
+CompressionMiddleware compresses responses of at least minimum_size bytes
+whose content type is in the allowlist, with brotli when it is installed
+and the client accepts it, gzip otherwise. Responses that already carry a
+Content-Encoding pass through untouched, which is how PrecompressedStaticFiles
+serves the .br/.gz variants precompress() writes next to an upload.
+'''
+
+# Encoding, file suffix of its precompressed variant, in order of preference
+VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+# Never compressed, even when on the allowlist: events must not wait in a compressor
+EXCLUDED_CONTENT_TYPES = ('text/event-stream',)
+
+
+def accepted_encodings(header: str) -> set:
+    # Codings listed in Accept-Encoding, minus the ones refused with q=0
+    encodings = set()
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+def is_compressible(content_type: str, content_types=None) -> bool:
+    content_types = tuple(settings.COMPRESSION_CONTENT_TYPES if content_types is None else content_types)
+    return bool(content_type) and content_type.lower().startswith(content_types)
+
+
+class GzipCompressor:
+    # Same process/flush/finish interface as brotli.Compressor
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionResponder:
+    """Compresses one response, deciding on its first body chunk.
+
+    The response start is held back until then: responses with a
+    Content-Encoding of their own, a type off the allowlist, or a single
+    body shorter than minimum_size are sent as they are.
+    """
+
+    def __init__(self, app: ASGIApp, encoding: str, compressor, minimum_size: int, content_types: tuple):
+        self.app = app
+        self.encoding = encoding
+        self.compressor = compressor
+        self.minimum_size = minimum_size
+        self.content_types = content_types
+        self.send = None
+        self.initial_message = None
+        self.compressing = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self.initial_message['headers'])
+        content_type = headers.get('content-type', '').lower()
+        if 'content-encoding' in headers or content_type.startswith(EXCLUDED_CONTENT_TYPES):
+            return False
+        if not is_compressible(content_type, self.content_types):
+            return False
+        return more_body or len(body) >= self.minimum_size
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        # Streamed chunks reach the client as they are produced
+        compressed = self.compressor.process(body)
+        return compressed + (self.compressor.flush() if more_body else self.compressor.finish())
+
+    async def send_compressed(self, message: Message):
+        if message['type'] == 'http.response.start':
+            self.initial_message = message
+            return
+
+        if self.compressing is None:
+            if message['type'] != 'http.response.body':
+                self.compressing = False
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            more_body = message.get('more_body', False)
+            self.compressing = self.should_compress(message.get('body', b''), more_body)
+            if self.compressing:
+                message = {**message, 'body': self.compress(message.get('body', b''), more_body)}
+                headers = MutableHeaders(raw=self.initial_message['headers'])
+                headers.add_vary_header('Accept-Encoding')
+                headers['Content-Encoding'] = self.encoding
+                if more_body:
+                    del headers['Content-Length']
+                else:
+                    headers['Content-Length'] = str(len(message['body']))
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if self.compressing and message['type'] == 'http.response.body':
+            message = {**message, 'body': self.compress(message.get('body', b''), message.get('more_body', False))}
+        await self.send(message)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = None,
+        content_types=None,
+        gzip_level: int = None,
+        brotli_quality: int = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.content_types = tuple(settings.COMPRESSION_CONTENT_TYPES if content_types is None else content_types)
+        self.gzip_level = settings.COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level
+        self.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encodings = accepted_encodings(Headers(scope=scope).get('accept-encoding', ''))
+        if 'br' in encodings and brotli is not None:
+            encoding, compressor = 'br', brotli.Compressor(quality=self.brotli_quality)
+        elif 'gzip' in encodings:
+            encoding, compressor = 'gzip', GzipCompressor(self.gzip_level)
+        else:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(self.app, encoding, compressor, self.minimum_size, self.content_types)
+        await responder(scope, receive, send)
+
+
+def available_variants():
+    return [(encoding, suffix) for encoding, suffix in VARIANTS if encoding != 'br' or brotli is not None]
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def precompress_file(path: str) -> list:
+    """Write the .br/.gz variants of a compressible file, returning their paths.
+
+    A variant is only kept when it saves at least PRECOMPRESS_MIN_SAVING of
+    the size, so already-compressed formats never get one. Variants newer
+    than the file are left as they are.
+    """
+    content_type, _ = mimetypes.guess_type(path)
+    if not is_compressible(content_type) or os.path.getsize(path) < settings.COMPRESSION_MINIMUM_SIZE:
+        return []
+
+    written = []
+    mtime = os.path.getmtime(path)
+    data = None
+    for encoding, suffix in available_variants():
+        variant = path + suffix
+        if os.path.exists(variant) and os.path.getmtime(variant) >= mtime:
+            written.append(variant)
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        compressed = _compress(data, encoding)
+        if len(compressed) > len(data) * (1 - settings.PRECOMPRESS_MIN_SAVING):
+            continue
+        tmp_path = f'{variant}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, variant)
+        written.append(variant)
+    return written
+
+
+async def precompress(path: str) -> list:
+    return await to_thread.run_sync(precompress_file, path)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that answers with a .br/.gz variant when the client accepts it."""
+
+    async def get_response(self, path: str, scope: Scope):
+        if scope['method'] in ('GET', 'HEAD'):
+            encodings = accepted_encodings(Headers(scope=scope).get('accept-encoding', ''))
+            for encoding, suffix in VARIANTS:
+                if encoding not in encodings:
+                    continue
+                full_path, stat_result = await to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                    continue
+                return self.variant_response(full_path, stat_result, scope, path, encoding)
+        return await super().get_response(path, scope)
+
+    def variant_response(self, full_path, stat_result, scope: Scope, path: str, encoding: str):
+        response = self.file_response(full_path, stat_result, scope)
+        if isinstance(response, FileResponse):
+            # Describe the original file, not the .br/.gz one
+            media_type, _ = mimetypes.guess_type(path)
+            response.media_type = media_type or 'application/octet-stream'
+            if response.media_type.startswith('text/'):
+                response.headers['content-type'] = f'{response.media_type}; charset=utf-8'
+            else:
+                response.headers['content-type'] = response.media_type
+            response.headers['content-encoding'] = encoding
+        response.headers['vary'] = 'Accept-Encoding'
+        return response
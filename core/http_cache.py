@@ -0,0 +1,138 @@
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Depends, HTTPException, Request, Response
+from tortoise import timezone
+from .config import settings
+from .metrics import untracked_queries
+from .models import TableVersion
+
+
+BUMP_VERSIONS_SQL = '''INSERT INTO "{table}" ("name", "version", "modified_at") VALUES {values}
+ON CONFLICT ("name") DO UPDATE SET
+    "version" = "{table}"."version" + 1,
+    "modified_at" = excluded."modified_at"'''
+
+
+class TableVersions:
+    """Version counter and modification time per table, kept in the database.
+
+    Writers ``await bump()`` after their write, never before it: a GET in
+    between may see new rows under the old validators, which only costs a
+    client one more full response. The rows are shared by every worker
+    process and command, so a write anywhere changes the validators
+    everywhere.
+
+    Reads come from a snapshot of the whole table that each process reloads
+    at most every TABLE_VERSION_POLL_SECONDS, so a conditional GET normally
+    runs no query. A write in this process is seen on the next read; one in
+    another process up to the poll interval later. ``watch()`` lets the
+    in-process caches drop their entries when a table they hold changes.
+    """
+
+    def __init__(self):
+        # name -> (version, modified_at as a timestamp)
+        self._versions = {}
+        self._loaded_at = None
+        self._watchers = []
+
+    def watch(self, tables, callback):
+        # callback() runs when one of the tables changes, in this process or another one
+        self._watchers.append((frozenset(tables), callback))
+
+    def reset(self):
+        # Forget the snapshot, e.g. when the database is replaced under the process
+        self._versions = {}
+        self._loaded_at = None
+
+    async def refresh(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < settings.TABLE_VERSION_POLL_SECONDS:
+            return
+        # Once per poll interval for the process, not the request that happens to run it
+        with untracked_queries():
+            rows = await TableVersion.all().values_list('name', 'version', 'modified_at')
+        versions = {name: (version, modified_at.timestamp()) for name, version, modified_at in rows}
+        changed = {name for name in versions.keys() | self._versions.keys() if versions.get(name) != self._versions.get(name)}
+        self._versions, self._loaded_at = versions, time.monotonic()
+        for tables, callback in self._watchers:
+            if tables & changed:
+                callback()
+
+    async def bump(self, *tables: str, using_db=None):
+        # One statement whether or not the rows exist yet
+        tables = sorted(set(tables))
+        db = using_db or TableVersion._choose_db(for_write=True)
+        if db.capabilities.dialect == 'postgres':
+            values = ', '.join(f'(${n * 2 + 1}, 1, ${n * 2 + 2})' for n in range(len(tables)))
+        else:
+            values = ', '.join(['(?, 1, ?)'] * len(tables))
+        now = timezone.now()
+        await db.execute_query(
+            BUMP_VERSIONS_SQL.format(table=TableVersion._meta.db_table, values=values),
+            [value for table in tables for value in (table, now)],
+        )
+        # This process reads its own write on the next request
+        self._loaded_at = None
+
+    async def validators(self, tables) -> tuple:
+        # (ETag, Last-Modified timestamp); no Last-Modified before the first write
+        await self.refresh()
+        rows = [self._versions[table] for table in tables if table in self._versions]
+        versions = '.'.join(str(self._versions[table][0]) if table in self._versions else '0' for table in tables)
+        if not rows:
+            return f'W/"{versions}"', None
+        # The time tells versions of a recreated database apart
+        last_modified = max(modified_at for _, modified_at in rows)
+        return f'W/"{versions}-{int(last_modified)}"', last_modified
+
+
+table_versions = TableVersions()
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as RFC 9110 asks for If-None-Match
+    if header.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(candidate.strip().removeprefix('W/') == opaque for candidate in header.split(','))
+
+
+def _not_modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # Last-Modified only has whole seconds
+    return int(last_modified) <= since
+
+
+def conditional_get(*tables: str):
+    """Dependency for GETs whose body only depends on ``tables``.
+
+    Sets ETag, Last-Modified and Cache-Control, and raises a 304 before the
+    route runs when the client's copy is current, usually without a query. Returns the headers for
+    routes that build their own Response.
+    """
+
+    async def dependency(request: Request, response: Response) -> dict:
+        etag, last_modified = await table_versions.validators(tables)
+        headers = {'ETag': etag, 'Cache-Control': f'public, max-age={settings.HTTP_CACHE_MAX_AGE}'}
+        if last_modified is not None:
+            headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request.headers.get('if-modified-since')
+            not_modified = (
+                if_modified_since is not None and last_modified is not None
+                and _not_modified_since(if_modified_since, last_modified)
+            )
+
+        if not_modified:
+            raise HTTPException(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return headers
+
+    return Depends(dependency)
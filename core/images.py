@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from .config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+
+''' Image derivatives
+
+Uploaded images get two WebP copies next to the original: a list-card
+thumbnail (<path>.thumb.webp) and a web-sized copy (<path>.web.webp). They
+are made after the response is sent, in a small process pool since resizing
+holds the GIL, and written to the row's image_thumbnail / image_webp columns
+once ready. Without Pillow installed uploads simply get no derivatives.
+'''
+
+logger = logging.getLogger(__name__)
+
+# Column, file suffix, and setting with the longest side in pixels
+DERIVATIVES = (
+    ('image_thumbnail', '.thumb.webp', 'IMAGE_THUMBNAIL_SIZE'),
+    ('image_webp', '.web.webp', 'IMAGE_WEB_MAX_SIZE'),
+)
+
+_executor = None
+
+
+def image_executor() -> ProcessPoolExecutor:
+    # Spawned lazily, and not forked, so workers don't inherit the event loop's threads
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+def shutdown_image_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def make_derivatives(path: str, sizes: dict, quality: int) -> dict:
+    """Write the WebP derivatives of the image at ``path``; runs in a worker process.
+
+    Derivatives newer than the original are reused, which is the common case
+    for content-addressed uploads of an image that is already stored.
+    """
+    mtime = os.path.getmtime(path)
+    derivatives = {}
+    image = None
+    try:
+        for field, suffix, _ in DERIVATIVES:
+            target = path + suffix
+            derivatives[field] = target
+            if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                continue
+            if image is None:
+                image = Image.open(path)
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA' if image.mode in ('LA', 'P', 'PA') else 'RGB')
+            copy = image.copy()
+            # Only ever shrinks, keeping the aspect ratio
+            copy.thumbnail((sizes[field], sizes[field]), Image.Resampling.LANCZOS)
+            # A temp file of its own, so two workers making the same derivative never write into one file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=os.path.basename(target), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as tmp_file:
+                    copy.save(tmp_file, 'WEBP', quality=quality, method=4)
+                os.replace(tmp_path, target)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+    finally:
+        if image is not None:
+            image.close()
+    return derivatives
+
+
+async def generate_image_derivatives(model, pk: int, path: str, on_saved=None):
+    """Background task: make the derivatives of ``path`` and record them on the row.
+
+    The row is only updated if its image is still ``path``, so a slow job
+    never overwrites the derivatives of a newer upload. ``on_saved`` is
+    awaited afterwards, for the caches that serve the row.
+    """
+    if Image is None or not path:
+        return
+
+    sizes = {field: getattr(settings, setting) for field, _, setting in DERIVATIVES}
+    try:
+        derivatives = await asyncio.get_running_loop().run_in_executor(
+            image_executor(), make_derivatives, path, sizes, settings.IMAGE_WEBP_QUALITY
+        )
+    except Exception:
+        logger.exception('Could not make image derivatives of %s', path)
+        return
+
+    if await model.filter(id=pk, image=path).update(**derivatives) and on_saved is not None:
+        await on_saved()
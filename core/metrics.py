@@ -0,0 +1,275 @@
+import asyncio
+import functools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send
+from tortoise.backends.base.client import BaseDBAsyncClient
+from .config import settings
+from .querycheck import check_request
+from .security import password_hash_stats
+
+
+''' Request metrics
+
+MetricsMiddleware times every request and, through the query hook on the
+Tortoise clients, counts the SQL statements it runs and the time spent in
+them. Per-route histograms, event-loop lag and the in-process caches are
+exposed in Prometheus text format on /metrics, and each response carries
+a Server-Timing header with its own numbers.
+'''
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [count per bucket (+Inf last), sum, count]
+        self._series = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            labels = ''.join(f'{name}="{_escape(value)}",' for name, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+            labels = labels.rstrip(',')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}' if labels else f'{self.name}_sum {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}' if labels else f'{self.name}_count {count}')
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _gauge(name: str, documentation: str, samples: list, kind: str = 'gauge') -> list:
+    # samples: (labels dict, value)
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        rendered = ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+        lines.append(f'{name}{{{rendered}}} {value}' if rendered else f'{name} {value}')
+    return lines
+
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Time to the end of the response body.', ('method', 'route', 'status'),
+)
+request_queries = Histogram(
+    'http_request_db_queries', 'SQL statements run per request.', ('method', 'route'), QUERY_COUNT_BUCKETS,
+)
+request_db_duration = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL statements per request.', ('method', 'route'),
+)
+event_loop_lag = Histogram(
+    'event_loop_lag_seconds', 'How late a periodic timer on the event loop fires.', (), LAG_BUCKETS,
+)
+
+# In-process TTLCaches reported on /metrics, by name
+CACHES = {}
+
+
+def register_cache(name: str, cache):
+    CACHES[name] = cache
+
+
+''' Query hook '''
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_seconds', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = []
+
+
+current_request_stats = ContextVar('current_request_stats', default=None)
+# Set while a statement runs, so a client method calling another one counts once
+_in_query = ContextVar('in_query', default=False)
+
+EXECUTE_METHODS = ('execute_query', 'execute_query_dict', 'execute_insert', 'execute_many', 'execute_script')
+
+
+def _timed(method):
+    @functools.wraps(method)
+    async def execute(self, query, *args, **kwargs):
+        stats = current_request_stats.get()
+        if stats is None or _in_query.get():
+            return await method(self, query, *args, **kwargs)
+
+        token = _in_query.set(True)
+        started = time.perf_counter()
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_query.reset(token)
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            stats.statements.append((query, elapsed))
+
+    execute.__metrics_wrapped__ = True
+    return execute
+
+
+@contextmanager
+def untracked_queries():
+    # For shared work a request only happens to trigger, like a periodic refresh:
+    # its statements are not charged to that request
+    token = current_request_stats.set(None)
+    try:
+        yield
+    finally:
+        current_request_stats.reset(token)
+
+
+def _client_classes(cls=BaseDBAsyncClient):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _client_classes(subclass)
+
+
+def install_query_hook():
+    """Wrap the execute methods of every loaded Tortoise client class.
+
+    Methods are wrapped where they are defined, which covers overrides such
+    as the transaction wrappers' execute_many. Safe to call again after more
+    backends have been imported.
+    """
+    # Backends are imported lazily by Tortoise.init; load the ones this app uses first
+    import tortoise.backends.sqlite.client  # noqa: F401
+    try:
+        import tortoise.backends.asyncpg.client  # noqa: F401
+    except ImportError:
+        pass
+
+    for cls in {BaseDBAsyncClient, *_client_classes()}:
+        for name in EXECUTE_METHODS:
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, '__metrics_wrapped__', False):
+                setattr(cls, name, _timed(method))
+
+
+''' Middleware '''
+
+
+def route_label(scope: Scope) -> str:
+    # The path template, so /api/course/1 and /api/course/2 share a series
+    route = scope.get('route')
+    if route is not None:
+        return route.path_format
+    return scope.get('root_path') or 'unmatched'
+
+
+def server_timing(total: float, stats: RequestStats) -> str:
+    return f'app;dur={total * 1000:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            recorded = True
+            route, method = route_label(scope), scope['method']
+            request_duration.observe(time.perf_counter() - started, method, route, str(status))
+            request_queries.observe(stats.queries, method, route)
+            request_db_duration.observe(stats.db_seconds, method, route)
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if settings.QUERY_CHECK_MODE != 'off':
+                    # Before the response starts, so "raise" can still turn it into a 500
+                    check_request(scope.get('route'), f"{scope['method']} {route_label(scope)}", stats.statements)
+                if settings.METRICS_SERVER_TIMING:
+                    MutableHeaders(raw=message['headers']).append(
+                        'Server-Timing', server_timing(time.perf_counter() - started, stats)
+                    )
+            await send(message)
+            # Background tasks run after the last body message; they are not part of the request's time
+            if message['type'] == 'http.response.body' and not message.get('more_body', False) and not recorded:
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+            if not recorded:
+                record()
+
+
+async def monitor_event_loop_lag(interval: float = None):
+    interval = settings.METRICS_LOOP_LAG_INTERVAL_SECONDS if interval is None else interval
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(loop.time() - scheduled, 0.0))
+
+
+''' /metrics '''
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in (request_duration, request_queries, request_db_duration, event_loop_lag):
+        lines.extend(histogram.render())
+
+    lines.extend(_gauge('password_hash_in_flight', 'bcrypt calls running or queued.', [({}, password_hash_stats['in_flight'])]))
+    lines.extend(_gauge('password_hash_calls_total', 'bcrypt calls finished.', [({}, password_hash_stats['calls'])], 'counter'))
+    lines.extend(_gauge('password_hash_rejected_total', 'bcrypt calls refused with a 503.', [({}, password_hash_stats['rejected'])], 'counter'))
+    lines.extend(_gauge('password_hash_seconds_total', 'Time spent in bcrypt calls.', [({}, password_hash_stats['total_seconds'])], 'counter'))
+    lines.extend(_gauge('password_hash_max_seconds', 'Slowest bcrypt call.', [({}, password_hash_stats['max_seconds'])]))
+
+    caches = [(name, cache.stats()) for name, cache in sorted(CACHES.items())]
+    for key, kind in (('hits', 'counter'), ('misses', 'counter'), ('evictions', 'counter'), ('size', 'gauge')):
+        name = f'cache_{key}_total' if kind == 'counter' else f'cache_{key}'
+        lines.extend(_gauge(name, f'In-process cache {key}.', [({'cache': cache}, stats[key]) for cache, stats in caches], kind))
+
+    return '\n'.join(lines) + '\n'
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get('/metrics', include_in_schema=False)
+async def metrics(request: Request):
+    if settings.METRICS_TOKEN and request.headers.get('authorization') != f'Bearer {settings.METRICS_TOKEN}':
+        raise HTTPException(status_code=401, detail='Unauthorized access!')
+    return PlainTextResponse(render_metrics(), media_type='text/plain; version=0.0.4')
@@ -0,0 +1,11 @@
+from tortoise import fields, models
+
+
+class TableVersion(models.Model):
+    # One row per table whose GETs carry validators; see core.http_cache
+    name = fields.CharField(100, pk=True)
+    version = fields.IntField(default=0)
+    modified_at = fields.DatetimeField()
+
+    def __str__(self):
+        return f'{self.name} v{self.version}'
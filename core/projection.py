@@ -0,0 +1,50 @@
+import typing
+from pydantic import BaseModel
+
+
+def _nested_schema(annotation):
+    # X or Optional[X] where X is a response schema; lists are not projected
+    if typing.get_origin(annotation) not in (None, typing.Union):
+        return None
+    for candidate in (annotation, *typing.get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+class Projection:
+    """Reads the rows of a response schema with one flat ``.values()`` query.
+
+    Every scalar field of the schema, nested ones included, becomes a
+    ``relation__field`` path; ``nest()`` folds a row back into the schema's
+    shape, with a relation set to None when its id is None. The result is
+    plain dicts that can be JSON-encoded without going through pydantic.
+    """
+
+    def __init__(self, schema: typing.Type[BaseModel]):
+        self.schema = schema
+        self.paths = []
+        self._tree = self._build(schema, '')
+
+    def _build(self, schema, prefix: str) -> list:
+        tree = []
+        for name, field in schema.model_fields.items():
+            nested = _nested_schema(field.annotation)
+            if nested is None:
+                self.paths.append(prefix + name)
+                tree.append((name, prefix + name, None))
+            else:
+                tree.append((name, f'{prefix}{name}__id', self._build(nested, f'{prefix}{name}__')))
+        return tree
+
+    def _nest(self, row: dict, tree: list) -> dict:
+        return {
+            name: row[path] if children is None else (self._nest(row, children) if row[path] is not None else None)
+            for name, path, children in tree
+        }
+
+    def nest(self, row: dict) -> dict:
+        return self._nest(row, self._tree)
+
+    async def load(self, queryset) -> list:
+        return [self.nest(row) for row in await queryset.values(*self.paths)]
@@ -0,0 +1,53 @@
+import pytest
+
+
+''' pytest fixtures for query checks
+
+Load with `pytest -p core.pytest_plugin`. Every test then runs with
+QUERY_CHECK_MODE="raise", so a request repeating a statement shape or
+going over its route's budget fails with a 500 instead of passing quietly.
+
+core.config is only imported once a test runs, so a conftest.py can still
+set DATABASE_URL and the other settings in the environment.
+'''
+
+
+@pytest.fixture(autouse=True)
+def query_check_mode():
+    from .config import settings
+
+    previous = settings.QUERY_CHECK_MODE, settings.METRICS_ENABLED
+    settings.QUERY_CHECK_MODE, settings.METRICS_ENABLED = 'raise', True
+    yield
+    settings.QUERY_CHECK_MODE, settings.METRICS_ENABLED = previous
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Check code called outside of a request, like a crud function.
+
+        with assert_max_queries(2):
+            await retrieve_course(1)
+    """
+    def assert_max(budget: int):
+        return _AssertMaxQueries(budget)
+    return assert_max
+
+
+class _AssertMaxQueries:
+    def __init__(self, budget: int):
+        from .querycheck import capture_queries
+
+        self.budget = budget
+        self._capture = capture_queries()
+
+    def __enter__(self):
+        self.stats = self._capture.__enter__()
+        return self.stats
+
+    def __exit__(self, *exc_info):
+        from .querycheck import check_queries
+
+        self._capture.__exit__(*exc_info)
+        if exc_info[0] is None:
+            check_queries('block', self.stats.statements, self.budget, 'raise')
@@ -0,0 +1,105 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from .config import settings
+
+
+''' N+1 query detection
+
+With QUERY_CHECK_MODE set to "log" or "raise", MetricsMiddleware passes
+the statements of every request through check_queries() before the
+response starts. It reports a statement shape (the SQL with its literals
+and IN lists folded) repeated more than QUERY_REPEAT_THRESHOLD times,
+which is what a relation loaded once per row looks like, and a request
+running more statements than the budget registered for its route. "raise"
+turns the response into a 500, which is what tests want.
+'''
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_POSITIONAL = re.compile(r'\$\d+')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+# (module, endpoint name) -> most statements one request may run
+QUERY_BUDGETS = {}
+# (module, endpoint name) of routes whose statement count grows with their input by design, like imports
+QUERY_CHECK_EXEMPT = set()
+
+
+class QueryCheckFailed(Exception):
+    pass
+
+
+def normalize_sql(sql: str) -> str:
+    sql = _STRING.sub('?', sql)
+    sql = _POSITIONAL.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(?...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def repeated_shapes(statements, threshold: int = None) -> list:
+    threshold = settings.QUERY_REPEAT_THRESHOLD if threshold is None else threshold
+    shapes = Counter(normalize_sql(sql) for sql, _ in statements)
+    return [(shape, count) for shape, count in shapes.most_common() if count > threshold]
+
+
+def register_query_budgets(module: str, budgets: dict, exempt=()):
+    for endpoint, budget in budgets.items():
+        QUERY_BUDGETS[(module, endpoint)] = budget
+    QUERY_CHECK_EXEMPT.update((module, endpoint) for endpoint in exempt)
+
+
+def _route_key(route):
+    endpoint = getattr(route, 'endpoint', None)
+    return (endpoint.__module__, endpoint.__name__) if endpoint is not None else None
+
+
+def query_problems(statements, budget: int = None) -> list:
+    problems = [f'{count}x {shape}' for shape, count in repeated_shapes(statements)]
+    if budget is not None and len(statements) > budget:
+        problems.insert(0, f'{len(statements)} queries, budget is {budget}')
+    return problems
+
+
+def check_queries(label: str, statements, budget: int = None, mode: str = None):
+    mode = settings.QUERY_CHECK_MODE if mode is None else mode
+    if mode not in ('log', 'raise'):
+        return
+    problems = query_problems(statements, budget)
+    if not problems:
+        return
+    message = f'{label}: ' + '; '.join(problems)
+    if mode == 'raise':
+        raise QueryCheckFailed(message)
+    logger.warning('Query check failed for %s', message)
+
+
+def check_request(route, label: str, statements):
+    key = _route_key(route)
+    if key in QUERY_CHECK_EXEMPT:
+        return
+    check_queries(label, statements, QUERY_BUDGETS.get(key))
+
+
+@contextmanager
+def capture_queries():
+    """Collect the statements run inside the block, outside of a request too.
+
+        with capture_queries() as stats:
+            await retrieve_course(1)
+        assert stats.queries <= 2
+    """
+    from .metrics import RequestStats, current_request_stats, install_query_hook
+
+    install_query_hook()
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request_stats.reset(token)
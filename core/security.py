@@ -1,16 +1,67 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
+from fastapi import HTTPException
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
 from .config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps it off the event loop
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
+password_hash_stats = {
+    "in_flight": 0,
+    "calls": 0,
+    "rejected": 0,
+    "total_seconds": 0.0,
+    "max_seconds": 0.0,
+    "last_seconds": 0.0,
+}
+
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+
+async def run_password_job(func, *args):
+    # Fail fast instead of queueing behind a burst of logins
+    if password_hash_stats["in_flight"] >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+        password_hash_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again.",
+            headers={"Retry-After": "1"},
+        )
+
+    password_hash_stats["in_flight"] += 1
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+    finally:
+        elapsed = time.perf_counter() - started
+        password_hash_stats["in_flight"] -= 1
+        password_hash_stats["calls"] += 1
+        password_hash_stats["total_seconds"] += elapsed
+        password_hash_stats["last_seconds"] = elapsed
+        password_hash_stats["max_seconds"] = max(password_hash_stats["max_seconds"], elapsed)
+
+
+async def verify_password_async(plain_password, hashed_password):
+    return await run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await run_password_job(get_password_hash, password)
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
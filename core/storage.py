@@ -0,0 +1,111 @@
+import hashlib
+import os
+import re
+import time
+import uuid
+import anyio
+from anyio import to_thread
+from .config import settings
+
+
+''' Content-addressed media store
+
+Blobs live at media/<media_dir>/<h[:2]>/<h[2:4]>/<h>.<ext>, where h is the
+sha256 of the file content, so the same passport uploaded for several
+applications is stored once. Uploads are hashed while they stream into
+media/<media_dir>/.tmp/ and then moved into place.
+'''
+
+MEDIA_ROOT = 'media'
+TMP_DIR = '.tmp'
+BLOB_NAME = re.compile(r'^[0-9a-f]{64}(\.[\w-]+)?$')
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+async def stream_to_file(file, path: anyio.Path, max_size_bytes: int, hasher=None) -> int:
+    # Reads and writes run in worker threads; the size limit is enforced per chunk
+    written = 0
+    try:
+        await file.seek(0)
+        async with await anyio.open_file(path, 'wb') as buffer:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_size_bytes:
+                    raise UploadTooLarge()
+                if hasher is not None:
+                    await to_thread.run_sync(hasher.update, chunk)
+                await buffer.write(chunk)
+    except BaseException:
+        await path.unlink(missing_ok=True)
+        raise
+    return written
+
+
+def blob_path(media_dir: str, digest: str, extension: str) -> anyio.Path:
+    extension = re.sub(r'[^\w-]', '', extension).lower() or 'bin'
+    return anyio.Path(MEDIA_ROOT, media_dir, digest[:2], digest[2:4], f'{digest}.{extension}')
+
+
+async def store_blob(file, media_dir: str, extension: str, max_size_bytes: int) -> str:
+    tmp_dir = anyio.Path(MEDIA_ROOT, media_dir, TMP_DIR)
+    await tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / uuid.uuid4().hex
+
+    hasher = hashlib.sha256()
+    await stream_to_file(file, tmp_path, max_size_bytes, hasher)
+
+    path = blob_path(media_dir, hasher.hexdigest(), extension)
+    if await path.exists():
+        # Same content already stored; refresh mtime so GC's grace period restarts
+        await tmp_path.unlink(missing_ok=True)
+        await to_thread.run_sync(os.utime, path)
+    else:
+        await path.parent.mkdir(parents=True, exist_ok=True)
+        await to_thread.run_sync(os.replace, tmp_path, path)
+
+    return str(path)
+
+
+def iter_blobs(media_dir: str):
+    root = os.path.join(MEDIA_ROOT, media_dir)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name != TMP_DIR]
+        for filename in filenames:
+            if BLOB_NAME.match(filename):
+                yield os.path.join(dirpath, filename)
+
+
+def iter_stale_tmp_files(media_dir: str, older_than: float):
+    tmp_dir = os.path.join(MEDIA_ROOT, media_dir, TMP_DIR)
+    if not os.path.isdir(tmp_dir):
+        return
+    for filename in os.listdir(tmp_dir):
+        path = os.path.join(tmp_dir, filename)
+        if os.path.getmtime(path) < older_than:
+            yield path
+
+
+def variant_paths(path: str) -> list:
+    # Precompressed copies and image derivatives stored next to a file
+    suffixes = ('.br', '.gz', '.thumb.webp', '.web.webp')
+    return [path + suffix for suffix in suffixes if os.path.exists(path + suffix)]
+
+
+def normalize_media_path(path: str) -> str:
+    return os.path.normpath(path.replace('\\', '/')) if path else path
+
+
+def collect_orphans(media_dir: str, references: set, grace_seconds: int) -> list:
+    # Blobs younger than the grace period may belong to an upload whose row isn't saved yet
+    older_than = time.time() - grace_seconds
+    orphans = [
+        path for path in iter_blobs(media_dir)
+        if normalize_media_path(path) not in references and os.path.getmtime(path) < older_than
+    ]
+    # Precompressed variants and image derivatives go with their blob
+    orphans.extend(variant for path in list(orphans) for variant in variant_paths(path))
+    orphans.extend(iter_stale_tmp_files(media_dir, older_than))
+    return orphans
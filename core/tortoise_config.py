@@ -1,9 +1,82 @@
+from tortoise import connections
+from tortoise.backends.base.client import TransactionalDBClient
+from tortoise.backends.base.config_generator import expand_db_url
+from .config import settings
+
+
+SQLITE_ENGINE = "tortoise.backends.sqlite"
+
+
+def sqlite_connection(read_only: bool = False) -> dict:
+    config = expand_db_url(settings.DATABASE_URL)
+    credentials = config["credentials"]
+
+    if settings.SQLITE_PERFORMANCE_PROFILE:
+        # Every key is applied as "PRAGMA key=value" when the connection opens
+        credentials.update({
+            "journal_mode": settings.SQLITE_JOURNAL_MODE,
+            "synchronous": settings.SQLITE_SYNCHRONOUS,
+            "cache_size": settings.SQLITE_CACHE_SIZE,
+            "mmap_size": settings.SQLITE_MMAP_SIZE,
+            "temp_store": settings.SQLITE_TEMP_STORE,
+            "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        })
+
+    if read_only:
+        credentials["query_only"] = "ON"
+
+    return config
+
+
+def postgres_connection() -> dict:
+    # postgres:// and asyncpg:// URLs both resolve to the asyncpg backend
+    config = expand_db_url(settings.DATABASE_URL)
+    credentials = config["credentials"]
+    credentials.update({
+        "minsize": settings.DB_POOL_MIN_SIZE,
+        "maxsize": settings.DB_POOL_MAX_SIZE,
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)},
+    })
+    if settings.DB_COMMAND_TIMEOUT_SECONDS:
+        credentials["command_timeout"] = settings.DB_COMMAND_TIMEOUT_SECONDS
+    return config
+
+
+class ReadWriteRouter:
+    # Reads use their own connection, so they don't queue behind writes on
+    # the single "default" connection; WAL lets both run at the same time.
+
+    def db_for_read(self, model):
+        # Inside a transaction reads must see its uncommitted writes
+        if isinstance(connections.get("default"), TransactionalDBClient):
+            return "default"
+        return "read"
+
+    def db_for_write(self, model):
+        return "default"
+
+
+IS_SQLITE = expand_db_url(settings.DATABASE_URL)["engine"] == SQLITE_ENGINE
+
+routers = []
+if IS_SQLITE:
+    connections_config = {"default": sqlite_connection()}
+    # An in-memory database can't be shared between two connections
+    if settings.SQLITE_READ_CONNECTION and ":memory:" not in settings.DATABASE_URL:
+        connections_config["read"] = sqlite_connection(read_only=True)
+        routers.append("core.tortoise_config.ReadWriteRouter")
+else:
+    # Postgres serves concurrent readers and writers from one pool
+    connections_config = {"default": postgres_connection()}
+
+
 TORTOISE_ORM = {
-    "connections": {"default": "sqlite://db.sqlite3"},
+    "connections": connections_config,
     "apps": {
         "models": {
-            "models": ["users.models", "engine.models", "aerich.models"],
+            "models": ["users.models", "engine.models", "jobs.models", "core.models", "aerich.models"],
             "default_connection": "default",
         },
     },
+    "routers": routers,
 }
@@ -0,0 +1,107 @@
+import csv
+import io
+import tempfile
+from enum import Enum
+from typing import Optional
+from anyio import to_thread
+from core.config import settings
+from .models import AgentAdmissionApplication
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+
+''' Agent admission application export
+
+Applications are read as flat rows from one joined SELECT, a keyset chunk of
+EXPORT_CHUNK_SIZE ids at a time, so memory stays flat however many rows
+there are. CSV is written as it is read. XLSX needs openpyxl, which is
+optional; the workbook is built in write-only mode in a temporary file and
+streamed once it is complete.
+'''
+
+# (header, values() path)
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('agent', 'agent__username'),
+    ('agent_email', 'agent__email'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('email', 'email'),
+    ('phone', 'phone'),
+    ('passport_no', 'passport_no'),
+    ('last_graduation', 'last_graduation'),
+    ('status', 'status'),
+    ('country', 'country__name'),
+    ('course', 'course__name'),
+    ('course_type', 'course__course_type'),
+    ('course_university', 'course__university__name'),
+    ('university_one', 'university_one__name'),
+    ('university_two', 'university_two__name'),
+    ('university_three', 'university_three__name'),
+    ('student_fee', 'commission__student_fee'),
+    ('commission', 'commission__commission'),
+    ('commission_rate', 'commission__commission_rate'),
+]
+
+EXPORT_HEADERS = [header for header, _ in EXPORT_COLUMNS]
+EXPORT_FIELDS = [field for _, field in EXPORT_COLUMNS]
+
+
+def xlsx_available() -> bool:
+    return Workbook is not None
+
+
+async def iter_application_rows(agent_id: Optional[int] = None, status: Optional[str] = None):
+    # Yields lists of rows; keyset on id keeps every chunk an index range scan
+    queryset = AgentAdmissionApplication.all()
+    if agent_id is not None:
+        queryset = queryset.filter(agent_id=agent_id)
+    if status is not None:
+        queryset = queryset.filter(status=status)
+
+    last_id = 0
+    while True:
+        rows = await queryset.filter(id__gt=last_id).order_by('id').limit(settings.EXPORT_CHUNK_SIZE).values_list(*EXPORT_FIELDS)
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [[value.value if isinstance(value, Enum) else value for value in row] for row in rows]
+
+
+def _csv_text(rows: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_applications_csv(agent_id: Optional[int] = None, status: Optional[str] = None):
+    # The header goes out before the first query runs
+    yield _csv_text([EXPORT_HEADERS])
+    async for rows in iter_application_rows(agent_id, status):
+        yield _csv_text(rows)
+
+
+async def export_applications_xlsx(agent_id: Optional[int] = None, status: Optional[str] = None):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Applications')
+    sheet.append(EXPORT_HEADERS)
+
+    def append(rows):
+        for row in rows:
+            sheet.append(row)
+
+    async for rows in iter_application_rows(agent_id, status):
+        await to_thread.run_sync(append, rows)
+
+    # A zip can't be sent before it is finished; it is spooled to disk, then streamed
+    buffer = tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES)
+    try:
+        await to_thread.run_sync(workbook.save, buffer)
+        buffer.seek(0)
+        while chunk := await to_thread.run_sync(buffer.read, settings.UPLOAD_CHUNK_SIZE):
+            yield chunk
+    finally:
+        buffer.close()
@@ -0,0 +1,212 @@
+import csv
+import json
+from itertools import islice
+from anyio import to_thread
+from pydantic import ValidationError
+from fastapi import HTTPException
+from tortoise.transactions import in_transaction
+from core.config import settings
+from .models import AgentAdmissionApplication, AgentApplicationCommission, AgentApplicationDocuments, ApplicationStatus, Country, Course, University
+from .schemas import AgentAdmissionApplicationCreate
+from .cruds import APPLICATION_UNIVERSITY_FIELDS, validate_application_universities
+from .summary import application_summary_state, summary_changes, apply_summary_changes
+
+
+''' Agent admission application bulk import
+
+Rows are read from CSV or JSONL in chunks of BULK_IMPORT_CHUNK_SIZE. Every
+chunk resolves its countries, courses and universities with one id__in query
+each, and writes its applications, commission and documents rows with
+bulk_create inside a single transaction, together with the dashboard totals.
+Rows that fail are reported and skipped.
+'''
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(filename: str):
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension in ('csv', 'json'):
+        return extension
+    return None
+
+
+def read_records(stream, format: str):
+    # Yields (row number, data, error); row numbers are the source line numbers
+    if format not in IMPORT_FORMATS:
+        raise ValueError(f"unsupported format {format!r}, expected one of {', '.join(IMPORT_FORMATS)}")
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for data in reader:
+            yield reader.line_num, data, None
+        return
+
+    for line_num, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_num, None, f'invalid JSON: {e}'
+            continue
+        if not isinstance(data, dict):
+            yield line_num, None, 'expected a JSON object'
+            continue
+        yield line_num, data, None
+
+
+def _clean(data: dict) -> dict:
+    # Blank CSV cells mean "not given"
+    return {key: value for key, value in data.items() if key and value not in ('', None)}
+
+
+def _validation_errors(exc: ValidationError) -> list:
+    return [f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()]
+
+
+async def _reserve_application_ids(conn, count: int) -> list:
+    # bulk_create does not hand back generated ids, so they are allocated up front
+    # and the commission rows can point at their applications
+    table = AgentAdmissionApplication._meta.db_table
+    if conn.capabilities.dialect == 'postgres':
+        rows = await conn.execute_query_dict(
+            f"SELECT nextval(pg_get_serial_sequence('{table}', 'id')) AS id FROM generate_series(1, $1)",
+            [count],
+        )
+        return [row['id'] for row in rows]
+
+    # SQLite: take the write lock first with a no-op write, so no other connection or process
+    # can insert an application until this transaction commits and the ids below stay free.
+    # sqlite_sequence keeps AUTOINCREMENT from reusing ids of deleted rows.
+    await conn.execute_query('UPDATE sqlite_sequence SET seq = seq WHERE name = ?', [table])
+    rows = await conn.execute_query_dict(
+        f'''SELECT MAX(
+            COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+            COALESCE((SELECT MAX(id) FROM "{table}"), 0)
+        ) AS last_id''',
+        [table],
+    )
+    start = rows[0]['last_id'] + 1
+    return list(range(start, start + count))
+
+
+async def _load_references(applications: list):
+    country_ids = {application.country_id for _, application in applications}
+    course_ids = {application.course_id for _, application in applications if application.course_id}
+    university_ids = {
+        getattr(application, f'{field}_id')
+        for _, application in applications
+        for field in APPLICATION_UNIVERSITY_FIELDS
+        if getattr(application, f'{field}_id')
+    }
+
+    countries = set(await Country.filter(id__in=country_ids).values_list('id', flat=True)) if country_ids else set()
+    courses = set(await Course.filter(id__in=course_ids).values_list('id', flat=True)) if course_ids else set()
+    universities = {}
+    if university_ids:
+        universities = {university.id: university for university in await University.filter(id__in=university_ids).select_related('country')}
+    return countries, courses, universities
+
+
+def _application_data(application, countries: set, courses: set, universities: dict):
+    if application.country_id not in countries:
+        return None, ['country_id: Country not found']
+    if application.course_id and application.course_id not in courses:
+        return None, ['course_id: Course not found']
+
+    selected = []
+    for field in APPLICATION_UNIVERSITY_FIELDS:
+        university_id = getattr(application, f'{field}_id')
+        if not university_id:
+            continue
+        if university_id not in universities:
+            return None, [f'{field}_id: University not found']
+        selected.append(universities[university_id])
+
+    try:
+        validate_application_universities(selected)
+    except HTTPException as e:
+        return None, [e.detail]
+
+    data = application.dict(exclude_none=True)
+    if 'status' in data:
+        try:
+            data['status'] = ApplicationStatus(data['status'])
+        except ValueError:
+            return None, [f"status: must be one of {', '.join(status.value for status in ApplicationStatus)}"]
+
+    return data, None
+
+
+async def import_chunk(records: list, agent_id: int, report: dict):
+    parsed = []
+    for row, data, error in records:
+        if error:
+            report['errors'].append({'row': row, 'errors': [error]})
+            continue
+        try:
+            parsed.append((row, AgentAdmissionApplicationCreate(**_clean(data))))
+        except ValidationError as e:
+            report['errors'].append({'row': row, 'errors': _validation_errors(e)})
+
+    if not parsed:
+        return
+
+    countries, courses, universities = await _load_references(parsed)
+
+    rows, valid = [], []
+    for row, application in parsed:
+        data, errors = _application_data(application, countries, courses, universities)
+        if errors:
+            report['errors'].append({'row': row, 'errors': errors})
+            continue
+        rows.append(row)
+        valid.append(data)
+
+    if not valid:
+        return
+
+    try:
+        async with in_transaction('default') as conn:
+            application_ids = await _reserve_application_ids(conn, len(valid))
+            applications = [
+                AgentAdmissionApplication(id=application_id, agent_id=agent_id, **data)
+                for application_id, data in zip(application_ids, valid)
+            ]
+            await AgentAdmissionApplication.bulk_create(applications, using_db=conn)
+            await AgentApplicationCommission.bulk_create(
+                [AgentApplicationCommission(admission_application_id=application.id) for application in applications],
+                using_db=conn,
+            )
+            await AgentApplicationDocuments.bulk_create(
+                [AgentApplicationDocuments(admission_application_id=application.id) for application in applications],
+                using_db=conn,
+            )
+            changes = None
+            for application in applications:
+                changes = summary_changes(after=application_summary_state(application), changes=changes)
+            await apply_summary_changes(changes, using_db=conn)
+    except Exception as e:
+        # The whole chunk was rolled back
+        report['errors'].extend({'row': row, 'errors': [f'not saved: {e}']} for row in rows)
+        return
+
+    report['created'] += len(applications)
+    report['application_ids'].extend(application.id for application in applications)
+
+
+async def import_agent_applications(stream, format: str, agent_id: int, chunk_size: int = None) -> dict:
+    # `stream` is a text file object; it is read in a worker thread one chunk at a time
+    chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK_SIZE
+    records = read_records(stream, format)
+    report = {'total': 0, 'created': 0, 'failed': 0, 'application_ids': [], 'errors': []}
+
+    while chunk := await to_thread.run_sync(lambda: list(islice(records, chunk_size))):
+        report['total'] += len(chunk)
+        await import_chunk(chunk, agent_id, report)
+
+    report['failed'] = len(report['errors'])
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
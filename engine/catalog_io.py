@@ -0,0 +1,331 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Optional
+from anyio import to_thread
+from pydantic import ValidationError
+from tortoise.transactions import in_transaction
+from core.config import settings
+from .models import Country, University, Course, VarsityType
+from .schemas import CatalogRow
+from .cruds import invalidate_catalog
+from .bulk_import import read_records, _clean, _validation_errors
+from . import search as course_search
+
+
+''' Catalog import/export
+
+The catalog travels as flat rows, one per course, with the university and
+country repeated on every row (a university or country without courses has a
+row with the lower columns blank). CSV and JSONL hold those rows directly; a
+JSON import may instead nest them as countries -> universities -> courses.
+
+Import upserts on natural keys: country name, university name within its
+country, and course name and type within its university. Every chunk of rows
+is written in one transaction, each level with one lookup query, one
+bulk_create and one bulk_update. Caches and the search index are refreshed
+once when the import is done.
+'''
+
+CATALOG_COLUMNS = [
+    'country', 'country_description',
+    'university', 'varsity_type', 'location', 'university_description', 'website_link',
+    'course', 'course_type', 'fee', 'course_description',
+]
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_FORMATS = ('csv', 'jsonl', 'json')
+
+COUNTRY_FIELDS = {'country': 'name', 'country_description': 'description'}
+UNIVERSITY_FIELDS = {
+    'university': 'name', 'varsity_type': 'varsity_type', 'location': 'location',
+    'university_description': 'description', 'website_link': 'website_link',
+}
+COURSE_FIELDS = {'course': 'name', 'course_type': 'course_type', 'fee': 'fee', 'course_description': 'description'}
+
+# Fields a row must carry to create the record; updates may leave them out
+NEW_UNIVERSITY_REQUIRED = ('location',)
+NEW_COURSE_REQUIRED = ('course_type', 'fee')
+
+EXPORT_COUNTRY_BATCH = 100
+
+
+def flatten_catalog_tree(countries: list):
+    for country in countries:
+        country_row = {'country': country.get('name'), 'country_description': country.get('description')}
+        universities = country.get('universities') or []
+        if not universities:
+            yield country_row
+        for university in universities:
+            university_row = {
+                **country_row,
+                'university': university.get('name'),
+                'varsity_type': university.get('varsity_type'),
+                'location': university.get('location'),
+                'university_description': university.get('description'),
+                'website_link': university.get('website_link'),
+            }
+            courses = university.get('courses') or []
+            if not courses:
+                yield university_row
+            for course in courses:
+                yield {
+                    **university_row,
+                    'course': course.get('name'),
+                    'course_type': course.get('course_type'),
+                    'fee': course.get('fee'),
+                    'course_description': course.get('description'),
+                }
+
+
+def read_catalog_records(stream, format: str):
+    if format != 'json':
+        yield from read_records(stream, format)
+        return
+
+    try:
+        tree = json.load(stream)
+    except ValueError as e:
+        yield 1, None, f'invalid JSON: {e}'
+        return
+    if isinstance(tree, dict):
+        tree = tree.get('countries', [])
+    for row, data in enumerate(flatten_catalog_tree(tree), 1):
+        yield row, data, None
+
+
+def _parse_row(data: dict):
+    try:
+        row = CatalogRow(**_clean(data))
+    except ValidationError as e:
+        return None, _validation_errors(e)
+
+    if row.course and not row.university:
+        return None, ['university: required when course is given']
+    return row, None
+
+
+def _fields(row: CatalogRow, columns: dict) -> dict:
+    # Only columns present in the row are written, so a partial row never blanks a field
+    return {field: getattr(row, column) for column, field in columns.items() if getattr(row, column) is not None}
+
+
+async def _upsert(model, conn, items: dict, lookup: dict, key, counts: dict, required: tuple = ()):
+    # Returns the ids by key, and the keys that were new but missing a required field
+    existing = {key(obj): obj for obj in await model.filter(**lookup).using_db(conn)}
+
+    created, updated, update_fields, rejected = [], [], set(), set()
+    for item_key, values in items.items():
+        obj = existing.get(item_key)
+        if obj is None:
+            if any(values.get(field) is None for field in required):
+                rejected.add(item_key)
+            else:
+                created.append(model(**values))
+            continue
+        changed = [field for field, value in values.items() if getattr(obj, field) != value]
+        if changed:
+            for field in changed:
+                setattr(obj, field, values[field])
+            updated.append(obj)
+            update_fields.update(changed)
+
+    if created:
+        await model.bulk_create(created, using_db=conn)
+        # bulk_create does not return ids; read them back with the same lookup
+        existing = {key(obj): obj for obj in await model.filter(**lookup).using_db(conn)}
+    if updated:
+        await model.bulk_update(updated, fields=sorted(update_fields), using_db=conn)
+
+    counts['created'] += len(created)
+    counts['updated'] += len(updated)
+    return {item_key: existing[item_key].id for item_key in items if item_key not in rejected}, rejected
+
+
+async def import_catalog_chunk(records: list, report: dict):
+    rows = []
+    for row_num, data, error in records:
+        if error:
+            report['errors'].append({'row': row_num, 'errors': [error]})
+            continue
+        row, errors = _parse_row(data)
+        if errors:
+            report['errors'].append({'row': row_num, 'errors': errors})
+            continue
+        rows.append((row_num, row))
+
+    countries, universities, courses = {}, {}, {}
+    for row_num, row in rows:
+        countries.setdefault(row.country, {}).update(_fields(row, COUNTRY_FIELDS))
+        if row.university:
+            universities.setdefault((row.country, row.university), {}).update(_fields(row, UNIVERSITY_FIELDS))
+        if row.course:
+            courses.setdefault((row.country, row.university, row.course, row.course_type), {}).update(_fields(row, COURSE_FIELDS))
+
+    if not countries:
+        return False
+
+    # Counted separately so a rolled back chunk doesn't show up in the report
+    counts = {level: {'created': 0, 'updated': 0} for level in ('countries', 'universities', 'courses')}
+    try:
+        async with in_transaction('default') as conn:
+            country_ids, _ = await _upsert(
+                Country, conn, countries,
+                {'name__in': list(countries)},
+                lambda country: country.name,
+                counts['countries'],
+            )
+
+            university_items = {
+                (country_ids[country], name): {**values, 'country_id': country_ids[country]}
+                for (country, name), values in universities.items()
+            }
+            university_ids, rejected = await _upsert(
+                University, conn, university_items,
+                {'country_id__in': set(country_ids.values()), 'name__in': list({name for _, name in universities})},
+                lambda university: (university.country_id, university.name),
+                counts['universities'],
+                required=NEW_UNIVERSITY_REQUIRED,
+            ) if university_items else ({}, set())
+
+            course_items = {}
+            for (country, university, name, course_type), values in courses.items():
+                university_id = university_ids.get((country_ids[country], university))
+                if university_id:
+                    course_items[(university_id, name, course_type)] = {**values, 'university_id': university_id}
+            _, rejected_courses = await _upsert(
+                Course, conn, course_items,
+                {'university_id__in': set(university_ids.values()), 'name__in': list({key[1] for key in course_items})},
+                lambda course: (course.university_id, course.name, course.course_type),
+                counts['courses'],
+                required=NEW_COURSE_REQUIRED,
+            ) if course_items else ({}, set())
+    except Exception as e:
+        # Constraint errors roll the whole chunk back
+        report['errors'].extend({'row': row_num, 'errors': [f'not saved: {e}']} for row_num, _ in rows)
+        return False
+
+    for row_num, row in rows:
+        if row.university and (country_ids[row.country], row.university) in rejected:
+            report['errors'].append({'row': row_num, 'errors': ['location: required for a new university']})
+            continue
+        if row.course:
+            university_id = university_ids[(country_ids[row.country], row.university)]
+            course_key = (university_id, row.course, row.course_type)
+            if course_key in rejected_courses:
+                missing = [field for field in NEW_COURSE_REQUIRED if course_items[course_key].get(field) is None]
+                report['errors'].append({'row': row_num, 'errors': [f"{' and '.join(missing)}: required for a new course"]})
+
+    for level, level_counts in counts.items():
+        for key, value in level_counts.items():
+            report[level][key] += value
+    return True
+
+
+async def import_catalog(stream, format: str, chunk_size: int = None) -> dict:
+    chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK_SIZE
+    records = read_catalog_records(stream, format)
+    report = {
+        'total': 0,
+        'failed': 0,
+        'countries': {'created': 0, 'updated': 0},
+        'universities': {'created': 0, 'updated': 0},
+        'courses': {'created': 0, 'updated': 0},
+        'errors': [],
+    }
+
+    changed = False
+    while chunk := await to_thread.run_sync(lambda: list(islice(records, chunk_size))):
+        report['total'] += len(chunk)
+        changed = await import_catalog_chunk(chunk, report) or changed
+
+    # Derived state is refreshed once instead of after every row
+    if changed:
+        await invalidate_catalog()
+        await course_search.rebuild_course_search_index()
+
+    report['failed'] = len(report['errors'])
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
+
+
+async def iter_catalog_rows():
+    # Keyset over countries; universities and courses are loaded per batch of countries
+    last_id = 0
+    while True:
+        countries = await Country.filter(id__gt=last_id).order_by('id').limit(EXPORT_COUNTRY_BATCH).values('id', 'name', 'description')
+        if not countries:
+            return
+        last_id = countries[-1]['id']
+
+        universities = await University.filter(country_id__in=[country['id'] for country in countries]).order_by('id').values(
+            'id', 'country_id', 'name', 'varsity_type', 'location', 'description', 'website_link'
+        )
+        universities_by_country = {}
+        for university in universities:
+            universities_by_country.setdefault(university['country_id'], []).append(university)
+
+        courses_by_university = {}
+        for offset in range(0, len(universities), settings.BULK_IMPORT_CHUNK_SIZE):
+            batch = [university['id'] for university in universities[offset:offset + settings.BULK_IMPORT_CHUNK_SIZE]]
+            for course in await Course.filter(university_id__in=batch).order_by('id').values(
+                'university_id', 'name', 'course_type', 'fee', 'description'
+            ):
+                courses_by_university.setdefault(course['university_id'], []).append(course)
+
+        for country in countries:
+            country_row = {'country': country['name'], 'country_description': country['description']}
+            country_universities = universities_by_country.get(country['id'], [])
+            if not country_universities:
+                yield country_row
+            for university in country_universities:
+                university_row = {
+                    **country_row,
+                    'university': university['name'],
+                    'varsity_type': VarsityType(university['varsity_type']).value,
+                    'location': university['location'],
+                    'university_description': university['description'],
+                    'website_link': university['website_link'],
+                }
+                university_courses = courses_by_university.get(university['id'], [])
+                if not university_courses:
+                    yield university_row
+                for course in university_courses:
+                    yield {
+                        **university_row,
+                        'course': course['name'],
+                        'course_type': course['course_type'],
+                        'fee': course['fee'],
+                        'course_description': course['description'],
+                    }
+
+
+async def export_catalog(format: str):
+    # Yields the export as text, a batch of rows at a time
+    if format == 'csv':
+        yield _encode(None, format)
+
+    batch = []
+    async for row in iter_catalog_rows():
+        batch.append(row)
+        if len(batch) >= settings.BULK_IMPORT_CHUNK_SIZE:
+            yield _encode(batch, format)
+            batch = []
+
+    if batch:
+        yield _encode(batch, format)
+
+
+def _encode(rows: Optional[list], format: str) -> str:
+    if format == 'jsonl':
+        return ''.join(json.dumps({column: row.get(column) for column in CATALOG_COLUMNS}) + '\n' for row in rows)
+
+    # rows=None writes the CSV header
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CATALOG_COLUMNS)
+    if rows is None:
+        writer.writeheader()
+    else:
+        writer.writerows(rows)
+    return buffer.getvalue()
@@ -2,12 +2,46 @@ from .models import *
 from tortoise.exceptions import DoesNotExist
 from fastapi import UploadFile, HTTPException
 from typing import Optional
+from tortoise.transactions import in_transaction
+from core.cache import TTLCache
+from core.http_cache import table_versions
+from core.metrics import register_cache
+from . import search as course_search
+from .summary import application_summary_state, update_application_summary, discard_summary_keys
+from core.config import settings
+
+
+# Catalog reads are served from here through cached_catalog(); every admin mutation calls invalidate_catalog()
+catalog_cache = TTLCache(
+	max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+	ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+)
+register_cache('catalog', catalog_cache)
+
+CATALOG_TABLES = ('country', 'university', 'course')
+# Mutations in other processes clear this one's entries once its table versions catch up,
+# so a body from the cache always matches the ETag it is sent with
+table_versions.watch(CATALOG_TABLES, catalog_cache.invalidate)
+
+
+async def cached_catalog(key, loader):
+	# Catches up with the shared table versions first, so entries never outlive a write
+	# in another process by more than TABLE_VERSION_POLL_SECONDS instead of the TTL
+	await table_versions.refresh()
+	return await catalog_cache.get_or_load(key, loader)
+
+
+async def invalidate_catalog():
+	catalog_cache.invalidate()
+	await table_versions.bump(*CATALOG_TABLES)
+
 
 ''' Country CRUD Start '''
 
 
 async def create_country(country: dict):
 	country = await Country.create(**country)
+	await invalidate_catalog()
 	return country
 
 
@@ -21,6 +55,8 @@ async def update_country(country_id: int, country: dict):
 			if value is not None:
 				setattr(country_obj, key, value)
 		await country_obj.save()
+		await course_search.index_country_courses(country_obj.id)
+		await invalidate_catalog()
 		return country_obj
 
 	except DoesNotExist:
@@ -29,7 +65,7 @@ async def update_country(country_id: int, country: dict):
 
 async def country_list():
 	try:
-		country = await Country.all()
+		country = await cached_catalog(('country_list',), lambda: Country.all())
 		return country
 	except DoesNotExist:
 		return None
@@ -47,7 +83,14 @@ async def retrieve_country(country_id: int):
 async def delete_country(country_id: int):
 	try:
 		country = await Country.get_or_none(id=country_id)
-		await country.delete()
+		university_ids = await University.filter(country_id=country_id).values_list('id', flat=True)
+		# The summary rows go with the country, or not at all
+		async with in_transaction('default') as conn:
+			await course_search.unindex_country_courses(country_id)
+			await country.delete(using_db=conn)
+			await discard_summary_keys('country', [country_id], using_db=conn)
+			await discard_summary_keys('university', university_ids, using_db=conn)
+		await invalidate_catalog()
 		return True
 	except DoesNotExist:
 		return None	
@@ -72,13 +115,13 @@ async def create_university(university_data: dict):
 
 	university_data['country'] = country
 	university = await University.create(**university_data)
-	await university.fetch_related('country')
+	await invalidate_catalog()
 	return university
 
 
 
 async def update_university(university_id: int, university_data: dict):
-	university = await University.get_or_none(id=university_id)
+	university = await University.get_or_none(id=university_id).select_related('country')
 	if not university:
 		return None
 
@@ -95,12 +138,16 @@ async def update_university(university_id: int, university_data: dict):
 			setattr(university, key, value)
 
 	await university.save()
-	await university.fetch_related('country')
+	await course_search.index_university_courses(university.id)
+	await invalidate_catalog()
 	return university
 
 
 async def retrieve_university(university_id: int):
-	university = await University.get_or_none(id=university_id).prefetch_related('country')
+	university = await cached_catalog(
+		('university', university_id),
+		lambda: University.get_or_none(id=university_id).select_related('country'),
+	)
 	if not university:
 		raise HTTPException(status_code=404, detail='University not found.')
 
@@ -108,8 +155,8 @@ async def retrieve_university(university_id: int):
 
 
 
-async def list_universities(university_type: Optional[str] = None, country: Optional[int] = None):
-    try:
+async def list_universities(university_type: Optional[str] = None, country: Optional[int] = None, projection=None):
+    async def load():
         universities = University.all()
         if country is not None:
             universities = universities.filter(country=country)
@@ -117,7 +164,12 @@ async def list_universities(university_type: Optional[str] = None, country: Opti
         if university_type is not None:
             universities = universities.filter(varsity_type=university_type)
 
-        universities = await universities.prefetch_related('country')
+        if projection is not None:
+            return await projection.load(universities)
+        return await universities.prefetch_related('country')
+
+    try:
+        universities = await cached_catalog(('universities', university_type, country, projection is not None), load)
         if not universities:
             raise HTTPException(status_code=404, detail="No universities found for the given filters.")
         return universities
@@ -131,7 +183,11 @@ async def delete_university(university_id: int):
 	university = await University.get_or_none(id=university_id)
 	if not university:
 		return None
-	await university.delete()
+	async with in_transaction('default') as conn:
+		await course_search.unindex_university_courses(university_id)
+		await university.delete(using_db=conn)
+		await discard_summary_keys('university', [university_id], using_db=conn)
+	await invalidate_catalog()
 	return True
 
 
@@ -145,24 +201,25 @@ async def create_course(course_data: dict):
 	if not university_id:
 		raise HTTPException(status_code=400, detail="university_id is required")
 		
-	university = await University.get_or_none(id=university_id).prefetch_related('country')
+	university = await University.get_or_none(id=university_id).select_related('country')
 	if not university:
 		raise HTTPException(status_code=404, detail="University not found")
 
 	course_data['university'] = university
 	course = await Course.create(**course_data)
-	await course.fetch_related('university', 'university__country')
+	await course_search.index_course(course.id)
+	await invalidate_catalog()
 	return course
 
 
 async def update_course(course_id: int, course_data: dict):
-	course = await Course.get_or_none(id=course_id)
+	course = await Course.get_or_none(id=course_id).select_related('university__country')
 	if not course:
 		return None
 
 	university_id = course_data.pop('university_id', None)
 	if university_id:
-		university = await University.get_or_none(id=university_id).prefetch_related('country')
+		university = await University.get_or_none(id=university_id).select_related('country')
 		if university:
 			course.university = university
 		else:
@@ -173,39 +230,54 @@ async def update_course(course_id: int, course_data: dict):
 			setattr(course, key, value)
 
 	await course.save()
-	await course.fetch_related('university', 'university__country')
+	await course_search.index_course(course.id)
+	await invalidate_catalog()
 	return course
 
 
 async def retrieve_course(course_id: int):
-	course = await Course.get_or_none(id=course_id).prefetch_related('university', 'university__country')
+	course = await cached_catalog(
+		('course', course_id),
+		lambda: Course.get_or_none(id=course_id).select_related('university__country'),
+	)
 	if not course:
 		return None
 	return course
 
 
-async def list_courses():
+async def list_courses(projection=None):
 	try:
-		courses = await Course.all().prefetch_related('university', 'university__country')
+		if projection is not None:
+			return await cached_catalog(('course_list', 'values'), lambda: projection.load(Course.all()))
+
+		courses = await cached_catalog(
+			('course_list',),
+			lambda: Course.all().prefetch_related('university', 'university__country'),
+		)
 		return courses
 	except DoesNotExist:
 		return None
 
 
 async def get_courses_by_university(university_id: int):
-	university = await University.get_or_none(id=university_id)
+	university = await University.get_or_none(id=university_id).select_related('country')
 	if not university:
 		return None
 
-	courses = await Course.filter(university=university).prefetch_related('university', 'university__country')
-	return list(courses) if courses else []
+	# Every course shares the university just loaded
+	courses = await Course.filter(university_id=university.id)
+	for course in courses:
+		course.university = university
+	return courses
 
 
 async def delete_course(course_id: int):
 	course = await Course.get_or_none(id=course_id)
 	if not course:
 		return None
+	await course_search.unindex_course(course_id)
 	await course.delete()
+	await invalidate_catalog()
 	return True
 
 
@@ -216,209 +288,157 @@ async def delete_course(course_id: int):
 
 ''' AgentAdmissionApplication CRUD Start '''
 
-async def create_agent_admission_application(application_data: dict, agent_id: int):
-    # Set the agent
-    application_data['agent_id'] = agent_id
-    
-    # Handle foreign key relationships
-    course_id = application_data.pop('course_id', None)
+# Relations serialized by AgentAdmissionApplicationResponse
+AGENT_APPLICATION_RELATIONS = (
+    'course__university__country',
+    'university_one__country',
+    'university_two__country',
+    'university_three__country',
+    'documents',
+    'commission',
+)
+
+APPLICATION_UNIVERSITY_FIELDS = ('university_one', 'university_two', 'university_three')
+# Applications to these countries may name one university, to the rest up to three
+SINGLE_UNIVERSITY_COUNTRIES = ('Malaysia', 'Cyprus')
+
+
+async def resolve_application_relations(course_id: Optional[int], university_ids: dict):
+    # One query for the course and one for every university, countries joined in
+    course = None
     if course_id:
-        course = await Course.get_or_none(id=course_id).prefetch_related('university', 'university__country')
+        course = await Course.get_or_none(id=course_id).select_related('university__country')
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
-        
-        application_data['course'] = course
-    
-    university_one_id = application_data.pop('university_one_id', None)
-    university_two_id = application_data.pop('university_two_id', None)
-    university_three_id = application_data.pop('university_three_id', None)
-    
-    # Get universities and their countries for validation
-    universities = []
-    if university_one_id:
-        university_one = await University.get_or_none(id=university_one_id).prefetch_related('country')
-        if not university_one:
-            raise HTTPException(status_code=404, detail="University one not found")
-        application_data['university_one'] = university_one
-        universities.append(university_one)
-    
-    if university_two_id:
-        university_two = await University.get_or_none(id=university_two_id).prefetch_related('country')
-        if not university_two:
-            raise HTTPException(status_code=404, detail="University two not found")
-        application_data['university_two'] = university_two
-        universities.append(university_two)
-    
-    if university_three_id:
-        university_three = await University.get_or_none(id=university_three_id).prefetch_related('country')
-        if not university_three:
-            raise HTTPException(status_code=404, detail="University three not found")
-        application_data['university_three'] = university_three
-        universities.append(university_three)
-    
-    # Validate university count based on country
-    if universities:
-        # Check if all universities are from the same country
-        countries = set(uni.country.name for uni in universities)
-        if len(countries) > 1:
-            raise HTTPException(status_code=400, detail="All universities must be from the same country")
-        
-        country_name = universities[0].country.name
-        university_count = len(universities)
-        
-        # Malaysia and Cyprus can only have 1 university
-        if country_name in ['Malaysia', 'Cyprus'] and university_count > 1:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"For {country_name}, only one university is allowed"
-            )
-        
-        # Other countries can have 1-3 universities
-        elif country_name not in ['Malaysia', 'Cyprus'] and university_count > 3:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"For {country_name}, maximum 3 universities are allowed"
-            )
-    
-    application = await AgentAdmissionApplication.create(**application_data)
-    await application.fetch_related(
-        'country',
-        'course', 
-        'course__university', 
-        'course__university__country',
-        'university_one', 
-        'university_one__country',
-        'university_two', 
-        'university_two__country',
-        'university_three', 
-        'university_three__country',
-        'documents',
-        'commission'
+
+    ids = {university_id for university_id in university_ids.values() if university_id}
+    loaded = {}
+    if ids:
+        loaded = {university.id: university for university in await University.filter(id__in=ids).select_related('country')}
+
+    universities = {}
+    for field, university_id in university_ids.items():
+        if not university_id:
+            continue
+        if university_id not in loaded:
+            raise HTTPException(status_code=404, detail=f"University {field[len('university_'):]} not found")
+        universities[field] = loaded[university_id]
+
+    return course, universities
+
+
+def validate_application_universities(universities: list):
+    if not universities:
+        return
+
+    # Check if all universities are from the same country
+    countries = set(uni.country.name for uni in universities)
+    if len(countries) > 1:
+        raise HTTPException(status_code=400, detail="All universities must be from the same country")
+
+    country_name = universities[0].country.name
+    university_count = len(universities)
+
+    # Malaysia and Cyprus can only have 1 university
+    if country_name in SINGLE_UNIVERSITY_COUNTRIES and university_count > 1:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"For {country_name}, only one university is allowed"
+        )
+
+    # Other countries can have 1-3 universities
+    elif country_name not in SINGLE_UNIVERSITY_COUNTRIES and university_count > len(APPLICATION_UNIVERSITY_FIELDS):
+        raise HTTPException(
+            status_code=400, 
+            detail=f"For {country_name}, maximum 3 universities are allowed"
+        )
+
+
+async def create_agent_admission_application(application_data: dict, agent_id: int):
+    # Unset optional fields fall back to the model defaults
+    application_data = {key: value for key, value in application_data.items() if value is not None}
+
+    # Set the agent
+    application_data['agent_id'] = agent_id
+
+    course, universities = await resolve_application_relations(
+        application_data.pop('course_id', None),
+        {field: application_data.pop(f'{field}_id', None) for field in APPLICATION_UNIVERSITY_FIELDS},
     )
+    validate_application_universities(list(universities.values()))
+
+    async with in_transaction('default') as conn:
+        application = await AgentAdmissionApplication.create(
+            course=course,
+            **{field: universities.get(field) for field in APPLICATION_UNIVERSITY_FIELDS},
+            **application_data,
+            using_db=conn,
+        )
+        # Created with the application, so later steps only ever update them; kept
+        # on the instance so the response is built without querying for them
+        application._commission = await AgentApplicationCommission.create(admission_application=application, using_db=conn)
+        application._documents = await AgentApplicationDocuments.create(admission_application=application, using_db=conn)
+        await update_application_summary(after=application_summary_state(application), using_db=conn)
+
     return application
 
 
 async def update_agent_admission_application(application_id: int, application_data: dict):
-    application = await AgentAdmissionApplication.get_or_none(id=application_id)
-    if not application:
-        return None
-    
-    # Handle foreign key relationships
-    course_id = application_data.pop('course_id', None)
-    if course_id is not None:
-        if course_id:
-            course = await Course.get_or_none(id=course_id).prefetch_related('university', 'university__country')
-            if not course:
-                raise HTTPException(status_code=404, detail="Course not found")
+    async with in_transaction('default') as conn:
+        # Read inside the transaction, and locked where the database can, so the
+        # summary's "before" state is the row this update replaces
+        application = await AgentAdmissionApplication.get_or_none(id=application_id).select_related(
+            *AGENT_APPLICATION_RELATIONS
+        ).select_for_update(of=(AgentAdmissionApplication._meta.db_table,)).using_db(conn)
+        if not application:
+            return None
+
+        # Handle foreign key relationships; an id of 0 clears the relation
+        course_id = application_data.pop('course_id', None)
+        university_ids = {field: application_data.pop(f'{field}_id', None) for field in APPLICATION_UNIVERSITY_FIELDS}
+
+        course, universities = await resolve_application_relations(course_id, university_ids)
+
+        # If universities are being updated, validate the count
+        validate_application_universities(list(universities.values()))
+
+        before = application_summary_state(application, application.commission)
+
+        if course_id is not None:
             application.course = course
-        else:
-            application.course = None
-    
-    university_one_id = application_data.pop('university_one_id', None)
-    university_two_id = application_data.pop('university_two_id', None)
-    university_three_id = application_data.pop('university_three_id', None)
-    
-    # Get universities and their countries for validation
-    universities = []
-    
-    if university_one_id is not None:
-        if university_one_id:
-            university_one = await University.get_or_none(id=university_one_id).prefetch_related('country')
-            if not university_one:
-                raise HTTPException(status_code=404, detail="University one not found")
-            application.university_one = university_one
-            universities.append(university_one)
-        else:
-            application.university_one = None
-    
-    if university_two_id is not None:
-        if university_two_id:
-            university_two = await University.get_or_none(id=university_two_id).prefetch_related('country')
-            if not university_two:
-                raise HTTPException(status_code=404, detail="University two not found")
-            application.university_two = university_two
-            universities.append(university_two)
-        else:
-            application.university_two = None
-    
-    if university_three_id is not None:
-        if university_three_id:
-            university_three = await University.get_or_none(id=university_three_id).prefetch_related('country')
-            if not university_three:
-                raise HTTPException(status_code=404, detail="University three not found")
-            application.university_three = university_three
-            universities.append(university_three)
-        else:
-            application.university_three = None
-    
-    # If universities are being updated, validate the count
-    if universities:
-        # Check if all universities are from the same country
-        countries = set(uni.country.name for uni in universities)
-        if len(countries) > 1:
-            raise HTTPException(status_code=400, detail="All universities must be from the same country")
-        
-        country_name = universities[0].country.name
-        university_count = len(universities)
-        
-        # Malaysia and Cyprus can only have 1 university
-        if country_name in ['Malaysia', 'Cyprus'] and university_count > 1:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"For {country_name}, only one university is allowed"
-            )
-        
-        # Other countries can have 1-3 universities
-        elif country_name not in ['Malaysia', 'Cyprus'] and university_count > 3:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"For {country_name}, maximum 3 universities are allowed"
-            )
-    
-    # Update other fields
-    for key, value in application_data.items():
-        if value is not None:
-            setattr(application, key, value)
-    
-    await application.save()
-    await application.fetch_related(
-        'course', 
-        'course__university', 
-        'course__university__country',
-        'university_one', 
-        'university_one__country',
-        'university_two', 
-        'university_two__country',
-        'university_three', 
-        'university_three__country',
-        'documents',
-        'commission'
-    )
+
+        for field, university_id in university_ids.items():
+            if university_id is not None:
+                setattr(application, field, universities.get(field))
+
+        # Update other fields
+        for key, value in application_data.items():
+            if value is not None:
+                setattr(application, key, value)
+
+        await application.save(using_db=conn)
+        await update_application_summary(before, application_summary_state(application, application.commission), using_db=conn)
     return application
 
 
-async def retrieve_agent_admission_application(application_id: int):
-    application = await AgentAdmissionApplication.get_or_none(
-        id=application_id,
-    ).prefetch_related(
-        'course', 
-        'course__university', 
-        'course__university__country',
-        'university_one', 
-        'university_one__country',
-        'university_two', 
-        'university_two__country',
-        'university_three', 
-        'university_three__country',
-        'documents',
-        'commission'
-    )
+async def retrieve_agent_admission_application(application_id: int, agent_id: Optional[int] = None):
+    # One joined query instead of a prefetch per relation
+    filters = {'id': application_id}
+    if agent_id is not None:
+        filters['agent_id'] = agent_id
+    application = await AgentAdmissionApplication.get_or_none(**filters).select_related(*AGENT_APPLICATION_RELATIONS)
     if not application:
         return None
     return application
 
 
-async def list_agent_admission_applications(agent_id: Optional[int] = None, status: Optional[str] = None):
+async def list_agent_admission_applications(
+    agent_id: Optional[int] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    projection=None,
+):
     try:
         if not agent_id:
             applications = AgentAdmissionApplication.all()
@@ -428,29 +448,36 @@ async def list_agent_admission_applications(agent_id: Optional[int] = None, stat
         if status is not None:
             applications = applications.filter(status=status)
 
-        # Only await at the end, after prefetch_related and all filters
-        return await applications.prefetch_related(
-            'course', 
-            'course__university', 
-            'course__university__country',
-            'university_one', 
-            'university_one__country',
-            'university_two', 
-            'university_two__country',
-            'university_three', 
-            'university_three__country',
-            'documents',
-            'commission'
-        ).all()
+        def fetch(queryset):
+            # Either way every related row comes from the same joined SELECT
+            if projection is not None:
+                return projection.load(queryset)
+            return queryset.select_related(*AGENT_APPLICATION_RELATIONS)
+
+        if limit is None:
+            return await fetch(applications.all())
+
+        # Keyset pagination on id: fetch one extra row to know if there is a next page
+        if after is not None:
+            applications = applications.filter(id__gt=after)
+        rows = await fetch(applications.order_by('id').limit(limit + 1))
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1]['id'] if projection is not None else rows[-1].id
+        return {'items': rows, 'next_cursor': next_cursor}
     except DoesNotExist:
         return None
 
 
 async def delete_agent_admission_application(application_id: int):
-    application = await AgentAdmissionApplication.get_or_none(id=application_id)
+    application = await AgentAdmissionApplication.get_or_none(id=application_id).select_related('commission')
     if not application:
         return None
-    await application.delete()
+    async with in_transaction('default') as conn:
+        await application.delete(using_db=conn)
+        await update_application_summary(before=application_summary_state(application, application.commission), using_db=conn)
     return True
 
 
@@ -475,6 +502,7 @@ async def retrieve_intake_crud(intake_id: int):
 
 async def create_intake_crud(intake_data: dict):
     intake = await Intake.create(**intake_data)
+    await table_versions.bump('intake')
     return intake
 
 
@@ -487,6 +515,7 @@ async def update_intake_crud(intake_id: int, intake_data: dict):
         if value is not None:
             setattr(intake, key, value)
     await intake.save()
+    await table_versions.bump('intake')
     return intake
 
 
@@ -496,6 +525,7 @@ async def destroy_intake_crud(intake_id: int):
         raise HTTPException(status_code=404, detail='Intake not found.')
 
     await intake.delete()
+    await table_versions.bump('intake')
     return {'detail': 'Intake has been removed.'}
 
 
@@ -505,6 +535,9 @@ async def destroy_intake_crud(intake_id: int):
 
 ''' StudentAdmissionApplication CRUD Start '''
 
+STUDENT_APPLICATION_RELATIONS = ('preferred_university__country', 'documents')
+
+
 async def create_student_admission_application_crud(application_data: dict):
     country_name = application_data.get('interest_country', None)
     preferred_university_id = application_data.get('preferred_university_id')
@@ -514,7 +547,7 @@ async def create_student_admission_application_crud(application_data: dict):
     if not country:
         raise HTTPException(status_code=404, detail='Country not found')
 
-    preferred_university = await University.get_or_none(id=preferred_university_id)
+    preferred_university = await University.get_or_none(id=preferred_university_id).select_related('country')
     if not preferred_university:
         raise HTTPException(status_code=404, detail='Preferred university not found')
 
@@ -529,14 +562,16 @@ async def create_student_admission_application_crud(application_data: dict):
         raise HTTPException(status_code=404, detail='Course not found')
 
     application = await StudentAdmissionApplication.create(**application_data)
-    await application.fetch_related('documents', 'preferred_university', 'preferred_university__country')
+    # The university is already loaded; only the (empty) documents relation is read back
+    application.preferred_university = preferred_university
+    await application.fetch_related('documents')
     return application
 
 
 
 
 async def update_student_admission_application_crud(application_id: int, application_data: dict):
-    application = await StudentAdmissionApplication.get_or_none(id=application_id)
+    application = await StudentAdmissionApplication.get_or_none(id=application_id).select_related(*STUDENT_APPLICATION_RELATIONS)
     if not application:
         raise HTTPException(status_code=404, detail='Application not found')
 
@@ -552,11 +587,11 @@ async def update_student_admission_application_crud(application_id: int, applica
         country = await Country.get_or_none(name=application.interest_country)
 
     if preferred_university_id:
-        preferred_university = await University.get_or_none(id=preferred_university_id)
+        preferred_university = await University.get_or_none(id=preferred_university_id).select_related('country')
         if not preferred_university:
             raise HTTPException(status_code=404, detail='Preferred university not found')
     else:
-        preferred_university = await University.get_or_none(id=application.preferred_university_id)
+        preferred_university = application.preferred_university
 
     if preferred_university and country and preferred_university.country_id != country.id:
         raise HTTPException(status_code=400, detail='University not found or invalid university for selected country')
@@ -569,15 +604,15 @@ async def update_student_admission_application_crud(application_id: int, applica
     for key, value in application_data.items():
         if value is not None:
             setattr(application, key, value)
+    application.preferred_university = preferred_university
 
     await application.save()
-    await application.fetch_related('documents', 'preferred_university', 'preferred_university__country')
     return application
 
 
 
 async def retrieve_student_admission_application_crud(application_id: int):
-    application = await StudentAdmissionApplication.get_or_none(id=application_id).prefetch_related('documents', 'preferred_university', 'preferred_university__country')
+    application = await StudentAdmissionApplication.get_or_none(id=application_id).select_related(*STUDENT_APPLICATION_RELATIONS)
     if not application:
         return None
     return application
@@ -585,7 +620,7 @@ async def retrieve_student_admission_application_crud(application_id: int):
 
 async def list_student_admission_applications_crud():
     try:
-        applications = await StudentAdmissionApplication.all().prefetch_related('documents', 'preferred_university', 'preferred_university__country')
+        applications = await StudentAdmissionApplication.all().select_related(*STUDENT_APPLICATION_RELATIONS)
         return applications
     except DoesNotExist:
         return None
@@ -614,15 +649,20 @@ async def create_commission(application_id: int):
 
 
 async def update_commission(application_id: int, commission_data: dict):
-    application = await AgentAdmissionApplication.get_or_none(id=application_id)
-    if not application:
-        return None
-
-    commission, created = await AgentApplicationCommission.get_or_create(admission_application=application)
-    for key, value in commission_data.items():
-        if value is not None:
-            setattr(commission, key, value)
-    await commission.save()
+    async with in_transaction('default') as conn:
+        # Locks the application like update_agent_admission_application, so the two never
+        # compute the summary from each other's stale state
+        application = await AgentAdmissionApplication.get_or_none(id=application_id).select_for_update().using_db(conn)
+        if not application:
+            return None
+
+        commission, created = await AgentApplicationCommission.get_or_create(admission_application=application, using_db=conn)
+        before = application_summary_state(application, commission)
+        for key, value in commission_data.items():
+            if value is not None:
+                setattr(commission, key, value)
+        await commission.save(using_db=conn)
+        await update_application_summary(before, application_summary_state(application, commission), using_db=conn)
     return commission
 
 
@@ -643,8 +683,19 @@ async def filter_course(
     country: Optional[int] = None,
     university: Optional[int] = None,
     course_type: Optional[str] = None,
+    limit: int = 50,
     ):
-    
+
+    # Ranked full-text search; filters are applied inside the same index query
+    if search and course_search.search_enabled():
+        course_ids = await course_search.search_course_ids(search, country, university, course_type, limit)
+        courses = await Course.filter(id__in=course_ids).select_related('university__country')
+        if not courses:
+            raise HTTPException(status_code=404, detail='No courses found!')
+
+        rank = {course_id: position for position, course_id in enumerate(course_ids)}
+        return sorted(courses, key=lambda course: rank[course.id])
+
     queryset = Course.filter()
 
     if search:
@@ -660,7 +711,7 @@ async def filter_course(
         queryset = queryset.filter(course_type=course_type)
 
 
-    courses = await queryset.prefetch_related('university', 'university__country')
+    courses = await queryset.limit(limit).prefetch_related('university', 'university__country')
     if not courses:
         raise HTTPException(status_code=404, detail='No courses found!')
 
@@ -690,6 +741,7 @@ async def retrieve_blog_or_event(id: int):
 
 async def create_blog_or_event(blog_data: dict):
     blog_or_event = await BlogAndEvent.create(**blog_data)
+    await table_versions.bump('blogandevent')
     return blog_or_event
 
 
@@ -703,6 +755,7 @@ async def update_blog_or_event(id: int, blog_data: dict):
             setattr(blog_or_event, key, value)
 
     await blog_or_event.save()
+    await table_versions.bump('blogandevent')
     return blog_or_event
 
 
@@ -712,7 +765,8 @@ async def delete_blog_or_event(id: int):
     if not blog_or_event:
         raise HTTPException(status_code=404, detail='no blog or event found!')
 
-    blog_or_event.delete()
+    await blog_or_event.delete()
+    await table_versions.bump('blogandevent')
     return {'status_code': 200, 'success': 'Blog or Event has been deleted.'}
 
 
@@ -733,7 +787,8 @@ async def delete_offer(id: int):
     if not offer:
         raise HTTPException(status_code=404, detail='no offer found!')
 
-    offer.delete()
+    await offer.delete()
+    await table_versions.bump('offers')
     return {'status_code': 200, 'success': 'Offer has been deleted.'}
 
 
@@ -0,0 +1,39 @@
+import anyio
+from tortoise.transactions import in_transaction
+from jobs.queue import job_handler
+from .models import AgentAdmissionApplication, AgentApplicationDocuments, StudentAdmissionApplication, StudentApplicationDocuments
+
+
+''' Application document jobs
+
+The upload routes only write the files and queue attach_application_documents;
+everything after the bytes are on disk happens here, off the request. Later
+post-upload steps (scanning, page counting) belong in this job too.
+'''
+
+DOCUMENT_MODELS = {
+    'agent': (AgentAdmissionApplication, AgentApplicationDocuments),
+    'student': (StudentAdmissionApplication, StudentApplicationDocuments),
+}
+
+
+@job_handler('attach_application_documents')
+async def attach_application_documents(kind: str, application_id: int, files: dict) -> dict:
+    application_model, documents_model = DOCUMENT_MODELS[kind]
+
+    for path in files.values():
+        if not await anyio.Path(path).is_file():
+            raise FileNotFoundError(path)
+
+    async with in_transaction('default') as conn:
+        # The application may have been deleted since the upload; the files are then left to the media GC
+        if not await application_model.filter(id=application_id).using_db(conn).exists():
+            return {'application_id': application_id, 'attached': []}
+
+        documents, _ = await documents_model.get_or_create(admission_application_id=application_id, using_db=conn)
+        for field_name, path in files.items():
+            setattr(documents, field_name, path)
+        if files:
+            await documents.save(using_db=conn, update_fields=list(files))
+
+    return {'application_id': application_id, 'documents_id': documents.id, 'attached': list(files)}
@@ -15,6 +15,9 @@ class Country(models.Model):
 	name = fields.CharField(100)
 	description = fields.TextField(null=True, blank=True)
 
+	class Meta:
+		indexes = (('name',),)
+
 
 	def __str__(self):
 		return self.name
@@ -29,8 +32,13 @@ class University(models.Model):
 	location = fields.CharField(300)
 	description = fields.TextField(null=True, blank=True)
 	image = fields.CharField(255, null=True, blank=True)
+	image_thumbnail = fields.CharField(255, null=True, blank=True)
+	image_webp = fields.CharField(255, null=True, blank=True)
 	website_link = fields.CharField(300, null=True, blank=True)
 
+	class Meta:
+		indexes = (('country_id', 'varsity_type'), ('varsity_type',))
+
 	def __str__(self):
 		return self.name
 
@@ -43,6 +51,11 @@ class Course(models.Model):
 	fee = fields.IntField(null=True, blank=True)
 	description = fields.TextField(null=True, blank=True)
 	image = fields.CharField(255, null=True, blank=True)
+	image_thumbnail = fields.CharField(255, null=True, blank=True)
+	image_webp = fields.CharField(255, null=True, blank=True)
+
+	class Meta:
+		indexes = (('university_id', 'course_type'), ('course_type',), ('name',))
 
 	def __str__(self):
 		return self.course_type
@@ -85,6 +98,8 @@ class AgentAdmissionApplication(models.Model):
 	last_graduation = fields.CharField(55, null=True, blank=True)
 	status = fields.CharEnumField(ApplicationStatus, default=ApplicationStatus.NEW)
 
+	class Meta:
+		indexes = (('agent_id', 'status'), ('status',))
 
 
 
@@ -108,6 +123,23 @@ class AgentApplicationCommission(models.Model):
 
 
 
+class ApplicationSummary(models.Model):
+	id = fields.IntField(pk=True)
+	dimension = fields.CharField(20)
+	key = fields.CharField(50)
+	count = fields.IntField(default=0)
+	student_fee = fields.BigIntField(default=0)
+	commission = fields.BigIntField(default=0)
+
+	class Meta:
+		unique_together = (('dimension', 'key'),)
+
+	def __str__(self):
+		return f'{self.dimension}:{self.key}'
+
+
+
+
 
 
 class AgentApplicationDocuments(models.Model):
@@ -183,8 +215,13 @@ class BlogAndEvent(models.Model):
 	title = fields.CharField(255)
 	description = fields.TextField()
 	image = fields.CharField(350, null=True, blank=True)
+	image_thumbnail = fields.CharField(350, null=True, blank=True)
+	image_webp = fields.CharField(350, null=True, blank=True)
 	published_at = fields.DatetimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = (('type',),)
+
 	def __str__(self):
 		return self.title
 
@@ -192,6 +229,8 @@ class BlogAndEvent(models.Model):
 class Offers(models.Model):
 	id = fields.IntField(pk=True)
 	image = fields.CharField(355, null=True, blank=True)
+	image_thumbnail = fields.CharField(355, null=True, blank=True)
+	image_webp = fields.CharField(355, null=True, blank=True)
 
 	def __str__(self):
 		return self.title
\ No newline at end of file
@@ -1,13 +1,36 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form
+import io
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form, Query, Header, BackgroundTasks
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List, Optional, Union
 from .cruds import *
 from .schemas import *
-from .models import University, Course, AgentAdmissionApplication, AgentApplicationDocuments, StudentAdmissionApplication, StudentApplicationDocuments, AgentApplicationCommission
-from users.cruds import upload_file
+from .models import University, Course, BlogAndEvent, Offers, AgentAdmissionApplication, AgentApplicationDocuments, StudentAdmissionApplication, StudentApplicationDocuments, AgentApplicationCommission
+from .bulk_import import IMPORT_FORMATS, detect_format, import_agent_applications
+from .application_export import export_applications_csv, export_applications_xlsx, xlsx_available
+from .summary import application_dashboard
+from .catalog_io import IMPORT_FORMATS as CATALOG_IMPORT_FORMATS, export_catalog, import_catalog
+from users.cruds import upload_file, upload_files
+from core.config import settings
+from core.projection import Projection
+from core.http_cache import conditional_get, table_versions
+from core.images import generate_image_derivatives
+from core.querycheck import register_query_budgets
+from jobs.models import Job
+from jobs.queue import enqueue
 from users.dependencies import get_admin_user, get_agent_user, get_active_user
 
 router = APIRouter()
 
+# Fast path for big lists: rows go from .values() straight to orjson, skipping the response models
+UNIVERSITY_PROJECTION = Projection(UniversityResponse)
+COURSE_PROJECTION = Projection(CourseResponse)
+AGENT_APPLICATION_PROJECTION = Projection(AgentAdmissionApplicationResponse)
+
+# Tables each public catalog response is built from, for its ETag
+COUNTRY_TABLES = ('country',)
+UNIVERSITY_TABLES = ('university', 'country')
+COURSE_TABLES = ('course', 'university', 'country')
+
 
 ''' Country CRUD Start '''
 
@@ -23,7 +46,7 @@ async def add_a_country(country: CountryBase, admin_user=Depends(get_admin_user)
 
 
 @router.get('/country', response_model=List[CountryResponse])
-async def list_of_countries():
+async def list_of_countries(cache_headers=conditional_get(*COUNTRY_TABLES)):
     countries = await country_list()
     if not countries:
         raise HTTPException(status_code=404, detail='No countries found.')
@@ -31,7 +54,7 @@ async def list_of_countries():
 
 
 @router.get('/country/{country_id}', response_model=CountryResponse)
-async def retrieve_a_country(country_id: int):
+async def retrieve_a_country(country_id: int, cache_headers=conditional_get(*COUNTRY_TABLES)):
     country = await retrieve_country(country_id)
     if not country:
         raise HTTPException(status_code=404, detail='Country not found.')
@@ -66,13 +89,20 @@ async def delete_a_country(country_id: int, admin_user=Depends(get_admin_user)):
 ''' University CRUD Start '''
 
 @router.get('/university', response_model=List[UniversityResponse])
-async def list_of_universities(university_type: Optional[str] = None, country: Optional[int] = None):
+async def list_of_universities(
+    university_type: Optional[str] = None,
+    country: Optional[int] = None,
+    cache_headers=conditional_get(*UNIVERSITY_TABLES)
+):
+    if settings.FAST_LIST_RESPONSES:
+        return ORJSONResponse(await list_universities(university_type, country, UNIVERSITY_PROJECTION), headers=cache_headers)
+
     universities = await list_universities(university_type, country)
     return universities
 
 
 @router.get('/university/{university_id}', response_model=UniversityResponse)
-async def retrieve_a_university(university_id: int):
+async def retrieve_a_university(university_id: int, cache_headers=conditional_get(*UNIVERSITY_TABLES)):
     university = await retrieve_university(university_id)
     return university
 
@@ -112,11 +142,16 @@ async def delete_a_university(university_id: int, admin_user=Depends(get_admin_u
 
 
 @router.post('/university/{university_id}/upload-image/', response_model=UniversityResponse)
-async def upload_university_image(university_id: int, university_image: UploadFile = File(...), admin_user=Depends(get_admin_user)):
+async def upload_university_image(
+    university_id: int,
+    background_tasks: BackgroundTasks,
+    university_image: UploadFile = File(...),
+    admin_user=Depends(get_admin_user),
+    ):
     if not admin_user:
         raise HTTPException(status_code=403, detail='Unauthorized access!')
 
-    university = await University.get_or_none(id=university_id).prefetch_related('country')
+    university = await University.get_or_none(id=university_id).select_related('country')
     if not university:
         raise HTTPException(status_code=404, detail='Not found!')
 
@@ -129,8 +164,11 @@ async def upload_university_image(university_id: int, university_image: UploadFi
             media_dir='images'
         )
 
-        university.image = file_path
-        await university.save(update_fields=['image'])
+        # Derivatives of the previous image no longer apply; new ones follow in the background
+        university.image, university.image_thumbnail, university.image_webp = file_path, None, None
+        await university.save(update_fields=['image', 'image_thumbnail', 'image_webp'])
+        await invalidate_catalog()
+        background_tasks.add_task(generate_image_derivatives, University, university.id, file_path, invalidate_catalog)
         return university
 
     except HTTPException as e:
@@ -145,10 +183,12 @@ async def upload_university_image(university_id: int, university_image: UploadFi
 ''' Course CRUD Start '''
 
 @router.get('/course', response_model=List[CourseResponse])
-async def list_of_courses():
-    courses = await list_courses()
+async def list_of_courses(cache_headers=conditional_get(*COURSE_TABLES)):
+    courses = await list_courses(COURSE_PROJECTION if settings.FAST_LIST_RESPONSES else None)
     if not courses:
         raise HTTPException(status_code=404, detail='No courses found.')
+    if settings.FAST_LIST_RESPONSES:
+        return ORJSONResponse(courses, headers=cache_headers)
     return courses
 
 
@@ -158,14 +198,16 @@ async def filter_courses(
     country: Optional[int] = None,
     university: Optional[int] = None,
     course_type: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cache_headers=conditional_get(*COURSE_TABLES),
     ):
 
-    courses = await filter_course(country, university, university_type, course_type, budget)
+    courses = await filter_course(search, country, university, course_type, limit)
     return courses
 
 
 @router.get('/course/{course_id}', response_model=CourseResponse)
-async def retrieve_a_course(course_id: int):
+async def retrieve_a_course(course_id: int, cache_headers=conditional_get(*COURSE_TABLES)):
     course = await retrieve_course(course_id)
     if not course:
         raise HTTPException(status_code=404, detail='Course not found.')
@@ -173,7 +215,7 @@ async def retrieve_a_course(course_id: int):
 
 
 @router.get('/university/{university_id}/course', response_model=List[CourseResponse])
-async def courses_by_university(university_id: int):
+async def courses_by_university(university_id: int, cache_headers=conditional_get(*COURSE_TABLES)):
     courses = await get_courses_by_university(university_id)
     if courses is None:
         raise HTTPException(status_code=404, detail='University not found!')
@@ -214,11 +256,16 @@ async def delete_a_course(course_id: int, admin_user=Depends(get_admin_user)):
 
 
 @router.post('/course/{course_id}/upload-image', response_model=CourseResponse)
-async def upload_course_image(course_id: int, course_image: UploadFile=File(...), admin_user=Depends(get_admin_user)):
+async def upload_course_image(
+    course_id: int,
+    background_tasks: BackgroundTasks,
+    course_image: UploadFile=File(...),
+    admin_user=Depends(get_admin_user),
+    ):
     if not admin_user:
         raise HTTPException(status_code=403, detail='Unauthorized access!')
 
-    course = await Course.get_or_none(id=course_id).prefetch_related('university', 'university__country')
+    course = await Course.get_or_none(id=course_id).select_related('university__country')
     if not course:
         raise HTTPException(status_code=404, detail='Not found!')
 
@@ -233,8 +280,10 @@ async def upload_course_image(course_id: int, course_image: UploadFile=File(...)
         )
 
 
-        course.image = file_path
-        await course.save(update_fields=['image'])
+        course.image, course.image_thumbnail, course.image_webp = file_path, None, None
+        await course.save(update_fields=['image', 'image_thumbnail', 'image_webp'])
+        await invalidate_catalog()
+        background_tasks.add_task(generate_image_derivatives, Course, course.id, file_path, invalidate_catalog)
         return course
 
     except HTTPException as e:
@@ -247,6 +296,49 @@ async def upload_course_image(course_id: int, course_image: UploadFile=File(...)
 ''' Course CRUD End '''
 
 
+@router.get('/catalog/cache-stats')
+async def catalog_cache_stats(admin_user=Depends(get_admin_user)):
+    if not admin_user:
+        raise HTTPException(status_code=403, detail='Unauthorized access!')
+    return catalog_cache.stats()
+
+
+@router.post('/catalog/import', response_model=CatalogImportReport)
+async def import_catalog_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern='^(csv|jsonl|json)$'),
+    admin_user=Depends(get_admin_user)
+):
+    if not admin_user:
+        raise HTTPException(status_code=403, detail='Unauthorized access!')
+
+    format = format or detect_format(file.filename)
+    if format not in CATALOG_IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail='Upload a .csv, .jsonl or .json file, or pass format.')
+
+    stream = io.TextIOWrapper(file.file, encoding='utf-8-sig', newline='')
+    try:
+        return await import_catalog(stream, format)
+    finally:
+        stream.detach()
+
+
+@router.get('/catalog/export')
+async def export_catalog_file(
+    format: str = Query('csv', pattern='^(csv|jsonl)$'),
+    admin_user=Depends(get_admin_user)
+):
+    if not admin_user:
+        raise HTTPException(status_code=403, detail='Unauthorized access!')
+
+    media_type = 'text/csv' if format == 'csv' else 'application/x-ndjson'
+    return StreamingResponse(
+        export_catalog(format),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="catalog.{format}"'},
+    )
+
+
 ''' AgentAdmissionApplication CRUD Start '''
 
 @router.post('/agent/admission-application', response_model=AgentAdmissionApplicationResponse)
@@ -261,31 +353,88 @@ async def create_admission_application(
     if not application_obj:
         raise HTTPException(status_code=400, detail='Could not create admission application!')
 
-    # Create commission for the application
-    await AgentApplicationCommission.get_or_create(admission_application=application_obj)
-
     return application_obj
 
 
 
 
-@router.get('/agent/admission-application', response_model=List[AgentAdmissionApplicationResponse])
-async def list_admission_applications(status: Optional[str] = None, active_user=Depends(get_active_user)):
+@router.post('/agent/admission-application/import', response_model=AgentAdmissionApplicationImportReport)
+async def import_admission_applications(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern='^(csv|jsonl)$'),
+    agent_user=Depends(get_agent_user)
+):
+    if not agent_user:
+        raise HTTPException(status_code=403, detail='Unauthorized access!')
+
+    format = format or detect_format(file.filename)
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail='Upload a .csv or .jsonl file, or pass format.')
+
+    # The upload is already spooled to disk; rows are parsed from it chunk by chunk
+    stream = io.TextIOWrapper(file.file, encoding='utf-8-sig', newline='')
+    try:
+        return await import_agent_applications(stream, format, agent_user.id)
+    finally:
+        stream.detach()
+
+
+
+
+@router.get('/agent/admission-application/export')
+async def export_admission_applications(
+    format: str = Query('csv', pattern='^(csv|xlsx)$'),
+    status: Optional[str] = None,
+    agent_id: Optional[int] = None,
+    admin_user=Depends(get_admin_user)
+):
+    if not admin_user:
+        raise HTTPException(status_code=403, detail='Unauthorized access!')
+
+    if format == 'xlsx':
+        if not xlsx_available():
+            raise HTTPException(status_code=400, detail='XLSX export needs openpyxl installed.')
+        content = export_applications_xlsx(agent_id, status)
+        media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        content = export_applications_csv(agent_id, status)
+        media_type = 'text/csv'
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="applications.{format}"'},
+    )
+
+
+
+
+@router.get('/agent/admission-application', response_model=Union[AgentAdmissionApplicationPage, List[AgentAdmissionApplicationResponse]])
+async def list_admission_applications(
+    status: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    after: Optional[int] = None,
+    active_user=Depends(get_active_user)
+):
     if not active_user:
         raise HTTPException(status_code=403, detail='Unauthorized access!')
 
+    projection = AGENT_APPLICATION_PROJECTION if settings.FAST_LIST_RESPONSES else None
+
     applications = None
     if active_user.is_admin:
        
-        applications = await list_agent_admission_applications(status=status)
+        applications = await list_agent_admission_applications(status=status, limit=limit, after=after, projection=projection)
 
     else:
-        applications = await list_agent_admission_applications(agent_id=active_user.id, status=status)
-    
-    if not applications:
-        raise HTTPException(status_code=404, detail='No admission applications found.')
+        applications = await list_agent_admission_applications(agent_id=active_user.id, status=status, limit=limit, after=after, projection=projection)
 
+    # Paginated mode: an empty page is a valid answer
+    if limit is None and not applications:
+        raise HTTPException(status_code=404, detail='No admission applications found.')
 
+    if projection is not None:
+        return ORJSONResponse(applications)
     return applications
 
 
@@ -300,23 +449,9 @@ async def retrieve_admission_application(
         raise HTTPException(status_code=403, detail='Unauthorized access!')
 
     # If admin, can view any application; if agent, only their own
-    if active_user.is_admin:
-        application = await AgentAdmissionApplication.get_or_none(id=application_id).prefetch_related(
-            'course', 
-            'course__university', 
-            'course__university__country',
-            'university_one', 
-            'university_one__country',
-            'university_two', 
-            'university_two__country',
-            'university_three', 
-            'university_three__country',
-            'documents',
-            'commission'
-        )
-    else:
-        application = await retrieve_agent_admission_application(application_id, active_user.id)
-    
+    agent_id = None if active_user.is_admin else active_user.id
+    application = await retrieve_agent_admission_application(application_id, agent_id)
+
     if not application:
         raise HTTPException(status_code=404, detail='Admission application not found.')
     return application
@@ -357,47 +492,27 @@ async def delete_admission_application(
 ''' AgentApplicationDocuments CRUD Start '''
 
 
-@router.post('/agent/application-documents/{application_id}/upload', response_model=AgentApplicationDocumentsResponse)
-async def upload_application_documents(
-    application_id: int,
-    files: List[UploadFile] = File(...),
-    field_names: List[str] = Form(...),
-    agent_user=Depends(get_agent_user)
-):
-    if not agent_user:
-        raise HTTPException(status_code=403, detail='Unauthorized access!')
+async def queue_document_upload(kind: str, application_id: int, files, field_names, valid_fields, idempotency_key=None):
+    # Only the file writes happen in the request; attaching them to the application is a job
+    job_key = f'{kind}-documents:{application_id}:{idempotency_key}' if idempotency_key else None
+    if job_key:
+        # A retried request gets the first request's job back without writing the files again
+        job = await Job.get_or_none(idempotency_key=job_key)
+        if job:
+            return {'job_id': job.id, 'status': job.status.value, 'files': job.payload['files']}
 
-    # Verify the application belongs to the agent
-    application = await AgentAdmissionApplication.get_or_none(
-        id=application_id, 
-        agent_id=agent_user.id
-    )
-    if not application:
-        raise HTTPException(status_code=404, detail="Admission application not found")
-    
-    # Get or create documents record for this application
-    documents, created = await AgentApplicationDocuments.get_or_create(
-        admission_application_id=application_id
-    )
-    
     # Parse field names from comma-separated string
     field_names_list = [name.strip() for name in field_names[0].split(',') if name.strip()]
-    
-    # Validate field names
-    valid_fields = [
-        'passport', 'masters_certificate', 'masters_transcript', 'honers_certificate',
-        'honers_transcript', 'hsc_certificate', 'hsc_transcript', 'ssc_certificate',
-        'ssc_transcript', 'ielts_certificate', 'cv', 'resume', 'lor', 'job_letter', 'others'
-    ]
-    
+
     # Check if number of files matches number of field names
     if len(files) != len(field_names_list):
         raise HTTPException(
             status_code=400, 
             detail=f"Number of files ({len(files)}) must match number of field names ({len(field_names_list)}). Field names: {field_names_list}"
         )
-    
+
     try:
+        uploads = []
         for file, field_name in zip(files, field_names_list):
             # Validate field name
             if field_name not in valid_fields:
@@ -406,19 +521,24 @@ async def upload_application_documents(
             # Skip if file is empty
             if not file or file.filename == "":
                 continue
-                
-            file_path = await upload_file(
-                file=file,
-                file_type=f'document_{field_name}',
-                allowed_types=['image/', 'application/pdf'],
-                max_size_mb=5,
-                media_dir='documents'
-            )
-            setattr(documents, field_name, file_path)
-        
-        await documents.save()
-        await documents.fetch_related('admission_application')
-        return documents
+
+            uploads.append((field_name, file))
+
+        # Write all files concurrently; nothing is kept if one of them fails
+        file_paths = await upload_files(
+            [(file, f'document_{field_name}') for field_name, file in uploads],
+            allowed_types=['image/', 'application/pdf'],
+            max_size_mb=5,
+            media_dir='documents'
+        )
+        stored = {field_name: file_path for (field_name, file), file_path in zip(uploads, file_paths)}
+
+        job = await enqueue(
+            'attach_application_documents',
+            {'kind': kind, 'application_id': application_id, 'files': stored},
+            idempotency_key=job_key,
+        )
+        return {'job_id': job.id, 'status': job.status.value, 'files': job.payload['files']}
         
     except HTTPException as e:
         raise e
@@ -426,6 +546,33 @@ async def upload_application_documents(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post('/agent/application-documents/{application_id}/upload', response_model=DocumentUploadAccepted, status_code=202)
+async def upload_application_documents(
+    application_id: int,
+    files: List[UploadFile] = File(...),
+    field_names: List[str] = Form(...),
+    idempotency_key: Optional[str] = Header(None),
+    agent_user=Depends(get_agent_user)
+):
+    if not agent_user:
+        raise HTTPException(status_code=403, detail='Unauthorized access!')
+
+    # Verify the application belongs to the agent
+    application = await AgentAdmissionApplication.get_or_none(
+        id=application_id, 
+        agent_id=agent_user.id
+    )
+    if not application:
+        raise HTTPException(status_code=404, detail="Admission application not found")
+
+    valid_fields = [
+        'passport', 'masters_certificate', 'masters_transcript', 'honers_certificate',
+        'honers_transcript', 'hsc_certificate', 'hsc_transcript', 'ssc_certificate',
+        'ssc_transcript', 'ielts_certificate', 'cv', 'resume', 'lor', 'job_letter', 'others'
+    ]
+    return await queue_document_upload('agent', application_id, files, field_names, valid_fields, idempotency_key)
+
+
 ''' AgentApplicationDocuments CRUD End '''
 
 
@@ -453,15 +600,22 @@ async def patch_commission(
 ''' AgentApplicationCommission CRUD End '''
 
 
+@router.get('/dashboard/applications', response_model=ApplicationDashboard)
+async def applications_dashboard(admin_user=Depends(get_admin_user)):
+    if not admin_user:
+        raise HTTPException(status_code=403, detail='Unauthorized access!')
+    return await application_dashboard()
+
+
 ''' Intake Routes Start '''
 
 @router.get('/intakes/', response_model=List[IntakeResponse])
-async def list_intake():
+async def list_intake(cache_headers=conditional_get('intake')):
     intakes = await list_intake_curd()
     return intakes
 
 @router.get('/intakes/{intake_id}/', response_model=IntakeResponse)
-async def retrieve_intake(intake_id: int):
+async def retrieve_intake(intake_id: int, cache_headers=conditional_get('intake')):
     intake = await retrieve_intake_crud(intake_id=intake_id)
     return intake
 
@@ -557,62 +711,20 @@ async def delete_student_admission_application(
     return {'detail': 'Admission application deleted.'}
 
 
-@router.post('/student/application-documents/{application_id}/upload', response_model=StudentApplicationDocumentsResponse)
+@router.post('/student/application-documents/{application_id}/upload', response_model=DocumentUploadAccepted, status_code=202)
 async def upload_student_application_documents(
     application_id: int,
     files: List[UploadFile] = File(...),
     field_names: List[str] = Form(...),
+    idempotency_key: Optional[str] = Header(None),
 ):
     # Verify the application exists
     application = await StudentAdmissionApplication.get_or_none(id=application_id)
     if not application:
         raise HTTPException(status_code=404, detail="Admission application not found")
-    
-    # Get or create documents record for this application
-    documents, created = await StudentApplicationDocuments.get_or_create(
-        admission_application_id=application_id
-    )
-    
-    # Parse field names from comma-separated string
-    field_names_list = [name.strip() for name in field_names[0].split(',') if name.strip()]
-    
-    # Validate field names
+
     valid_fields = ['passport', 'last_graduation_certificate']
-    
-    # Check if number of files matches number of field names
-    if len(files) != len(field_names_list):
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Number of files ({len(files)}) must match number of field names ({len(field_names_list)}). Field names: {field_names_list}"
-        )
-    
-    try:
-        for file, field_name in zip(files, field_names_list):
-            # Validate field name
-            if field_name not in valid_fields:
-                raise HTTPException(status_code=400, detail=f"Invalid field name: {field_name}")
-            
-            # Skip if file is empty
-            if not file or file.filename == "":
-                continue
-                
-            file_path = await upload_file(
-                file=file,
-                file_type=f'document_{field_name}',
-                allowed_types=['image/', 'application/pdf'],
-                max_size_mb=5,
-                media_dir='documents'
-            )
-            setattr(documents, field_name, file_path)
-        
-        await documents.save()
-        await documents.fetch_related('admission_application')
-        return documents
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await queue_document_upload('student', application_id, files, field_names, valid_fields, idempotency_key)
 
 
 ''' StudentAdmissionApplication CRUD End '''
@@ -622,12 +734,12 @@ async def upload_student_application_documents(
 ''' Blogs, Events and Offers ROUTE Start '''
 
 @router.get('/blogs-or-events/', response_model=List[BlogAndEventResponse])
-async def list_blogs_or_events(type: Optional[str] = None):
+async def list_blogs_or_events(type: Optional[str] = None, cache_headers=conditional_get('blogandevent')):
     blogs_or_events = await list_blog_or_event(type)
     return blogs_or_events
 
 @router.get('/blogs-or-events/{id}/', response_model=BlogAndEventResponse)
-async def retrieve_a_blog_or_event(id: int):
+async def retrieve_a_blog_or_event(id: int, cache_headers=conditional_get('blogandevent')):
     blog_or_event = await retrieve_blog_or_event(id)
     return blog_or_event
 
@@ -655,7 +767,12 @@ async def delete_a_blog_or_event(id: int, admin_user=Depends(get_admin_user)):
 
 
 @router.post('/blogs-or-events/{id}/upload-image/', response_model=BlogAndEventResponse)
-async def upload_blog_or_event_document(id: int, image: UploadFile=File(...), admin_user=Depends(get_admin_user)):
+async def upload_blog_or_event_document(
+    id: int,
+    background_tasks: BackgroundTasks,
+    image: UploadFile=File(...),
+    admin_user=Depends(get_admin_user),
+    ):
     if not admin_user:
         raise HTTPException(status_code=403, detail='Unauthorized access!')
 
@@ -672,8 +789,13 @@ async def upload_blog_or_event_document(id: int, image: UploadFile=File(...), ad
             media_dir='images'
         )
 
-        blog_or_event.image = file_path
-        await blog_or_event.save(update_fields=['image'])
+        blog_or_event.image, blog_or_event.image_thumbnail, blog_or_event.image_webp = file_path, None, None
+        await blog_or_event.save(update_fields=['image', 'image_thumbnail', 'image_webp'])
+        await table_versions.bump('blogandevent')
+        background_tasks.add_task(
+            generate_image_derivatives, BlogAndEvent, blog_or_event.id, file_path,
+            lambda: table_versions.bump('blogandevent'),
+        )
         return blog_or_event
 
     except HTTPException as e:
@@ -681,20 +803,20 @@ async def upload_blog_or_event_document(id: int, image: UploadFile=File(...), ad
 
 
 @router.get('/offers/', response_model=List[OffersResponse])
-async def list_of_offers():
+async def list_of_offers(cache_headers=conditional_get('offers')):
     offers = await list_offers()
     return offers
 
 
 @router.get('/offers/{id}/', response_model=OffersResponse)
-async def retrieve_a_offer(id: int):
+async def retrieve_a_offer(id: int, cache_headers=conditional_get('offers')):
     offer = await retrieve_offer(id)
     return offer
 
 
 
 @router.post('/offers/', response_model=OffersResponse)
-async def create_offers(image: UploadFile=File(...), admin_user=Depends(get_admin_user)):
+async def create_offers(background_tasks: BackgroundTasks, image: UploadFile=File(...), admin_user=Depends(get_admin_user)):
     if not admin_user:
         raise HTTPException(status_code=403, detail='Unauthorized access!')
 
@@ -707,7 +829,13 @@ async def create_offers(image: UploadFile=File(...), admin_user=Depends(get_admi
             media_dir='images'
         )
 
-        return await Offers.create(image=file_path)
+        offer = await Offers.create(image=file_path)
+        await table_versions.bump('offers')
+        background_tasks.add_task(
+            generate_image_derivatives, Offers, offer.id, file_path,
+            lambda: table_versions.bump('offers'),
+        )
+        return offer
     except HTTPException as e:
         return e
 
@@ -718,4 +846,72 @@ async def delete_a_offer(id: int, admin_user=Depends(get_admin_user)):
         raise HTTPException(status_code=403, detail='Unauthorized access!')
     return await delete_offer(id)
 
-''' Blogs, Events and Offers ROUTE Start '''
\ No newline at end of file
+''' Blogs, Events and Offers ROUTE Start '''
+
+
+''' Query budgets
+
+Most statements one request to each route may run, checked when
+QUERY_CHECK_MODE is on: what the route's heaviest path runs with cold
+caches, the user lookup on an auth cache miss included. Every route here
+is called by tests/test_query_budgets.py, so a change that adds a query,
+per row or not, shows up there before it shows up in production.
+'''
+
+register_query_budgets(__name__, {
+    'add_a_country': 3,
+    'list_of_countries': 1,
+    'retrieve_a_country': 1,
+    'update_a_country': 6,
+    'delete_a_country': 8,
+    'list_of_universities': 2,
+    'retrieve_a_university': 1,
+    'add_a_university': 4,
+    'update_a_university': 6,
+    'delete_a_university': 6,
+    'upload_university_image': 4,
+    'list_of_courses': 3,
+    'filter_courses': 3,
+    'retrieve_a_course': 1,
+    'courses_by_university': 2,
+    'add_a_course': 6,
+    'update_a_course': 6,
+    'delete_a_course': 5,
+    'upload_course_image': 4,
+    'catalog_cache_stats': 1,
+    'create_admission_application': 7,
+    'list_admission_applications': 2,
+    'retrieve_admission_application': 2,
+    'update_admission_application': 5,
+    'delete_admission_application': 4,
+    'upload_application_documents': 5,
+    'patch_commission': 6,
+    'applications_dashboard': 5,
+    'list_intake': 1,
+    'retrieve_intake': 1,
+    'create_intake': 3,
+    'update_intake': 4,
+    'destroy_intake': 4,
+    'create_student_admission_application': 5,
+    'list_student_admission_applications': 2,
+    'retrieve_student_admission_application': 2,
+    'update_student_admission_application': 5,
+    'delete_student_admission_application': 3,
+    'upload_student_application_documents': 4,
+    'list_blogs_or_events': 1,
+    'retrieve_a_blog_or_event': 1,
+    'create_a_blog_or_event': 3,
+    'update_a_blog_or_event': 4,
+    'delete_a_blog_or_event': 4,
+    'upload_blog_or_event_document': 4,
+    'list_of_offers': 1,
+    'retrieve_a_offer': 1,
+    'create_offers': 3,
+    'delete_a_offer': 4,
+}, exempt=(
+    # Run a statement per imported row or stream every row in batches
+    'import_catalog_file',
+    'import_admission_applications',
+    'export_catalog_file',
+    'export_admission_applications',
+))
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Dict, List, Optional
+from uuid import UUID
 from fastapi import UploadFile
 from .models import VarsityType
 from datetime import datetime
@@ -48,6 +49,8 @@ class UniversityResponse(UniversityBase):
 	id : int
 	country : CountryResponse
 	image: Optional[str] = None
+	image_thumbnail: Optional[str] = None
+	image_webp: Optional[str] = None
 
 	class Config:
 		orm_mode = True
@@ -77,11 +80,46 @@ class CourseResponse(CourseBase):
 	id: int
 	university : UniversityResponse
 	image: Optional[str] = None
+	image_thumbnail: Optional[str] = None
+	image_webp: Optional[str] = None
 
 	class Config:
 		orm_mode = True
 
 
+class BulkImportRowError(BaseModel):
+	row: int
+	errors: List[str]
+
+
+class CatalogRow(BaseModel):
+	country: str
+	country_description: Optional[str] = None
+	university: Optional[str] = None
+	varsity_type: Optional[VarsityType] = None
+	location: Optional[str] = None
+	university_description: Optional[str] = None
+	website_link: Optional[str] = None
+	course: Optional[str] = None
+	course_type: Optional[str] = None
+	fee: Optional[int] = None
+	course_description: Optional[str] = None
+
+
+class CatalogImportCounts(BaseModel):
+	created: int = 0
+	updated: int = 0
+
+
+class CatalogImportReport(BaseModel):
+	total: int
+	failed: int
+	countries: CatalogImportCounts
+	universities: CatalogImportCounts
+	courses: CatalogImportCounts
+	errors: List[BulkImportRowError]
+
+
 ''' Agent Application Documents Schemas Start'''
 
 
@@ -112,6 +150,13 @@ class AgentApplicationDocumentsResponse(BaseModel):
         orm_mode = True
 
 
+class DocumentUploadAccepted(BaseModel):
+    # Poll GET /api/jobs/{job_id}; the files are attached to the application once it succeeds
+    job_id: UUID
+    status: str
+    files: Dict[str, str]
+
+
 
 ''' Agent Application Documents Schemas End'''
 
@@ -219,6 +264,31 @@ class AgentApplicationCommissionResponse(AgentApplicationCommissionBase):
 ''' Agent Application Commission End '''
 
 
+''' Application Dashboard Schemas Start '''
+
+
+class DashboardTotals(BaseModel):
+    count: int
+    student_fee: int
+    commission: int
+
+
+class DashboardEntry(DashboardTotals):
+    key: str
+    name: Optional[str] = None
+
+
+class ApplicationDashboard(BaseModel):
+    total: DashboardTotals
+    status: List[DashboardEntry]
+    agent: List[DashboardEntry]
+    university: List[DashboardEntry]
+    country: List[DashboardEntry]
+
+
+''' Application Dashboard Schemas End '''
+
+
 ''' Agent Admission Application Schemas Start'''
 
 
@@ -272,6 +342,19 @@ class AgentAdmissionApplicationResponse(AgentAdmissionApplicationBase):
         orm_mode = True
 
 
+class AgentAdmissionApplicationPage(BaseModel):
+    items: List[AgentAdmissionApplicationResponse]
+    next_cursor: Optional[int] = None
+
+
+class AgentAdmissionApplicationImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    application_ids: List[int]
+    errors: List[BulkImportRowError]
+
+
 ''' Agent Admission Application Schemas End'''
 
 
@@ -297,6 +380,8 @@ class BlogAndEventUpdate(BaseModel):
 class BlogAndEventResponse(BlogAndEventBase):
     id: int
     image: Optional[str] = None
+    image_thumbnail: Optional[str] = None
+    image_webp: Optional[str] = None
     published_at: datetime
 
     class Config:
@@ -305,5 +390,7 @@ class BlogAndEventResponse(BlogAndEventBase):
 class OffersResponse(BaseModel):
     id: int
     image: str
+    image_thumbnail: Optional[str] = None
+    image_webp: Optional[str] = None
 
 ''' Blogs, Events and Offers SCHEMA End '''
\ No newline at end of file
@@ -0,0 +1,160 @@
+import re
+from typing import List, Optional
+from tortoise import connections
+from tortoise.transactions import in_transaction
+from .models import Course
+
+
+''' Course full-text search (SQLite FTS5) '''
+
+COURSE_SEARCH_TABLE = 'course_search'
+
+# rowid of every index row is the course id
+CREATE_COURSE_SEARCH_TABLE = f'''
+CREATE VIRTUAL TABLE IF NOT EXISTS "{COURSE_SEARCH_TABLE}" USING fts5(
+    name,
+    course_type,
+    description,
+    university_name,
+    country_name,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)'''
+
+INDEX_COURSES_SQL = f'''
+INSERT INTO "{COURSE_SEARCH_TABLE}" (rowid, name, course_type, description, university_name, country_name)
+SELECT c.id, c.name, c.course_type, c.description, u.name, co.name
+FROM "course" c
+JOIN "university" u ON u.id = c.university_id
+JOIN "country" co ON co.id = u.country_id'''
+
+UNINDEX_COURSES_SQL = f'''
+DELETE FROM "{COURSE_SEARCH_TABLE}" WHERE rowid IN (
+    SELECT c.id FROM "course" c JOIN "university" u ON u.id = c.university_id WHERE {{where}}
+)'''
+
+# Column weights for bm25(): name, course_type, description, university_name, country_name;
+# matched against the rank column so ORDER BY rank uses them
+RANK_FUNCTION = 'bm25(10.0, 4.0, 1.0, 5.0, 3.0)'
+
+
+def _db():
+    return connections.get('default')
+
+
+def _read_db():
+    # Lets the router send searches to the read connection
+    return Course._choose_db()
+
+
+def search_enabled() -> bool:
+    return _db().capabilities.dialect == 'sqlite'
+
+
+def build_match_query(search: str) -> Optional[str]:
+    # Quote every term so user input can't inject FTS syntax, and prefix-match each one
+    terms = re.findall(r'\w+', search)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+async def ensure_course_search_index():
+    if not search_enabled():
+        return
+
+    db = _db()
+    await db.execute_script(CREATE_COURSE_SEARCH_TABLE)
+
+    # Backfill once for databases that existed before the index did
+    rows = await db.execute_query_dict(f'SELECT rowid FROM "{COURSE_SEARCH_TABLE}" LIMIT 1')
+    if not rows:
+        await db.execute_query(INDEX_COURSES_SQL)
+
+
+async def rebuild_course_search_index():
+    if not search_enabled():
+        return
+
+    await _db().execute_script(CREATE_COURSE_SEARCH_TABLE)
+    # One transaction, so searches see the old index until the new one is complete,
+    # and a crash halfway leaves the old one in place
+    async with in_transaction('default') as db:
+        await db.execute_query(f'DELETE FROM "{COURSE_SEARCH_TABLE}"')
+        await db.execute_query(INDEX_COURSES_SQL)
+
+
+async def _reindex(where: str, values: list):
+    # One transaction, so a failed insert can't leave the courses out of the index
+    async with in_transaction('default') as db:
+        await db.execute_query(UNINDEX_COURSES_SQL.format(where=where), values)
+        await db.execute_query(f'{INDEX_COURSES_SQL} WHERE {where}', values)
+
+
+async def index_course(course_id: int):
+    if search_enabled():
+        await _reindex('c.id = ?', [course_id])
+
+
+async def index_university_courses(university_id: int):
+    if search_enabled():
+        await _reindex('u.id = ?', [university_id])
+
+
+async def index_country_courses(country_id: int):
+    if search_enabled():
+        await _reindex('u.country_id = ?', [country_id])
+
+
+async def unindex_course(course_id: int):
+    if search_enabled():
+        await _db().execute_query(f'DELETE FROM "{COURSE_SEARCH_TABLE}" WHERE rowid = ?', [course_id])
+
+
+async def unindex_university_courses(university_id: int):
+    # Must run before the university is deleted, while its courses still exist
+    if search_enabled():
+        await _db().execute_query(UNINDEX_COURSES_SQL.format(where='u.id = ?'), [university_id])
+
+
+async def unindex_country_courses(country_id: int):
+    if search_enabled():
+        await _db().execute_query(UNINDEX_COURSES_SQL.format(where='u.country_id = ?'), [country_id])
+
+
+async def search_course_ids(
+    search: str,
+    country: Optional[int] = None,
+    university: Optional[int] = None,
+    course_type: Optional[str] = None,
+    limit: int = 50,
+) -> List[int]:
+    match = build_match_query(search)
+    if not match:
+        return []
+
+    where = [f'"{COURSE_SEARCH_TABLE}" MATCH ?', f'"{COURSE_SEARCH_TABLE}".rank MATCH ?']
+    values = [match, RANK_FUNCTION]
+    if country:
+        where.append('u.country_id = ?')
+        values.append(country)
+    if university:
+        where.append('c.university_id = ?')
+        values.append(university)
+    if course_type:
+        where.append('c.course_type = ?')
+        values.append(course_type)
+    values.append(limit)
+
+    # Every match that passes the filters is ranked, and only the top `limit` are kept
+    rows = await _read_db().execute_query_dict(
+        f'''SELECT c.id AS id
+        FROM "{COURSE_SEARCH_TABLE}"
+        JOIN "course" c ON c.id = "{COURSE_SEARCH_TABLE}".rowid
+        JOIN "university" u ON u.id = c.university_id
+        WHERE {' AND '.join(where)}
+        ORDER BY "{COURSE_SEARCH_TABLE}".rank
+        LIMIT ?''',
+        values,
+    )
+    return [row['id'] for row in rows]
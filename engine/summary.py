@@ -0,0 +1,168 @@
+from collections import defaultdict
+from enum import Enum
+from tortoise.transactions import in_transaction
+from .models import AgentAdmissionApplication, ApplicationSummary, University, Country
+from users.models import User
+
+
+''' Agent application dashboard totals
+
+ApplicationSummary keeps one row per (dimension, key): the whole table
+('total', ''), every status, agent, university and country. Each row holds
+the number of applications and the sum of their student_fee and commission.
+Every mutation applies the difference between the application's state
+before and after, so the dashboard reads a handful of rows however many
+applications exist. rebuild_application_summary() recomputes everything
+from scratch.
+'''
+
+DIMENSIONS = ('status', 'agent', 'university', 'country')
+
+REBUILD_BATCH_SIZE = 5000
+# Rows per upsert statement; 5 parameters each stays under SQLite's oldest limit of 999
+UPSERT_BATCH_SIZE = 150
+
+
+def summary_state(
+    status,
+    agent_id=None,
+    country_id=None,
+    university_ids=(),
+    student_fee: int = 0,
+    commission: int = 0,
+):
+    # What one application contributes: the keys it is counted under, and its amounts
+    keys = [('total', ''), ('status', status.value if isinstance(status, Enum) else status)]
+    if agent_id:
+        keys.append(('agent', str(agent_id)))
+    if country_id:
+        keys.append(('country', str(country_id)))
+    # An application listing the same university twice is counted once
+    keys.extend(('university', str(university_id)) for university_id in dict.fromkeys(university_ids) if university_id)
+    return keys, student_fee or 0, commission or 0
+
+
+def application_summary_state(application, commission=None):
+    return summary_state(
+        application.status,
+        application.agent_id,
+        application.country_id,
+        (application.university_one_id, application.university_two_id, application.university_three_id),
+        commission.student_fee if commission else 0,
+        commission.commission if commission else 0,
+    )
+
+
+def summary_changes(before=None, after=None, changes=None) -> dict:
+    # (dimension, key) -> [count, student_fee, commission] deltas
+    changes = changes if changes is not None else defaultdict(lambda: [0, 0, 0])
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None:
+            continue
+        keys, student_fee, commission = state
+        for key in keys:
+            delta = changes[key]
+            delta[0] += sign
+            delta[1] += sign * student_fee
+            delta[2] += sign * commission
+    return changes
+
+
+UPSERT_SUMMARY_SQL = '''
+INSERT INTO "{table}" ("dimension", "key", "count", "student_fee", "commission") VALUES {values}
+ON CONFLICT ("dimension", "key") DO UPDATE SET
+    "count" = "{table}"."count" + excluded."count",
+    "student_fee" = "{table}"."student_fee" + excluded."student_fee",
+    "commission" = "{table}"."commission" + excluded."commission"'''
+
+
+async def apply_summary_changes(changes: dict, using_db=None):
+    # One upsert for every key instead of an UPDATE (and maybe an INSERT) per key
+    rows = sorted(
+        (dimension, key, count, student_fee, commission)
+        for (dimension, key), (count, student_fee, commission) in changes.items()
+        if count or student_fee or commission
+    )
+    if not rows:
+        return
+
+    db = using_db or ApplicationSummary._choose_db(for_write=True)
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        if db.capabilities.dialect == 'postgres':
+            values = ', '.join(f'(${n * 5 + 1}, ${n * 5 + 2}, ${n * 5 + 3}, ${n * 5 + 4}, ${n * 5 + 5})' for n in range(len(batch)))
+        else:
+            values = ', '.join(['(?, ?, ?, ?, ?)'] * len(batch))
+        await db.execute_query(
+            UPSERT_SUMMARY_SQL.format(table=ApplicationSummary._meta.db_table, values=values),
+            [value for row in batch for value in row],
+        )
+
+
+async def update_application_summary(before=None, after=None, using_db=None):
+    await apply_summary_changes(summary_changes(before, after), using_db)
+
+
+async def discard_summary_keys(dimension: str, keys: list, using_db=None):
+    # For parents whose delete sets the applications' foreign key to NULL; pass the
+    # transaction of that delete
+    if keys:
+        await ApplicationSummary.filter(dimension=dimension, key__in=[str(key) for key in keys]).using_db(using_db).delete()
+
+
+async def rebuild_application_summary():
+    changes = defaultdict(lambda: [0, 0, 0])
+    last_id = 0
+    while True:
+        rows = await AgentAdmissionApplication.filter(id__gt=last_id).order_by('id').limit(REBUILD_BATCH_SIZE).values_list(
+            'id', 'status', 'agent_id', 'country_id',
+            'university_one_id', 'university_two_id', 'university_three_id',
+            'commission__student_fee', 'commission__commission',
+        )
+        if not rows:
+            break
+        for _, status, agent_id, country_id, one, two, three, student_fee, commission in rows:
+            summary_changes(after=summary_state(status, agent_id, country_id, (one, two, three), student_fee, commission), changes=changes)
+        last_id = rows[-1][0]
+
+    async with in_transaction('default') as conn:
+        await ApplicationSummary.all().using_db(conn).delete()
+        await ApplicationSummary.bulk_create(
+            [
+                ApplicationSummary(dimension=dimension, key=key, count=count, student_fee=student_fee, commission=commission)
+                for (dimension, key), (count, student_fee, commission) in changes.items()
+            ],
+            using_db=conn,
+        )
+    return len(changes)
+
+
+async def ensure_application_summary():
+    # Backfill once for databases that had applications before the summary table existed
+    if not await ApplicationSummary.exists() and await AgentAdmissionApplication.exists():
+        await rebuild_application_summary()
+
+
+async def application_dashboard() -> dict:
+    rows = await ApplicationSummary.filter(count__gt=0).order_by('-count')
+
+    labels = {}
+    ids = {dimension: [int(row.key) for row in rows if row.dimension == dimension] for dimension in ('agent', 'university', 'country')}
+    if ids['agent']:
+        labels['agent'] = dict(await User.filter(id__in=ids['agent']).values_list('id', 'username'))
+    if ids['university']:
+        labels['university'] = dict(await University.filter(id__in=ids['university']).values_list('id', 'name'))
+    if ids['country']:
+        labels['country'] = dict(await Country.filter(id__in=ids['country']).values_list('id', 'name'))
+
+    dashboard = {'total': {'count': 0, 'student_fee': 0, 'commission': 0}}
+    dashboard.update({dimension: [] for dimension in DIMENSIONS})
+    for row in rows:
+        totals = {'count': row.count, 'student_fee': row.student_fee, 'commission': row.commission}
+        if row.dimension == 'total':
+            dashboard['total'] = totals
+        elif row.dimension == 'status':
+            dashboard['status'].append({'key': row.key, 'name': row.key, **totals})
+        elif row.dimension in labels:
+            dashboard[row.dimension].append({'key': row.key, 'name': labels[row.dimension].get(int(row.key)), **totals})
+    return dashboard
@@ -0,0 +1,32 @@
+from tortoise import fields, models
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    QUEUED = 'Queued'
+    RUNNING = 'Running'
+    SUCCEEDED = 'Succeeded'
+    FAILED = 'Failed'
+
+
+class Job(models.Model):
+    # UUIDs so a status URL handed to an anonymous uploader can't be guessed
+    id = fields.UUIDField(pk=True)
+    name = fields.CharField(100)
+    payload = fields.JSONField(default=dict)
+    status = fields.CharEnumField(JobStatus, default=JobStatus.QUEUED)
+    idempotency_key = fields.CharField(255, null=True, unique=True)
+    attempts = fields.IntField(default=0)
+    max_attempts = fields.IntField(default=5)
+    run_at = fields.DatetimeField()
+    locked_until = fields.DatetimeField(null=True)
+    last_error = fields.TextField(null=True)
+    result = fields.JSONField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    finished_at = fields.DatetimeField(null=True)
+
+    class Meta:
+        indexes = (('status', 'run_at'),)
+
+    def __str__(self):
+        return f'{self.name} ({self.status.value})'
@@ -0,0 +1,73 @@
+import asyncio
+import importlib
+from datetime import timedelta
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+from core.config import settings
+from .models import Job
+
+
+''' Persistent job queue
+
+Jobs are rows in the job table, so they survive restarts and can be run by
+the workers started with the app or by `python -m commands.run_jobs`.
+A handler is an async function registered with @job_handler(name); it
+receives the job's payload as keyword arguments and may return a JSON
+result. Failed jobs are retried with exponential backoff until
+max_attempts, and a job whose worker died is picked up again once its
+lease expires, or failed if that was its last attempt. Handlers must therefore be safe to run more than once.
+'''
+
+# Modules whose @job_handler functions workers need to know about
+HANDLER_MODULES = ('engine.document_jobs',)
+
+HANDLERS = {}
+
+# Set by enqueue() so workers in this process start at once instead of at the next poll
+job_enqueued = asyncio.Event()
+
+
+def job_handler(name: str):
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def load_handlers() -> dict:
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+    return HANDLERS
+
+
+async def enqueue(
+    name: str,
+    payload: dict = None,
+    idempotency_key: str = None,
+    max_attempts: int = None,
+    delay_seconds: float = 0,
+    using_db=None,
+) -> Job:
+    """Queue a job, or return the existing one with the same idempotency key."""
+    if idempotency_key:
+        job = await Job.get_or_none(idempotency_key=idempotency_key, using_db=using_db)
+        if job:
+            return job
+
+    try:
+        job = await Job.create(
+            name=name,
+            payload=payload or {},
+            idempotency_key=idempotency_key,
+            max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+            run_at=timezone.now() + timedelta(seconds=delay_seconds),
+            using_db=using_db,
+        )
+    except IntegrityError:
+        # Another request with the same key got there first
+        if not idempotency_key:
+            raise
+        return await Job.get(idempotency_key=idempotency_key, using_db=using_db)
+
+    job_enqueued.set()
+    return job
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException
+from uuid import UUID
+from .models import Job
+from .schemas import JobResponse
+
+router = APIRouter()
+
+
+@router.get('/{job_id}', response_model=JobResponse)
+async def retrieve_a_job(job_id: UUID):
+    # Job ids are random UUIDs handed out to whoever queued the job
+    job = await Job.get_or_none(id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Job not found.')
+    return job
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+from .models import JobStatus
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    name: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    result: Optional[Any] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        use_enum_values = True
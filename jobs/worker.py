@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import traceback
+from datetime import timedelta
+from tortoise import timezone
+from tortoise.expressions import Q
+from core.config import settings
+from .models import Job, JobStatus
+from .queue import job_enqueued, load_handlers
+
+logger = logging.getLogger(__name__)
+
+
+async def claim_job():
+    """Lease the next due job to this worker, or return None.
+
+    The claim is a compare-and-set on (status, attempts), so two workers,
+    in this process or another one, never run the same attempt. A job whose
+    lease ran out on its last attempt is marked failed instead of run again.
+    """
+    while True:
+        now = timezone.now()
+        job = await Job.filter(
+            Q(status=JobStatus.QUEUED, run_at__lte=now) | Q(status=JobStatus.RUNNING, locked_until__lt=now)
+        ).order_by('run_at').first()
+        if job is None:
+            return None
+
+        if job.status == JobStatus.RUNNING and job.attempts >= job.max_attempts:
+            # The worker running the last attempt died or overran its lease
+            await Job.filter(id=job.id, status=job.status, attempts=job.attempts).update(
+                status=JobStatus.FAILED, locked_until=None, finished_at=now,
+                last_error=f'Lease expired during attempt {job.attempts} of {job.max_attempts}',
+            )
+            continue
+
+        claimed = await Job.filter(id=job.id, status=job.status, attempts=job.attempts).update(
+            status=JobStatus.RUNNING,
+            attempts=job.attempts + 1,
+            locked_until=now + timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+        )
+        if claimed:
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            return job
+
+
+def _leased(job: Job):
+    # Writes only land while this worker still holds the attempt it claimed; after the
+    # lease expired another worker may have claimed the job again
+    return Job.filter(id=job.id, status=JobStatus.RUNNING, attempts=job.attempts)
+
+
+async def run_job(job: Job):
+    handler = load_handlers().get(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f'No handler registered for job {job.name!r}')
+        result = await handler(**job.payload)
+    except Exception as e:
+        error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+        if job.attempts < job.max_attempts:
+            # 1x, 2x, 4x ... the base backoff
+            delay = settings.JOBS_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            updated = await _leased(job).update(
+                status=JobStatus.QUEUED, run_at=timezone.now() + timedelta(seconds=delay),
+                locked_until=None, last_error=error,
+            )
+        else:
+            updated = await _leased(job).update(
+                status=JobStatus.FAILED, locked_until=None, last_error=error, finished_at=timezone.now(),
+            )
+        logger.warning('Job %s (%s) attempt %s failed: %s', job.id, job.name, job.attempts, error)
+        if not updated:
+            logger.warning('Job %s (%s) attempt %s lost its lease, result discarded', job.id, job.name, job.attempts)
+        return False
+
+    updated = await _leased(job).update(
+        status=JobStatus.SUCCEEDED, locked_until=None, result=result, finished_at=timezone.now(),
+    )
+    if not updated:
+        logger.warning('Job %s (%s) attempt %s lost its lease, result discarded', job.id, job.name, job.attempts)
+        return False
+    return True
+
+
+async def run_pending_jobs() -> int:
+    # Run every job that is due right now, one after another; for commands and tests
+    count = 0
+    while job := await claim_job():
+        await run_job(job)
+        count += 1
+    return count
+
+
+async def worker_loop(stop: asyncio.Event, poll_interval: float = None):
+    poll_interval = settings.JOBS_POLL_INTERVAL_SECONDS if poll_interval is None else poll_interval
+    while not stop.is_set():
+        try:
+            job = await claim_job()
+        except Exception:
+            logger.exception('Could not claim a job')
+            job = None
+
+        if job is not None:
+            await run_job(job)
+            continue
+
+        # Idle until a job is queued in this process, the next poll, or shutdown
+        job_enqueued.clear()
+        waiters = [asyncio.ensure_future(job_enqueued.wait()), asyncio.ensure_future(stop.wait())]
+        await asyncio.wait(waiters, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waiters:
+            waiter.cancel()
+
+
+class WorkerPool:
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.stop_event = asyncio.Event()
+        self.tasks = []
+
+    def start(self):
+        load_handlers()
+        self.tasks = [asyncio.create_task(worker_loop(self.stop_event)) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        # A job cut off here keeps its lease and is retried once it expires
+        self.stop_event.set()
+        if self.tasks:
+            await asyncio.wait(self.tasks, timeout=settings.JOBS_SHUTDOWN_TIMEOUT_SECONDS)
+            for task in self.tasks:
+                task.cancel()
+        self.tasks = []
+
+    async def run_forever(self):
+        self.start()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
@@ -5,7 +5,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from core.tortoise_config import TORTOISE_ORM
 from commands.__init__ import create_superuser
-from fastapi.staticfiles import StaticFiles
+from engine.search import ensure_course_search_index
+from engine.summary import ensure_application_summary
+from core.compression import CompressionMiddleware, PrecompressedStaticFiles
+from core.images import shutdown_image_executor
+from core.config import settings
+from jobs.worker import WorkerPool
+from core.metrics import MetricsMiddleware, install_query_hook, monitor_event_loop_lag
+import asyncio
 import os
 
 
@@ -22,6 +29,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON/text responses
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency and SQL counts for /metrics and Server-Timing; added last so it times everything
+install_query_hook()
+app.add_middleware(MetricsMiddleware)
+
 # Include the API router
 app.include_router(api_router)
 
@@ -35,8 +49,25 @@ register_tortoise(
 
 
 # Serve static files (like Django's MEDIA_URL)
-app.mount("/media", StaticFiles(directory="media"), name="media")
+# .br/.gz variants written at upload time are served to clients that accept them
+app.mount("/media", PrecompressedStaticFiles(directory="media"), name="media")
 
 @app.on_event("startup")
 async def startup_event():
     await create_superuser()
+    await ensure_course_search_index()
+    await ensure_application_summary()
+    if settings.METRICS_ENABLED:
+        app.state.loop_lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+    if settings.JOBS_IN_PROCESS_WORKERS:
+        app.state.job_workers = WorkerPool(settings.JOBS_IN_PROCESS_WORKERS)
+        app.state.job_workers.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if getattr(app.state, "loop_lag_monitor", None):
+        app.state.loop_lag_monitor.cancel()
+    if getattr(app.state, "job_workers", None):
+        await app.state.job_workers.stop()
+    shutdown_image_executor()
@@ -0,0 +1,36 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "intake" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "name" VARCHAR(100) NOT NULL
+);
+        CREATE TABLE IF NOT EXISTS "blogandevent" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "type" VARCHAR(5) NOT NULL DEFAULT 'Blog' /* BLOG: Blog\\nEVENT: Event */,
+    "title" VARCHAR(255) NOT NULL,
+    "description" TEXT NOT NULL,
+    "image" VARCHAR(350),
+    "published_at" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+        CREATE TABLE IF NOT EXISTS "offers" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "image" VARCHAR(355)
+);
+        ALTER TABLE "university" ADD "website_link" VARCHAR(300);
+        ALTER TABLE "agentadmissionapplication" ADD "country_id" INT REFERENCES "country" ("id") ON DELETE SET NULL;
+        ALTER TABLE "userprofile" DROP COLUMN "student_country";
+        ALTER TABLE "userprofile" DROP COLUMN "student_destination_country";"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "userprofile" ADD "student_country" VARCHAR(100) NOT NULL DEFAULT '';
+        ALTER TABLE "userprofile" ADD "student_destination_country" VARCHAR(100) NOT NULL DEFAULT '';
+        ALTER TABLE "agentadmissionapplication" DROP COLUMN "country_id";
+        ALTER TABLE "university" DROP COLUMN "website_link";
+        DROP TABLE IF EXISTS "offers";
+        DROP TABLE IF EXISTS "blogandevent";
+        DROP TABLE IF EXISTS "intake";"""
@@ -0,0 +1,27 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_country_name_534b29" ON "country" ("name");
+        CREATE INDEX IF NOT EXISTS "idx_university_country_8f27a2" ON "university" ("country_id", "varsity_type");
+        CREATE INDEX IF NOT EXISTS "idx_university_varsity_2b77b4" ON "university" ("varsity_type");
+        CREATE INDEX IF NOT EXISTS "idx_course_univers_d4ab41" ON "course" ("university_id", "course_type");
+        CREATE INDEX IF NOT EXISTS "idx_course_course__403197" ON "course" ("course_type");
+        CREATE INDEX IF NOT EXISTS "idx_course_name_3ad36f" ON "course" ("name");
+        CREATE INDEX IF NOT EXISTS "idx_agentadmiss_agent_i_b9ec85" ON "agentadmissionapplication" ("agent_id", "status");
+        CREATE INDEX IF NOT EXISTS "idx_agentadmiss_status_9902c5" ON "agentadmissionapplication" ("status");
+        CREATE INDEX IF NOT EXISTS "idx_blogandeven_type_5d1cbc" ON "blogandevent" ("type");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_country_name_534b29";
+        DROP INDEX IF EXISTS "idx_university_country_8f27a2";
+        DROP INDEX IF EXISTS "idx_university_varsity_2b77b4";
+        DROP INDEX IF EXISTS "idx_course_univers_d4ab41";
+        DROP INDEX IF EXISTS "idx_course_course__403197";
+        DROP INDEX IF EXISTS "idx_course_name_3ad36f";
+        DROP INDEX IF EXISTS "idx_agentadmiss_agent_i_b9ec85";
+        DROP INDEX IF EXISTS "idx_agentadmiss_status_9902c5";
+        DROP INDEX IF EXISTS "idx_blogandeven_type_5d1cbc";"""
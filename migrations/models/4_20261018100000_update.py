@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "applicationsummary" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "dimension" VARCHAR(20) NOT NULL,
+    "key" VARCHAR(50) NOT NULL,
+    "count" INT NOT NULL DEFAULT 0,
+    "student_fee" BIGINT NOT NULL DEFAULT 0,
+    "commission" BIGINT NOT NULL DEFAULT 0,
+    CONSTRAINT "uid_application_dimensi_89eb7a" UNIQUE ("dimension", "key")
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "applicationsummary";"""
@@ -0,0 +1,25 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "university" ADD "image_thumbnail" VARCHAR(255);
+        ALTER TABLE "university" ADD "image_webp" VARCHAR(255);
+        ALTER TABLE "course" ADD "image_thumbnail" VARCHAR(255);
+        ALTER TABLE "course" ADD "image_webp" VARCHAR(255);
+        ALTER TABLE "blogandevent" ADD "image_thumbnail" VARCHAR(350);
+        ALTER TABLE "blogandevent" ADD "image_webp" VARCHAR(350);
+        ALTER TABLE "offers" ADD "image_thumbnail" VARCHAR(355);
+        ALTER TABLE "offers" ADD "image_webp" VARCHAR(355);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "university" DROP COLUMN "image_thumbnail";
+        ALTER TABLE "university" DROP COLUMN "image_webp";
+        ALTER TABLE "course" DROP COLUMN "image_thumbnail";
+        ALTER TABLE "course" DROP COLUMN "image_webp";
+        ALTER TABLE "blogandevent" DROP COLUMN "image_thumbnail";
+        ALTER TABLE "blogandevent" DROP COLUMN "image_webp";
+        ALTER TABLE "offers" DROP COLUMN "image_thumbnail";
+        ALTER TABLE "offers" DROP COLUMN "image_webp";"""
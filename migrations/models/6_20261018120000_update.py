@@ -0,0 +1,26 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "job" (
+    "id" CHAR(36) NOT NULL PRIMARY KEY,
+    "name" VARCHAR(100) NOT NULL,
+    "payload" JSON NOT NULL,
+    "status" VARCHAR(9) NOT NULL DEFAULT 'Queued' /* QUEUED: Queued\\nRUNNING: Running\\nSUCCEEDED: Succeeded\\nFAILED: Failed */,
+    "idempotency_key" VARCHAR(255) UNIQUE,
+    "attempts" INT NOT NULL DEFAULT 0,
+    "max_attempts" INT NOT NULL DEFAULT 5,
+    "run_at" TIMESTAMP NOT NULL,
+    "locked_until" TIMESTAMP,
+    "last_error" TEXT,
+    "result" JSON,
+    "created_at" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "finished_at" TIMESTAMP
+);
+        CREATE INDEX IF NOT EXISTS "idx_job_status_920a13" ON "job" ("status", "run_at");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "job";"""
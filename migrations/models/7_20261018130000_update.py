@@ -0,0 +1,15 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "tableversion" (
+    "name" VARCHAR(100) NOT NULL PRIMARY KEY,
+    "version" INT NOT NULL DEFAULT 0,
+    "modified_at" TIMESTAMP NOT NULL
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "tableversion";"""
@@ -0,0 +1,193 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "user" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "username" VARCHAR(50) NOT NULL UNIQUE,
+    "email" VARCHAR(100) NOT NULL UNIQUE,
+    "password_hash" VARCHAR(128) NOT NULL,
+    "is_admin" BOOL NOT NULL DEFAULT False,
+    "is_verified" BOOL NOT NULL DEFAULT False
+);
+CREATE TABLE IF NOT EXISTS "userprofile" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "full_name" VARCHAR(100) NOT NULL,
+    "phone" VARCHAR(25) NOT NULL,
+    "whatsapp" VARCHAR(25) NOT NULL,
+    "address" VARCHAR(500) NOT NULL,
+    "occupation" VARCHAR(255) NOT NULL,
+    "experience" BOOL NOT NULL DEFAULT False,
+    "exp_description" TEXT,
+    "initial_refffer" VARCHAR(255) NOT NULL,
+    "no_of_deal" INT NOT NULL DEFAULT 0,
+    "office" BOOL NOT NULL DEFAULT False,
+    "office_address" VARCHAR(255),
+    "special_service" TEXT,
+    "nid_passport_file" VARCHAR(500),
+    "user_id" INT NOT NULL UNIQUE REFERENCES "user" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "applicationsummary" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "dimension" VARCHAR(20) NOT NULL,
+    "key" VARCHAR(50) NOT NULL,
+    "count" INT NOT NULL DEFAULT 0,
+    "student_fee" BIGINT NOT NULL DEFAULT 0,
+    "commission" BIGINT NOT NULL DEFAULT 0,
+    CONSTRAINT "uid_application_dimensi_89eb7a" UNIQUE ("dimension", "key")
+);
+CREATE TABLE IF NOT EXISTS "blogandevent" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "type" VARCHAR(5) NOT NULL DEFAULT 'Blog',
+    "title" VARCHAR(255) NOT NULL,
+    "description" TEXT NOT NULL,
+    "image" VARCHAR(350),
+    "image_thumbnail" VARCHAR(350),
+    "image_webp" VARCHAR(350),
+    "published_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_blogandeven_type_5d1cbc" ON "blogandevent" ("type");
+COMMENT ON COLUMN "blogandevent"."type" IS 'BLOG: Blog\\nEVENT: Event';
+CREATE TABLE IF NOT EXISTS "country" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(100) NOT NULL,
+    "description" TEXT
+);
+CREATE INDEX IF NOT EXISTS "idx_country_name_534b29" ON "country" ("name");
+CREATE TABLE IF NOT EXISTS "intake" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(100) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "offers" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "image" VARCHAR(355),
+    "image_thumbnail" VARCHAR(355),
+    "image_webp" VARCHAR(355)
+);
+CREATE TABLE IF NOT EXISTS "university" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "varsity_type" VARCHAR(11) NOT NULL DEFAULT 'Public',
+    "name" VARCHAR(300) NOT NULL,
+    "location" VARCHAR(300) NOT NULL,
+    "description" TEXT,
+    "image" VARCHAR(255),
+    "image_thumbnail" VARCHAR(255),
+    "image_webp" VARCHAR(255),
+    "website_link" VARCHAR(300),
+    "country_id" INT NOT NULL REFERENCES "country" ("id") ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS "idx_university_country_8f27a2" ON "university" ("country_id", "varsity_type");
+CREATE INDEX IF NOT EXISTS "idx_university_varsity_2b77b4" ON "university" ("varsity_type");
+COMMENT ON COLUMN "university"."varsity_type" IS 'PUBLIC: Public\\nPRIVATE: Private\\nSEMI_PUBLIC: Semi Public';
+CREATE TABLE IF NOT EXISTS "course" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(200) NOT NULL,
+    "course_type" VARCHAR(200),
+    "fee" INT,
+    "description" TEXT,
+    "image" VARCHAR(255),
+    "image_thumbnail" VARCHAR(255),
+    "image_webp" VARCHAR(255),
+    "university_id" INT NOT NULL REFERENCES "university" ("id") ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS "idx_course_univers_d4ab41" ON "course" ("university_id", "course_type");
+CREATE INDEX IF NOT EXISTS "idx_course_course__403197" ON "course" ("course_type");
+CREATE INDEX IF NOT EXISTS "idx_course_name_3ad36f" ON "course" ("name");
+CREATE TABLE IF NOT EXISTS "agentadmissionapplication" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "first_name" VARCHAR(55) NOT NULL,
+    "last_name" VARCHAR(55) NOT NULL,
+    "email" VARCHAR(55) NOT NULL,
+    "phone" VARCHAR(20) NOT NULL,
+    "passport_no" VARCHAR(100) NOT NULL,
+    "last_graduation" VARCHAR(55),
+    "status" VARCHAR(21) NOT NULL DEFAULT 'New',
+    "agent_id" INT REFERENCES "user" ("id") ON DELETE SET NULL,
+    "country_id" INT REFERENCES "country" ("id") ON DELETE SET NULL,
+    "course_id" INT REFERENCES "course" ("id") ON DELETE SET NULL,
+    "university_one_id" INT REFERENCES "university" ("id") ON DELETE SET NULL,
+    "university_three_id" INT REFERENCES "university" ("id") ON DELETE SET NULL,
+    "university_two_id" INT REFERENCES "university" ("id") ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS "idx_agentadmiss_agent_i_b9ec85" ON "agentadmissionapplication" ("agent_id", "status");
+CREATE INDEX IF NOT EXISTS "idx_agentadmiss_status_9902c5" ON "agentadmissionapplication" ("status");
+COMMENT ON COLUMN "agentadmissionapplication"."status" IS 'NEW: New\\nREVIEW: Review\\nCOMMISSION_PAID: Commission Paid\\nREJECTED: Rejected\\nCONDITIONALOFFER: Conditional Offer\\nUNCONDITIONALOFFER: Unconditional Offer\\nCASDOCUMENTPENDING: CAS Documents Pending\\nCASINTERVIEWPENDING: CAS InterView Pending\\nCASINTERVIEWPASSED: CAS InterView Passed\\nCASRECEIVED: CAS Received\\nAPPLYFORVISA: Apply For Visa\\nVISARECEIVED: Visa Received\\nENROLLEMENTPENDING: Enrollement Pending\\nENROLLEMENTCOMPLETE: Enrollement Complete';
+CREATE TABLE IF NOT EXISTS "agentapplicationcommission" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "student_fee" INT NOT NULL DEFAULT 0,
+    "commission" INT NOT NULL DEFAULT 0,
+    "commission_rate" INT NOT NULL DEFAULT 0,
+    "admission_application_id" INT NOT NULL UNIQUE REFERENCES "agentadmissionapplication" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "agentapplicationdocuments" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "passport" VARCHAR(300),
+    "masters_certificate" VARCHAR(300),
+    "masters_transcript" VARCHAR(300),
+    "honers_certificate" VARCHAR(300),
+    "honers_transcript" VARCHAR(300),
+    "hsc_certificate" VARCHAR(300),
+    "hsc_transcript" VARCHAR(300),
+    "ssc_certificate" VARCHAR(300),
+    "ssc_transcript" VARCHAR(300),
+    "ielts_certificate" VARCHAR(300),
+    "cv" VARCHAR(300),
+    "resume" VARCHAR(300),
+    "lor" VARCHAR(300),
+    "job_letter" VARCHAR(300),
+    "others" VARCHAR(300),
+    "admission_application_id" INT NOT NULL UNIQUE REFERENCES "agentadmissionapplication" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "studentadmissionapplication" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(100) NOT NULL,
+    "phone" VARCHAR(20) NOT NULL,
+    "email" VARCHAR(100),
+    "residence_country" VARCHAR(50) NOT NULL,
+    "interest_country" VARCHAR(50) NOT NULL,
+    "intake_interest" VARCHAR(200) NOT NULL,
+    "last_graduation" VARCHAR(200) NOT NULL,
+    "interested_course" VARCHAR(200) NOT NULL,
+    "current_stage" VARCHAR(200),
+    "preferred_university_id" INT NOT NULL REFERENCES "university" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "studentapplicationdocuments" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "passport" VARCHAR(300),
+    "last_graduation_certificate" VARCHAR(300),
+    "admission_application_id" INT NOT NULL UNIQUE REFERENCES "studentadmissionapplication" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "job" (
+    "id" UUID NOT NULL PRIMARY KEY,
+    "name" VARCHAR(100) NOT NULL,
+    "payload" JSONB NOT NULL,
+    "status" VARCHAR(9) NOT NULL DEFAULT 'Queued',
+    "idempotency_key" VARCHAR(255) UNIQUE,
+    "attempts" INT NOT NULL DEFAULT 0,
+    "max_attempts" INT NOT NULL DEFAULT 5,
+    "run_at" TIMESTAMPTZ NOT NULL,
+    "locked_until" TIMESTAMPTZ,
+    "last_error" TEXT,
+    "result" JSONB,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "finished_at" TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS "idx_job_status_920a13" ON "job" ("status", "run_at");
+COMMENT ON COLUMN "job"."status" IS 'QUEUED: Queued\\nRUNNING: Running\\nSUCCEEDED: Succeeded\\nFAILED: Failed';
+CREATE TABLE IF NOT EXISTS "tableversion" (
+    "name" VARCHAR(100) NOT NULL PRIMARY KEY,
+    "version" INT NOT NULL DEFAULT 0,
+    "modified_at" TIMESTAMPTZ NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "aerich" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "version" VARCHAR(255) NOT NULL,
+    "app" VARCHAR(100) NOT NULL,
+    "content" JSONB NOT NULL
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        """
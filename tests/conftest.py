@@ -0,0 +1,68 @@
+import copy
+import os
+import sqlite3
+import tempfile
+
+# Before anything imports core.config: a throwaway database, and nothing started in the background
+_tmp_dir = tempfile.mkdtemp(prefix='tests-')
+os.environ['DATABASE_URL'] = f'sqlite://{_tmp_dir}/test.sqlite3'
+os.environ['SQLITE_READ_CONNECTION'] = 'false'
+os.environ['JOBS_IN_PROCESS_WORKERS'] = '0'
+
+import pytest
+from tortoise import Tortoise
+from core.tortoise_config import TORTOISE_ORM
+
+
+def sqlite_config(path) -> dict:
+    return {**copy.deepcopy(TORTOISE_ORM), 'connections': {'default': f'sqlite://{path}'}, 'routers': []}
+
+
+def remove_database(path):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(f'{path}{suffix}'):
+            os.remove(f'{path}{suffix}')
+
+
+def bump_from_another_process(table):
+    # What a second worker or a command does: write the shared row over its own connection
+    db = sqlite3.connect(TORTOISE_ORM['connections']['default']['credentials']['file_path'])
+    with db:
+        db.execute(
+            '''INSERT INTO "tableversion" ("name", "version", "modified_at") VALUES (?, 1, '2030-01-01 00:00:00+00:00')
+            ON CONFLICT ("name") DO UPDATE SET "version" = "version" + 1, "modified_at" = excluded."modified_at"''',
+            [table],
+        )
+    db.close()
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+async def db():
+    # A fresh schema from the models for every test. Tortoise keeps the first
+    # connections dict it is given and updates it on every later init, so never hand it ours
+    await Tortoise.init(config=copy.deepcopy(TORTOISE_ORM))
+    await Tortoise.generate_schemas()
+    yield
+    await Tortoise.close_connections()
+    remove_database(TORTOISE_ORM['connections']['default']['credentials']['file_path'])
+
+
+@pytest.fixture
+async def client(db):
+    import httpx
+    from main import app
+    from core.http_cache import table_versions
+    from engine.cruds import catalog_cache
+    from users.dependencies import token_cache
+
+    # Entries cached from the previous test's database
+    table_versions.reset()
+    catalog_cache.invalidate()
+    token_cache.invalidate()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        yield client
@@ -0,0 +1,45 @@
+import sqlite3
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from core.config import settings
+from core.security import get_password_hash
+from core.tortoise_config import TORTOISE_ORM
+from users.dependencies import get_current_user
+from users.models import User
+from conftest import bump_from_another_process
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def agent_token(client):
+    await User.create(username='agent', email='agent@example.com', password_hash=get_password_hash('agent-password'), is_verified=True)
+    response = await client.post('/api/users/login', json={'username': 'agent', 'password': 'agent-password'})
+    return response.json()['token']['access_token']
+
+
+async def test_an_agent_unverified_in_another_process_is_refused(client, agent_token, monkeypatch):
+    monkeypatch.setattr(settings, 'TABLE_VERSION_POLL_SECONDS', 0)
+    headers = {'Authorization': f'Bearer {agent_token}'}
+    assert (await client.get('/api/agent/admission-application', headers=headers, params={'limit': 5})).status_code == 200
+
+    db = sqlite3.connect(TORTOISE_ORM['connections']['default']['credentials']['file_path'])
+    with db:
+        db.execute('''UPDATE "user" SET "is_verified" = 0 WHERE "username" = 'agent' ''')
+    db.close()
+    bump_from_another_process('user')
+    from core.http_cache import table_versions; from users.dependencies import token_cache
+    await table_versions.refresh(); print('DBG', table_versions._versions, token_cache.stats(), await User.get(username='agent').values('is_verified'))
+
+    assert (await client.get('/api/agent/admission-application', headers=headers, params={'limit': 5})).status_code == 403
+
+
+async def test_cached_users_are_not_shared_between_requests(client, agent_token):
+    credentials = HTTPAuthorizationCredentials(scheme='Bearer', credentials=agent_token)
+    first = await get_current_user(credentials)
+    first.is_verified = False
+
+    second = await get_current_user(credentials)
+    assert second is not first
+    assert second.is_verified
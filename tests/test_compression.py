@@ -0,0 +1,124 @@
+import gzip
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from core import compression
+from core.compression import CompressionMiddleware, accepted_encodings
+
+
+pytestmark = pytest.mark.anyio
+
+MINIMUM_SIZE = 100
+BIG = b'{"name": "University"}' * 20
+
+
+async def big_json(request):
+    return Response(BIG, media_type='application/json')
+
+
+async def small_json(request):
+    return Response(BIG[:MINIMUM_SIZE - 1], media_type='application/json')
+
+
+async def big_png(request):
+    return Response(BIG, media_type='image/png')
+
+
+async def big_text(request):
+    return PlainTextResponse(BIG.decode())
+
+
+async def already_encoded(request):
+    return Response(gzip.compress(BIG), media_type='application/json', headers={'Content-Encoding': 'gzip'})
+
+
+async def streamed_json(request):
+    async def chunks():
+        # Each chunk is below the minimum size; a stream is compressed anyway
+        for _ in range(3):
+            yield b'[1, 2, 3]'
+    return StreamingResponse(chunks(), media_type='application/json')
+
+
+async def events(request):
+    async def chunks():
+        yield b'data: ' + BIG + b'\n\n'
+    return StreamingResponse(chunks(), media_type='text/event-stream')
+
+
+app = CompressionMiddleware(
+    Starlette(routes=[
+        Route('/big-json', big_json),
+        Route('/small-json', small_json),
+        Route('/big-png', big_png),
+        Route('/big-text', big_text),
+        Route('/already-encoded', already_encoded),
+        Route('/streamed-json', streamed_json),
+        Route('/events', events),
+    ]),
+    minimum_size=MINIMUM_SIZE,
+    content_types=['application/json', 'text/'],
+)
+
+
+@pytest.fixture(params=['gzip', 'br'])
+def encoding(request, monkeypatch):
+    if request.param == 'br':
+        pytest.importorskip('brotli')
+    else:
+        # gzip even where brotli is installed
+        monkeypatch.setattr(compression, 'brotli', None)
+    return request.param
+
+
+@pytest.fixture
+async def client(encoding):
+    headers = {'Accept-Encoding': encoding}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test', headers=headers) as client:
+        yield client
+
+
+@pytest.mark.parametrize('url, body', [
+    ('/big-json', BIG),
+    ('/big-text', BIG),
+    ('/streamed-json', b'[1, 2, 3]' * 3),
+])
+async def test_allowlisted_types_are_compressed(client, encoding, url, body):
+    response = await client.get(url)
+    assert response.headers['content-encoding'] == encoding
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.content == body
+    if url != '/streamed-json':
+        assert int(response.headers['content-length']) < len(body)
+
+
+@pytest.mark.parametrize('url', ['/big-png', '/events'])
+async def test_types_off_the_allowlist_pass_through(client, url):
+    response = await client.get(url)
+    assert 'content-encoding' not in response.headers
+    assert BIG in response.content
+
+
+async def test_responses_under_the_minimum_size_pass_through(client):
+    response = await client.get('/small-json')
+    assert 'content-encoding' not in response.headers
+    assert response.content == BIG[:MINIMUM_SIZE - 1]
+
+
+async def test_encoded_responses_are_not_encoded_twice(client):
+    response = await client.get('/already-encoded')
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.content == BIG
+
+
+async def test_identity_when_nothing_is_accepted():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        response = await client.get('/big-json', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in response.headers
+    assert response.content == BIG
+
+
+def test_refused_encodings_are_not_accepted():
+    assert accepted_encodings('gzip;q=0, br;q=0.5, identity') == {'br', 'identity'}
@@ -0,0 +1,80 @@
+import sqlite3
+import pytest
+from core.config import settings
+from core.tortoise_config import TORTOISE_ORM
+from engine.models import Country
+from conftest import bump_from_another_process
+
+
+pytestmark = pytest.mark.anyio
+
+
+def rename_countries_from_another_process(name):
+    db = sqlite3.connect(TORTOISE_ORM['connections']['default']['credentials']['file_path'])
+    with db:
+        db.execute('UPDATE "country" SET "name" = ?', [name])
+    db.close()
+    bump_from_another_process('country')
+
+
+def queries(response) -> str:
+    return response.headers['server-timing'].rsplit('desc=', 1)[-1]
+
+
+async def test_a_current_copy_is_revalidated_without_a_query(client, monkeypatch):
+    monkeypatch.setattr(settings, 'TABLE_VERSION_POLL_SECONDS', 60)
+    etag = (await client.get('/api/offers/')).headers['etag']
+
+    response = await client.get('/api/offers/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert queries(response) == '"0 queries"'
+
+    # Until the next poll another process's write goes unseen
+    bump_from_another_process('offers')
+    assert (await client.get('/api/offers/', headers={'If-None-Match': etag})).status_code == 304
+    monkeypatch.setattr(settings, 'TABLE_VERSION_POLL_SECONDS', 0)
+    assert (await client.get('/api/offers/', headers={'If-None-Match': etag})).status_code == 200
+
+
+async def test_validators_change_with_writes_from_other_processes(client, monkeypatch):
+    monkeypatch.setattr(settings, 'TABLE_VERSION_POLL_SECONDS', 0)
+    response = await client.get('/api/offers/')
+    etag = response.headers['etag']
+    assert (await client.get('/api/offers/', headers={'If-None-Match': etag})).status_code == 304
+
+    bump_from_another_process('offers')
+
+    response = await client.get('/api/offers/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+    assert response.headers['last-modified'] == 'Tue, 01 Jan 2030 00:00:00 GMT'
+    since = {'If-Modified-Since': response.headers['last-modified']}
+    assert (await client.get('/api/offers/', headers=since)).status_code == 304
+
+    bump_from_another_process('offers')
+    assert (await client.get('/api/offers/', headers={'If-None-Match': response.headers['etag']})).status_code == 200
+
+
+async def test_cached_catalog_bodies_follow_writes_from_other_processes(client, monkeypatch):
+    monkeypatch.setattr(settings, 'TABLE_VERSION_POLL_SECONDS', 0)
+    await Country.create(name='UK')
+    bump_from_another_process('country')
+    assert [country['name'] for country in (await client.get('/api/country')).json()] == ['UK']
+
+    # A write the cache of this process never saw
+    rename_countries_from_another_process('United Kingdom')
+
+    response = await client.get('/api/country')
+    assert [country['name'] for country in response.json()] == ['United Kingdom']
+
+
+
+async def test_catalog_reads_outside_conditional_gets_follow_other_processes(client, monkeypatch):
+    from engine.cruds import country_list
+
+    monkeypatch.setattr(settings, 'TABLE_VERSION_POLL_SECONDS', 0)
+    await Country.create(name='UK')
+    assert [country.name for country in await country_list()] == ['UK']
+
+    rename_countries_from_another_process('United Kingdom')
+    assert [country.name for country in await country_list()] == ['United Kingdom']
@@ -0,0 +1,25 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from core import images
+
+Image = pytest.importorskip('PIL.Image')
+
+
+SIZES = {'image_thumbnail': 40, 'image_webp': 160}
+
+
+def test_concurrent_workers_write_whole_derivatives(tmp_path):
+    path = str(tmp_path / 'photo.png')
+    Image.new('RGB', (640, 480), 'teal').save(path)
+
+    # The same upload handed to several workers at once, none finding a derivative yet
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda _: images.make_derivatives(path, SIZES, 80), range(4)))
+
+    assert all(result == results[0] for result in results)
+    for field, size in SIZES.items():
+        with Image.open(results[0][field]) as derivative:
+            assert derivative.format == 'WEBP'
+            assert max(derivative.size) == size
+    assert sorted(os.listdir(tmp_path)) == ['photo.png', 'photo.png.thumb.webp', 'photo.png.web.webp']
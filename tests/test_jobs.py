@@ -0,0 +1,44 @@
+from datetime import timedelta
+import pytest
+from tortoise import timezone
+from jobs.models import Job, JobStatus
+from jobs.queue import enqueue, job_handler
+from jobs.worker import claim_job, run_job
+
+
+pytestmark = pytest.mark.anyio
+
+
+@job_handler('test_succeed')
+async def succeed():
+    return {'done': True}
+
+
+async def expire_lease(job):
+    await Job.filter(id=job.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+
+async def test_expired_lease_on_the_last_attempt_fails_the_job(db):
+    job = await enqueue('test_succeed', max_attempts=1)
+    assert (await claim_job()).id == job.id
+    await expire_lease(job)
+
+    assert await claim_job() is None
+    job = await Job.get(id=job.id)
+    assert (job.status, job.attempts) == (JobStatus.FAILED, 1)
+    assert 'Lease expired' in job.last_error
+
+
+async def test_a_worker_that_lost_its_lease_does_not_finish_the_job(db):
+    job = await enqueue('test_succeed', max_attempts=3)
+    stale = await claim_job()
+    await expire_lease(job)
+    current = await claim_job()
+    assert current.attempts == 2
+
+    assert await run_job(stale) is False
+    assert (await Job.get(id=job.id)).status == JobStatus.RUNNING
+
+    assert await run_job(current) is True
+    job = await Job.get(id=job.id)
+    assert (job.status, job.result) == (JobStatus.SUCCEEDED, {'done': True})
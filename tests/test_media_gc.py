@@ -0,0 +1,25 @@
+import pytest
+from commands.media_gc import count_media_references
+from jobs.models import Job, JobStatus
+from jobs.queue import enqueue
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_files_of_unfinished_jobs_are_referenced(db):
+    await enqueue('attach_application_documents', {
+        'kind': 'agent', 'application_id': 1, 'files': {'passport': 'media/documents/aa/bb/queued.pdf'},
+    })
+    retrying = await enqueue('attach_application_documents', {
+        'kind': 'agent', 'application_id': 1, 'files': {'cv': 'media/documents/aa/bb/retrying.pdf'},
+    }, delay_seconds=600)
+    await Job.filter(id=retrying.id).update(attempts=1, last_error='OSError')
+    done = await enqueue('attach_application_documents', {
+        'kind': 'agent', 'application_id': 1, 'files': {'cv': 'media/documents/aa/bb/done.pdf'},
+    })
+    await Job.filter(id=done.id).update(status=JobStatus.SUCCEEDED)
+
+    references = await count_media_references()
+    assert {'media/documents/aa/bb/queued.pdf', 'media/documents/aa/bb/retrying.pdf'} <= set(references)
+    assert 'media/documents/aa/bb/done.pdf' not in references
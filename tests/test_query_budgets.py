@@ -0,0 +1,249 @@
+import pytest
+from core import images
+from core.config import settings
+from core.querycheck import QUERY_BUDGETS, QueryCheckFailed
+from core.security import create_access_token, get_password_hash
+from engine import routes
+from engine.cruds import (
+    catalog_cache, create_agent_admission_application, create_student_admission_application_crud,
+    retrieve_agent_admission_application,
+)
+from engine.models import AgentAdmissionApplication, BlogAndEvent, Country, Course, Intake, Offers, University
+from engine.search import ensure_course_search_index
+from users.dependencies import token_cache
+from users.models import User
+
+
+''' Routes run under core.pytest_plugin, so going over a route's budget or
+repeating a statement per row raises QueryCheckFailed out of the request '''
+
+pytestmark = pytest.mark.anyio
+
+APPLICATIONS = 12
+
+
+@pytest.fixture(params=[False, True], ids=['models', 'projection'])
+def fast_lists(request, monkeypatch):
+    monkeypatch.setattr(settings, 'FAST_LIST_RESPONSES', request.param)
+    return request.param
+
+
+@pytest.fixture
+async def catalog(client):
+    uk = await Country.create(name='UK')
+    universities = [
+        await University.create(country=uk, name=f'University {i}', location='London', varsity_type='Public')
+        for i in range(3)
+    ]
+    courses = [
+        await Course.create(university=university, name=f'Course {i}', course_type='Masters', fee=1000)
+        for i, university in enumerate(universities)
+    ]
+    # Done at startup by the app
+    await ensure_course_search_index()
+    return {'country': uk, 'universities': universities, 'courses': courses}
+
+
+@pytest.fixture
+async def agent_headers(client, catalog):
+    agent = await User.create(
+        username='agent', email='agent@example.com', password_hash=get_password_hash('agent-password'), is_verified=True,
+    )
+    uk, universities, courses = catalog['country'], catalog['universities'], catalog['courses']
+    for i in range(APPLICATIONS):
+        await AgentAdmissionApplication.create(
+            agent=agent, first_name=f'First {i}', last_name='Last', email='student@example.com', phone='0123456789',
+            passport_no=f'P{i:08d}', country=uk, course=courses[0], university_one=universities[0],
+            university_two=universities[1],
+        )
+    response = await client.post('/api/users/login', json={'username': 'agent', 'password': 'agent-password'})
+    return {'Authorization': f"Bearer {response.json()['token']['access_token']}"}
+
+
+@pytest.mark.parametrize('url', [
+    '/api/country',
+    '/api/university',
+    '/api/course',
+    '/api/course/filter/?search=Course',
+    '/api/university/1/course',
+])
+async def test_catalog_lists(client, catalog, fast_lists, url):
+    response = await client.get(url)
+    assert response.status_code == 200, response.text
+
+
+async def test_agent_application_routes(client, catalog, agent_headers, fast_lists):
+    uk, universities, courses = catalog['country'], catalog['universities'], catalog['courses']
+    response = await client.post('/api/agent/admission-application', headers=agent_headers, json={
+        'first_name': 'New', 'last_name': 'Student', 'email': 'new@example.com', 'phone': '0123456789',
+        'passport_no': 'N00000001', 'country_id': uk.id, 'course_id': courses[0].id,
+        'university_one_id': universities[0].id, 'university_two_id': universities[1].id,
+    })
+    assert response.status_code == 200, response.text
+    application_id = response.json()['id']
+
+    response = await client.get('/api/agent/admission-application', headers=agent_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == APPLICATIONS + 1
+
+    response = await client.get('/api/agent/admission-application', headers=agent_headers, params={'limit': 5})
+    assert len(response.json()['items']) == 5
+
+    response = await client.get(f'/api/agent/admission-application/{application_id}', headers=agent_headers)
+    assert response.status_code == 200
+    assert response.json()['course']['university']['country']['name'] == 'UK'
+
+
+async def test_a_query_per_row_fails(client, agent_headers, monkeypatch):
+    list_applications = routes.list_agent_admission_applications
+
+    async def list_with_course_per_row(*args, **kwargs):
+        applications = await list_applications(*args, **kwargs)
+        for application in applications:
+            application.course = await Course.get(id=application.course_id).select_related('university__country')
+        return applications
+
+    monkeypatch.setattr(routes, 'list_agent_admission_applications', list_with_course_per_row)
+    with pytest.raises(QueryCheckFailed, match=rf'{APPLICATIONS}x SELECT'):
+        await client.get('/api/agent/admission-application', headers=agent_headers)
+
+
+async def test_retrieve_is_one_query(client, agent_headers, assert_max_queries):
+    with assert_max_queries(1):
+        application = await retrieve_agent_admission_application(1)
+    assert application.university_two.country.name == 'UK'
+
+
+# A 1x1 PNG
+PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082'
+)
+PDF = b'%PDF-1.4\n%%EOF\n'
+
+AGENT_APPLICATION = {
+    'first_name': 'New', 'last_name': 'Student', 'email': 'new@example.com', 'phone': '0123456789',
+    'passport_no': 'N00000001', 'country_id': 1, 'course_id': 1, 'university_one_id': 1, 'university_two_id': 2,
+}
+STUDENT_APPLICATION = {
+    'name': 'Student', 'phone': '0123456789', 'residence_country': 'UK', 'interest_country': 'UK',
+    'intake_interest': 'September', 'last_graduation': 'BSc', 'interested_course': 'Course 0', 'preferred_university_id': 1,
+}
+
+
+def image(field):
+    return {'files': {field: ('image.png', PNG, 'image/png')}}
+
+
+def documents(field):
+    # With an idempotency key, which adds the lookup of an earlier job
+    return {
+        'files': [('files', (f'{field}.pdf', PDF, 'application/pdf'))],
+        'data': {'field_names': field},
+        'headers': {'Idempotency-Key': 'upload-1'},
+    }
+
+
+# endpoint, method, url, who calls it, request keywords; ids are those of the `world` fixture
+BUDGETED_ROUTES = [
+    ('add_a_country', 'POST', '/api/country', 'admin', {'json': {'name': 'France'}}),
+    ('list_of_countries', 'GET', '/api/country', None, {}),
+    ('retrieve_a_country', 'GET', '/api/country/1', None, {}),
+    ('update_a_country', 'PATCH', '/api/country/1', 'admin', {'json': {'name': 'United Kingdom'}}),
+    ('delete_a_country', 'DELETE', '/api/country/1', 'admin', {}),
+    ('list_of_universities', 'GET', '/api/university', None, {}),
+    ('retrieve_a_university', 'GET', '/api/university/1', None, {}),
+    ('add_a_university', 'POST', '/api/university', 'admin', {'json': {
+        'varsity_type': 'Public', 'name': 'New University', 'location': 'Leeds', 'country_id': 1,
+    }}),
+    ('update_a_university', 'PATCH', '/api/university/1', 'admin', {'json': {'name': 'Renamed', 'location': 'Leeds'}}),
+    ('delete_a_university', 'DELETE', '/api/university/1', 'admin', {}),
+    ('upload_university_image', 'POST', '/api/university/1/upload-image/', 'admin', image('university_image')),
+    ('list_of_courses', 'GET', '/api/course', None, {}),
+    ('filter_courses', 'GET', '/api/course/filter/?search=Course', None, {}),
+    ('filter_courses', 'GET', '/api/course/filter/?country=1', None, {}),
+    ('retrieve_a_course', 'GET', '/api/course/1', None, {}),
+    ('courses_by_university', 'GET', '/api/university/1/course', None, {}),
+    ('add_a_course', 'POST', '/api/course', 'admin', {'json': {
+        'name': 'New Course', 'course_type': 'Masters', 'fee': 1000, 'university_id': 1,
+    }}),
+    ('update_a_course', 'PATCH', '/api/course/1', 'admin', {'json': {'fee': 2000}}),
+    ('delete_a_course', 'DELETE', '/api/course/1', 'admin', {}),
+    ('upload_course_image', 'POST', '/api/course/1/upload-image', 'admin', image('course_image')),
+    ('catalog_cache_stats', 'GET', '/api/catalog/cache-stats', 'admin', {}),
+    ('create_admission_application', 'POST', '/api/agent/admission-application', 'agent', {'json': AGENT_APPLICATION}),
+    ('list_admission_applications', 'GET', '/api/agent/admission-application', 'agent', {}),
+    ('list_admission_applications', 'GET', '/api/agent/admission-application?limit=5&after=2', 'admin', {}),
+    ('retrieve_admission_application', 'GET', '/api/agent/admission-application/1', 'agent', {}),
+    ('update_admission_application', 'PATCH', '/api/agent/admission-application/1', 'agent', {'json': {
+        'status': 'Review', 'university_two_id': 3,
+    }}),
+    ('delete_admission_application', 'DELETE', '/api/agent/admission-application/1', 'agent', {}),
+    ('upload_application_documents', 'POST', '/api/agent/application-documents/1/upload', 'agent', documents('passport')),
+    ('patch_commission', 'PATCH', '/api/agent/commission/1', 'admin', {'json': {'student_fee': 10000, 'commission_rate': 10}}),
+    ('applications_dashboard', 'GET', '/api/dashboard/applications', 'admin', {}),
+    ('list_intake', 'GET', '/api/intakes/', None, {}),
+    ('retrieve_intake', 'GET', '/api/intakes/1/', None, {}),
+    ('create_intake', 'POST', '/api/intakes/', 'admin', {'json': {'name': 'January'}}),
+    ('update_intake', 'PUT', '/api/intakes/1/', 'admin', {'json': {'name': 'May'}}),
+    ('destroy_intake', 'DELETE', '/api/intakes/1/', 'admin', {}),
+    ('create_student_admission_application', 'POST', '/api/student/admission-application', None, {'json': STUDENT_APPLICATION}),
+    ('list_student_admission_applications', 'GET', '/api/student/admission-application', 'admin', {}),
+    ('retrieve_student_admission_application', 'GET', '/api/student/admission-application/1', 'admin', {}),
+    ('update_student_admission_application', 'PATCH', '/api/student/admission-application/1', 'admin', {'json': {
+        'current_stage': 'Offer', 'preferred_university_id': 2,
+    }}),
+    ('delete_student_admission_application', 'DELETE', '/api/student/admission-application/1', 'admin', {}),
+    ('upload_student_application_documents', 'POST', '/api/student/application-documents/1/upload', None, documents('passport')),
+    ('list_blogs_or_events', 'GET', '/api/blogs-or-events/', None, {}),
+    ('retrieve_a_blog_or_event', 'GET', '/api/blogs-or-events/1/', None, {}),
+    ('create_a_blog_or_event', 'POST', '/api/blogs-or-events/', 'admin', {'json': {
+        'type': 'Event', 'title': 'Open day', 'description': 'On campus',
+    }}),
+    ('update_a_blog_or_event', 'PATCH', '/api/blogs-or-events/1/', 'admin', {'json': {'title': 'Renamed'}}),
+    ('delete_a_blog_or_event', 'DELETE', '/api/blogs-or-events/1/', 'admin', {}),
+    ('upload_blog_or_event_document', 'POST', '/api/blogs-or-events/1/upload-image/', 'admin', image('image')),
+    ('list_of_offers', 'GET', '/api/offers/', None, {}),
+    ('retrieve_a_offer', 'GET', '/api/offers/1/', None, {}),
+    ('create_offers', 'POST', '/api/offers/', 'admin', image('image')),
+    ('delete_a_offer', 'DELETE', '/api/offers/1/', 'admin', {}),
+]
+
+
+@pytest.fixture
+async def world(client, catalog, tmp_path, monkeypatch):
+    # Uploads land in a throwaway media root, and no image worker processes are started
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(images, 'Image', None)
+
+    users = {
+        'admin': await User.create(username='admin', email='admin@example.com', password_hash='-', is_admin=True, is_verified=True),
+        'agent': await User.create(username='agent', email='agent@example.com', password_hash='-', is_verified=True),
+    }
+    # Every list holds several rows, so a query per row shows up as a repeated statement
+    for i in range(APPLICATIONS):
+        await create_agent_admission_application({**AGENT_APPLICATION, 'passport_no': f'P{i:08d}'}, users['agent'].id)
+        await create_student_admission_application_crud(dict(STUDENT_APPLICATION))
+    for i in range(3):
+        await Intake.create(name=f'Intake {i}')
+        await BlogAndEvent.create(title=f'Blog {i}', description='Text', image=f'media/images/blog-{i}.png')
+        await Offers.create(image=f'media/images/offer-{i}.png')
+
+    return {role: {'Authorization': f"Bearer {create_access_token({'sub': user.username})}"} for role, user in users.items()}
+
+
+def test_every_budgeted_route_is_exercised():
+    budgeted = {endpoint for module, endpoint in QUERY_BUDGETS if module == routes.__name__}
+    assert budgeted == {endpoint for endpoint, *_ in BUDGETED_ROUTES}
+
+
+@pytest.mark.parametrize('endpoint, method, url, role, kwargs', BUDGETED_ROUTES, ids=[f'{route[0]}:{route[2]}' for route in BUDGETED_ROUTES])
+async def test_budgeted_route(client, world, fast_lists, endpoint, method, url, role, kwargs):
+    # Cold caches are the most a request runs: the user lookup and the catalog loads are counted
+    token_cache.invalidate()
+    catalog_cache.invalidate()
+
+    kwargs = dict(kwargs)
+    headers = {**world.get(role, {}), **kwargs.pop('headers', {})}
+    response = await client.request(method, url, headers=headers, **kwargs)
+    assert response.status_code < 300, response.text
@@ -0,0 +1,55 @@
+import pytest
+from engine import search as course_search
+from engine.cruds import filter_course
+from engine.models import Country, Course, University
+from engine.search import ensure_course_search_index, index_course
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def university(db):
+    uk = await Country.create(name='UK')
+    return await University.create(country=uk, name='London University', location='London', varsity_type='Public')
+
+
+async def test_best_match_ranks_first_among_many(university):
+    # Weak matches (the term only in the description) come first in rowid order
+    for i in range(30):
+        await Course.create(university=university, name=f'Course {i}', course_type='Masters', fee=1000, description='physics')
+    best = await Course.create(university=university, name='Physics', course_type='Masters', fee=1000)
+    await ensure_course_search_index()
+
+    courses = await filter_course(search='physics', limit=1)
+    assert [course.id for course in courses] == [best.id]
+
+
+async def test_filters_apply_before_the_limit(university):
+    for i in range(5):
+        await Course.create(university=university, name=f'Physics {i}', course_type='Masters', fee=1000)
+    bachelors = await Course.create(university=university, name='Physics', course_type='Bachelors', fee=1000)
+    await ensure_course_search_index()
+
+    courses = await filter_course(search='physics', course_type='Bachelors', limit=1)
+    assert [course.id for course in courses] == [bachelors.id]
+
+
+async def test_reindex_is_atomic(university, monkeypatch):
+    course = await Course.create(university=university, name='Physics', course_type='Masters', fee=1000)
+    await ensure_course_search_index()
+
+    monkeypatch.setattr(course_search, 'INDEX_COURSES_SQL', 'INSERT INTO "missing_table" SELECT 1')
+    with pytest.raises(Exception):
+        await index_course(course.id)
+    monkeypatch.undo()
+
+    assert await course_search.search_course_ids('physics') == [course.id]
+
+
+async def test_fallback_respects_limit(university, monkeypatch):
+    monkeypatch.setattr(course_search, 'search_enabled', lambda: False)
+    for i in range(5):
+        await Course.create(university=university, name=f'Physics {i}', course_type='Masters', fee=1000)
+
+    assert len(await filter_course(search='Physics', limit=2)) == 2
@@ -1,7 +1,10 @@
 from .models import User, UserProfile
-from core.security import get_password_hash, verify_password
-import shutil
-from pathlib import Path
+from core.config import settings
+from core.security import get_password_hash_async, verify_password_async
+from core import storage
+from core.compression import precompress
+import anyio
+import asyncio
 from tortoise.exceptions import DoesNotExist
 from .schemas import *
 from fastapi import UploadFile, HTTPException
@@ -19,8 +22,8 @@ async def upload_file(
     media_dir: str = None
 ) -> str:
     
-    MEDIA_DIR = Path(f'media/{media_dir}/')
-    MEDIA_DIR.mkdir(exist_ok=True)
+    MEDIA_DIR = anyio.Path(f'media/{media_dir}/')
+    await MEDIA_DIR.mkdir(parents=True, exist_ok=True)
   
     if not file:
         print('File is empty', type(file))
@@ -39,29 +42,65 @@ async def upload_file(
     
     # Validate file size (convert MB to bytes)
     max_size_bytes = max_size_mb * 1024 * 1024
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
-    
-    if file_size > max_size_bytes:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"File size must be less than {max_size_mb}MB"
-        )
+    too_large = HTTPException(
+        status_code=400, 
+        detail=f"File size must be less than {max_size_mb}MB"
+    )
+
+    # Reject up front when the multipart parser already knows the size
+    if file.size is not None and file.size > max_size_bytes:
+        raise too_large
     
-    # Generate unique filename
     file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-    filename = f"{file_type}_{uuid.uuid4()}.{file_extension}"
-    file_path = MEDIA_DIR / filename
-    
-    # Save file
+
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Identical content is stored once and shared by every row that references it
+        if settings.MEDIA_CONTENT_ADDRESSED:
+            file_path = await storage.store_blob(file, media_dir, file_extension, max_size_bytes)
+        else:
+            # Generate unique filename
+            filename = f"{file_type}_{uuid.uuid4()}.{file_extension}"
+            file_path = str(MEDIA_DIR / filename)
+            await storage.stream_to_file(file, anyio.Path(file_path), max_size_bytes)
+
+        # Compressible uploads (SVG, text) also get .br/.gz variants for /media
+        await precompress(file_path)
+        return file_path
+    except storage.UploadTooLarge:
+        raise too_large
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
-    
-    return str(file_path)
+
+
+async def upload_files(uploads: list, **options) -> list:
+    """Upload ``(file, file_type)`` pairs concurrently, returning their paths in order.
+
+    At most ``UPLOAD_MAX_CONCURRENCY`` files are written at once. If any upload
+    fails, the first error is raised and the files already written by this
+    call are removed (content-addressed blobs may be shared, so those are left
+    to the media garbage collector).
+    """
+    semaphore = asyncio.Semaphore(settings.UPLOAD_MAX_CONCURRENCY)
+
+    async def upload(file, file_type):
+        async with semaphore:
+            return await upload_file(file=file, file_type=file_type, **options)
+
+    results = await asyncio.gather(
+        *(upload(file, file_type) for file, file_type in uploads),
+        return_exceptions=True
+    )
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        if not settings.MEDIA_CONTENT_ADDRESSED:
+            for result in results:
+                if isinstance(result, str):
+                    for path in (result, *storage.variant_paths(result)):
+                        await anyio.Path(path).unlink(missing_ok=True)
+        raise errors[0]
+
+    return results
 
 
 async def get_user_by_username(username: str):
@@ -76,7 +115,7 @@ async def create_user(username: str, email: str, password: str, is_admin: bool =
     user = await User.create(
         username=username,
         email=email,
-        password_hash=get_password_hash(password),
+        password_hash=await get_password_hash_async(password),
         is_admin=is_admin,
         is_verified=False
     )
@@ -86,7 +125,7 @@ async def create_user(username: str, email: str, password: str, is_admin: bool =
 
 async def authenticate_user(username: str, password: str):
     user = await get_user_by_username(username)
-    if user and verify_password(password, user.password_hash):
+    if user and await verify_password_async(password, user.password_hash):
         return user
     return None
 
@@ -1,13 +1,44 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+import copy
+import hashlib
+import time
+from core.cache import TTLCache
+from core.http_cache import table_versions
+from core.metrics import register_cache
 from core.config import settings
 from users.models import User
 
 security = HTTPBearer()
 
+# sha256(token) -> User, so repeat requests skip both the JWT decode and the DB lookup
+token_cache = TTLCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+register_cache('auth', token_cache)
+# A user changed through another worker process drops this process's entries too
+USER_TABLES = ('user',)
+table_versions.watch(USER_TABLES, token_cache.invalidate)
+
+
+async def invalidate_user_cache(user_id: int):
+    # Call after saving or deleting the user
+    token_cache.discard_where(lambda user: user.id == user_id)
+    await table_versions.bump(*USER_TABLES)
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    await table_versions.refresh()
+    user = token_cache.get(token_key)
+    if user is not None:
+        # Every request gets its own instance; the cached one is never handed out
+        return copy.copy(user)
+
+    version = token_cache.version
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
@@ -19,6 +50,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     user = await User.get_or_none(username=username)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
+
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(token_key, copy.copy(user), ttl=min(expires_in, settings.AUTH_CACHE_TTL_SECONDS), version=version)
     return user
 
 
@@ -34,4 +34,5 @@ class UserProfile(models.Model):
 
 
     def __str__(self):
-        return f"Profile of {self.user.username}"
\ No newline at end of file
+        # user_id is always loaded; self.user is only there when the relation was fetched
+        return f"Profile of user {self.user_id}"
\ No newline at end of file
@@ -2,16 +2,18 @@ from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
 from .schemas import *
 from .cruds import *
 from core.security import create_access_token
-from .dependencies import get_current_user
+from .dependencies import get_current_user, invalidate_user_cache
 from typing import List
+from tortoise.transactions import in_transaction
 from .models import User
+from engine.summary import discard_summary_keys
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse)
 async def register_user(user: UserCreate) -> UserResponse:
-    existing_user = await authenticate_user(user.username, user.password)
+    existing_user = await get_user_by_username(user.username)
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists")
     user_obj = await create_user(username=user.username, email=user.email, password=user.password, is_admin=False)
@@ -87,6 +89,7 @@ async def update_agent(agent_id: int, user_update: UserUpdate, current_user=Depe
     agent.is_verified = user_update.is_verified
 
     await agent.save()
+    await invalidate_user_cache(agent.id)
     return agent
 
 
@@ -100,7 +103,11 @@ async def delete_agent(agent_id: int, current_user=Depends(get_current_user)):
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
 
-    await agent.delete()
+    # The summary rows go with the agent, or not at all
+    async with in_transaction('default') as conn:
+        await agent.delete(using_db=conn)
+        await discard_summary_keys('agent', [agent.id], using_db=conn)
+    await invalidate_user_cache(agent.id)
     return {"detail": "Agent deleted"}
 
 